@@ -1,12 +1,16 @@
 import os
+import io
+import time
+import csv
+import sys
+from concurrent.futures import wait as wait_futures
 import streamlit as st
-import numpy as np
-import cv2
-from tensorflow.keras.models import load_model
-from PIL import Image
-from streamlit_lottie import st_lottie
-import requests
-import plotly.graph_objects as go
+
+# Only light imports before the login form; TensorFlow, OpenCV, Plotly etc. are imported by
+# the preload thread below and the rest of the app imports them after login.
+from neuroscan import CLASS_NAMES, assets, metrics
+from neuroscan.backends import DEFAULT_MODEL_PATHS
+from neuroscan.startup import ModelPreloader, PRELOAD_IMPORTS
 
 # --- Page config (must be before any UI) ---
 st.set_page_config(
@@ -25,23 +29,40 @@ st.set_page_config(
 if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
 
+NEUROBOT_SYSTEM_PROMPT = (
+    "You are a highly knowledgeable and professional AI assistant specialized in neuroscience. "
+    "Your role is to provide clear, accurate, and easy-to-understand explanations about brain "
+    "anatomy, brain tumors, MRI interpretations, neurological diseases, treatments, and recent "
+    "neuroscience research. Always use evidence-based information, avoid speculation, and politely "
+    "remind users that you are not a substitute for professional medical advice. Tailor your responses "
+    "to be informative for both medical professionals and curious learners. If the question is unclear "
+    "or outside neuroscience, ask for clarification or gently guide the user back to relevant topics."
+)
+
 if "chat_messages" not in st.session_state:
-    st.session_state.chat_messages = [
-        {
-            "role": "system",
-            "content": (
-                "You are a highly knowledgeable and professional AI assistant specialized in neuroscience. "
-                "Your role is to provide clear, accurate, and easy-to-understand explanations about brain "
-                "anatomy, brain tumors, MRI interpretations, neurological diseases, treatments, and recent "
-                "neuroscience research. Always use evidence-based information, avoid speculation, and politely "
-                "remind users that you are not a substitute for professional medical advice. Tailor your responses "
-                "to be informative for both medical professionals and curious learners. If the question is unclear "
-                "or outside neuroscience, ask for clarification or gently guide the user back to relevant topics."
-            )
-        }
-    ]
+    # full transcript, for display only - what is sent to the API is st.session_state.chat_context
+    st.session_state.chat_messages = [{"role": "system", "content": NEUROBOT_SYSTEM_PROMPT}]
 
 
+# --- Model preloading: starts with the process, runs while the login form is shown ---
+# Backend is selectable by config: keras (default), tflite, onnx, or remote (a shared
+# `python -m neuroscan serve` process; MODEL_PATH is then its URL) - see neuroscan/backends.py.
+# MODEL_PATH may also be a model-zoo variant name such as "gap" (see neuroscan/zoo.py).
+INFERENCE_BACKEND = os.environ.get("NEUROSCAN_BACKEND", "keras").lower()
+MODEL_PATH = os.environ.get("NEUROSCAN_MODEL_PATH") or DEFAULT_MODEL_PATHS.get(INFERENCE_BACKEND, "brain_tumor_model.h5")
+
+@st.cache_resource
+def start_model_preload(model_path: str = MODEL_PATH, backend: str = INFERENCE_BACKEND):
+    # Heavy imports, model load and warm-up (every batch bucket traced) in a background thread
+    def load():
+        from neuroscan.backends import load_backend
+
+        return load_backend(backend, model_path)
+
+    return ModelPreloader(load, imports=PRELOAD_IMPORTS.get(backend, ()))
+
+# same positional arguments as load_tumor_model: st.cache_resource keys on the arguments passed, not defaults
+model_preloader = start_model_preload(MODEL_PATH, INFERENCE_BACKEND)
 
 def login_ui():
     """
@@ -53,160 +74,6 @@ def login_ui():
     """
     st.markdown(
         """
-        <style>
-        /* ------------------------------
-           TOP BAR (compact)
-           CHANGE: reduced padding so header occupies less vertical space
-           ------------------------------ */
-        .ns-topbar {
-            display:flex;
-            align-items:center;
-            gap:12px;
-            padding:8px 12px;                            /* CHANGE: was 12px 20px -> smaller */
-            width:100%;
-            box-sizing:border-box;
-            background: linear-gradient(90deg, rgba(255,255,255,0.01), rgba(255,255,255,0.005));
-            border-bottom: 1px solid rgba(255,255,255,0.02);
-            position: sticky;
-            top: 0;
-            z-index: 999;
-        }
-        .ns-logo {
-            width:40px;                                  /* CHANGE: smaller logo */
-            height:40px;
-            border-radius:8px;
-            background: linear-gradient(135deg,#7c3aed,#06b6d4);
-            display:flex;
-            align-items:center;
-            justify-content:center;
-            color:white;
-            font-size:20px;
-            box-shadow: 0 6px 20px rgba(124,58,237,0.10);
-        }
-        .ns-title {
-            font-family: 'Inter', system-ui, -apple-system, 'Segoe UI', Roboto, 'Helvetica Neue', Arial;
-            color: #e6eef8;
-            font-weight: 800;
-            font-size: 16px;                              /* CHANGE: slightly smaller */
-            margin: 0;
-            line-height:1;
-        }
-        .ns-sub {
-            color:#9fb3dd;
-            font-size:11px;                               /* CHANGE: slightly smaller */
-            margin:0;
-            opacity:0.95;
-        }
-
-        /* ------------------------------
-           PAGE container
-           CHANGE: removed large min-height and reduced padding to remove extra blank space
-           ------------------------------ */
-        .ns-page {
-            background: linear-gradient(180deg,#071226 0%, #0c1b2b 100%);
-            min-height: auto;                             /* CHANGE: was calc(100vh - 64px) */
-            padding: 10px 12px;                           /* CHANGE: was 36px 16px -> smaller */
-            box-sizing: border-box;
-        }
-
-        /* ------------------------------
-           Centered card
-           CHANGE: reduced top margin so the card sits close under the header
-           ------------------------------ */
-        .ns-card {
-            width:420px;
-            max-width:96%;
-            margin: 10px auto;                            /* CHANGE: was 26px auto -> smaller */
-            background: rgba(255,255,255,0.025);
-            border-radius: 12px;                          /* slightly tighter radius */
-            padding: 20px;                                /* CHANGE: reduced padding */
-            box-shadow: 0 10px 28px rgba(2,6,23,0.55);
-            border: 1px solid rgba(255,255,255,0.025);
-            color: #e6eef8;
-            font-family: Inter, system-ui, -apple-system, 'Segoe UI', Roboto;
-        }
-
-        .ns-heading {
-            font-size:18px;                               /* smaller heading to fit compact layout */
-            font-weight:800;
-            margin: 0 0 6px 0;
-            color: #ffffff;
-        }
-        .ns-lead {
-            font-size:13px;
-            color:#9fb3dd;
-            margin:0 0 12px 0;                            /* slightly less spacing */
-        }
-
-        /* Labels */
-        .ns-label {
-            display:block;
-            color:#d8e3f0 !important;
-            font-weight:700 !important;
-            font-size:13px !important;
-            margin-bottom:6px;                            /* tighter spacing */
-        }
-
-        /* Inputs: sleek with subtle inner shadow and focused gradient border */
-        .ns-input input {
-            width:100% !important;
-            padding:10px 12px !important;                /* smaller padding */
-            font-size:14px !important;
-            background: rgba(255,255,255,0.02) !important;
-            color: #e8f0ff !important;
-            border: 1px solid rgba(255,255,255,0.05) !important;
-            border-radius:8px !important;
-            box-shadow: inset 0 1px 0 rgba(255,255,255,0.01);
-        }
-        .ns-input input:focus {
-            outline: none !important;
-            border-image-source: linear-gradient(90deg,#7c3aed,#06b6d4);
-            border-image-slice: 1;
-            box-shadow: 0 6px 20px rgba(99,102,241,0.05) !important;
-        }
-
-        /* Primary button */
-        .ns-btn {
-            width:100%;
-            display:inline-flex;
-            align-items:center;
-            justify-content:center;
-            padding:10px 12px;                            /* smaller */
-            border-radius:10px;
-            background: linear-gradient(90deg, #7c3aed, #06b6d4);
-            color:#fff;
-            font-weight:800;
-            font-size:14px;
-            border:none;
-            cursor:pointer;
-            box-shadow: 0 10px 30px rgba(7,89,173,0.08);
-        }
-        .ns-btn:hover { transform: translateY(-1px); box-shadow:0 14px 36px rgba(7,89,173,0.12); }
-
-        .ns-row {
-            display:flex;
-            justify-content:space-between;
-            align-items:center;
-            margin-top:8px;
-            margin-bottom:10px;
-            color:#9fb3dd;
-            font-size:13px;
-        }
-
-        .ns-small {
-            text-align:center;
-            font-size:12px;
-            color:#8fa6cd;
-            margin-top:6px;
-        }
-
-        @media (max-width:480px) {
-            .ns-card { padding:14px; margin: 12px auto; }
-            .ns-logo { width:36px; height:36px; font-size:18px; }
-            .ns-title { font-size:15px; }
-        }
-        </style>
-
         <!-- Top compact header -->
         <div class="ns-topbar" role="banner" aria-label="NeuroScan top bar">
             <div class="ns-logo" aria-hidden="true">🧠</div>
@@ -256,6 +123,7 @@ def login_ui():
             # simple auth check
             if username == "radiologist" and password == "secure123":
                 st.session_state.logged_in = True
+                st.session_state.user = username
                 st.success("✅ Login successful — redirecting...")
                 st.markdown("</div></div>", unsafe_allow_html=True)
                 return True
@@ -269,26 +137,117 @@ def login_ui():
     return False
 
 # --- Show login UI and stop if not authenticated ---
+# Styles: bundled CSS (+ fonts), minified once per process - no outbound requests (neuroscan/assets.py).
+# The login page gets only its own rules; the app / chat sheets (Poppins, inputs, links) follow after login.
 if not st.session_state.logged_in:
+    st.markdown(assets.stylesheet(assets.LOGIN_STYLESHEETS, fonts=False), unsafe_allow_html=True)
     logged_in_now = login_ui()
     if not logged_in_now:
         st.stop()
 
 # --- User is authenticated; main app continues below ---
+st.markdown(assets.stylesheet(), unsafe_allow_html=True)
+
+import numpy as np
+from streamlit_lottie import st_lottie
+
+from neuroscan.uploads import expand_uploads, decode_many
+from neuroscan.preprocessing import decode_image, decode_scan
+from neuroscan.cache import PredictionCache, file_fingerprint
+from neuroscan.executor import InferenceExecutor, ServerBusy
+from neuroscan.zoo import resolve_model_path, variant_info
+from neuroscan.report import gauge_figure, generate_report
+from neuroscan.chat_context import ChatContext
+from neuroscan.chat_cache import ResponseCache
+from neuroscan import knowledge
+from neuroscan.chat import ChatClient, OPENROUTER_API_URL as DEFAULT_CHAT_URL, MODEL_ID as DEFAULT_CHAT_MODEL
+
+# --- Model loading (preloaded in the background, see start_model_preload) ---
+def load_tumor_model(model_path: str = MODEL_PATH, backend: str = INFERENCE_BACKEND):
+    # model_path: file, or a trained model-zoo variant name ("baseline", "gap", "separable_64", ...)
+    preloader = start_model_preload(model_path, backend)
+    try:
+        return preloader.result()
+    except Exception:
+        start_model_preload.clear()  # retry on the next rerun instead of caching the failure
+        raise
+
+# --- Prediction cache (shared across sessions, keyed by image bytes + model version) ---
+@st.cache_resource
+def get_prediction_cache(model_path: str = MODEL_PATH, backend: str = INFERENCE_BACKEND):
+    if backend == "remote":
+        model_version = load_tumor_model(model_path, backend).model_version
+    else:
+        model_version = file_fingerprint(resolve_model_path(model_path, backend))
+    return PredictionCache(
+        model_version=model_version,
+        max_entries=int(os.environ.get("NEUROSCAN_CACHE_SIZE", "512")),
+        disk_dir=os.environ.get("NEUROSCAN_CACHE_DIR") or None,
+    )
+
+# --- Inference worker pool (shared): fixed workers + bounded queue instead of every session calling the model at once ---
+@st.cache_resource
+def get_inference_executor(model_path: str = MODEL_PATH, backend: str = INFERENCE_BACKEND):
+    return InferenceExecutor(
+        load_tumor_model(model_path, backend),
+        workers=int(os.environ.get("NEUROSCAN_INFERENCE_WORKERS", "2")),
+        max_queue=int(os.environ.get("NEUROSCAN_MAX_QUEUE", "16")),
+    )
 
-# --- Model loading (cached) ---
+# --- Metrics export: NEUROSCAN_METRICS_PORT serves /metrics, NEUROSCAN_METRICS_FILE is rewritten periodically ---
 @st.cache_resource
-def load_tumor_model(model_path: str = "brain_tumor_model.h5"):
-    return load_model(model_path)
+def start_metrics_exporter():
+    port = os.environ.get("NEUROSCAN_METRICS_PORT")
+    path = os.environ.get("NEUROSCAN_METRICS_FILE")
+    if port:
+        metrics.start_http_server(int(port), host=os.environ.get("NEUROSCAN_METRICS_HOST", "127.0.0.1"))
+    if path:
+        metrics.start_textfile_writer(path)
+    return bool(port or path)
+
+ADMIN_USERS = {u.strip() for u in os.environ.get("NEUROSCAN_ADMIN_USERS", "radiologist").split(",") if u.strip()}
+start_metrics_exporter()
 
-IMG_SIZE = 128
 model = None
 try:
-    model = load_tumor_model()
+    if model_preloader.ready():
+        model = load_tumor_model()
+    else:
+        with st.spinner("🧠 Loading model..."):
+            model = load_tumor_model()
+    prediction_cache = get_prediction_cache()
+    inference_executor = get_inference_executor()
 except Exception as e:
     st.error(f"Failed to load model: {e}")
     st.stop()
 
+def run_inference(images, status=None, on_progress=None, chunk_size: int = 64):
+    """
+    Run decoded scans through the shared worker pool in chunks, showing the live queue
+    position in ``status`` while waiting. Raises ServerBusy when the queue is full.
+    """
+    probs = []
+    for start in range(0, len(images), chunk_size):
+        submitted = time.perf_counter()
+        try:
+            job = inference_executor.submit(images[start:start + chunk_size])
+        except ServerBusy:
+            metrics.inc("inference_busy")
+            raise
+        while not job.done():
+            if status is not None and job.position > 0:
+                status.info(f"⏳ Server busy - you are position {job.position} in the queue...")
+            wait_futures([job.future], timeout=0.25)
+        probs.append(job.result())
+        model_preloader.record_prediction()
+        metrics.observe("inference", time.perf_counter() - submitted)
+        metrics.inc("scans_analyzed", len(images[start:start + chunk_size]))
+        if status is not None:
+            status.empty()
+        if on_progress is not None:
+            on_progress(min(start + chunk_size, len(images)), len(images))
+    return np.concatenate(probs) if probs else np.empty((0, len(CLASS_NAMES)), dtype=np.float32)
+
 # --- OpenRouter API config for Neuro Chatbot ---
 # Safely attempt to read from st.secrets, but fall back to environment variables if no secrets file exists.
 OPENROUTER_API_KEY = None
@@ -310,112 +269,76 @@ except Exception:
     OPENROUTER_API_KEY = os.environ.get("OPENROUTER_API_KEY", None)
 
 if not OPENROUTER_API_KEY:
-    st.warning("OpenRouter API key not found. Chatbot will be disabled. Set st.secrets['OPENROUTER_API_KEY'] or environment variable OPENROUTER_API_KEY.")
-
-OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
-MODEL_ID = "openai/gpt-4o-mini"
-
-headers = {
-    "Authorization": f"Bearer {OPENROUTER_API_KEY}" if OPENROUTER_API_KEY else "",
-    "Content-Type": "application/json"
-}
-
-def get_ai_response(messages):
-    if not OPENROUTER_API_KEY:
-        return "Chatbot is disabled because the OpenRouter API key is not configured."
-    json_data = {
-        "model": MODEL_ID,
-        "messages": messages,
-        "max_tokens": 300,
-        "temperature": 0.7
-    }
+    st.warning("OpenRouter API key not found. NeuroBot will answer from the offline knowledge base. Set st.secrets['OPENROUTER_API_KEY'] or environment variable OPENROUTER_API_KEY.")
+
+# Sites without internet can force offline answers even with a key configured
+CHAT_OFFLINE = os.environ.get("NEUROSCAN_CHAT_OFFLINE", "0").lower() in ("1", "true", "yes", "on")
+
+OPENROUTER_API_URL = os.environ.get("OPENROUTER_API_URL", DEFAULT_CHAT_URL)
+MODEL_ID = os.environ.get("NEUROSCAN_CHAT_MODEL", DEFAULT_CHAT_MODEL)
+
+# One pooled keep-alive HTTP session per process, with retries on 429/5xx (neuroscan/chat.py)
+@st.cache_resource
+def get_chat_client(api_key: str, url: str = OPENROUTER_API_URL, model: str = MODEL_ID):
+    return ChatClient(api_key, url=url, model=model)
+
+# Answers to repeated / near-duplicate standalone questions, shared by all sessions (neuroscan/chat_cache.py)
+@st.cache_resource
+def get_response_cache():
+    return ResponseCache(
+        max_entries=int(os.environ.get("NEUROSCAN_CHAT_CACHE_SIZE", "1024")),
+        ttl_s=float(os.environ.get("NEUROSCAN_CHAT_CACHE_TTL_S", str(24 * 3600))),
+        similarity=float(os.environ.get("NEUROSCAN_CHAT_CACHE_SIMILARITY", "0.8")),
+    )
+
+# Offline answers: BM25 over assets/knowledge, index built once and memory-mapped (neuroscan/knowledge.py)
+# A failure here (read-only disk, missing notes) only disables the offline fallback, never the page.
+@st.cache_resource
+def get_knowledge_base():
     try:
-        response = requests.post(OPENROUTER_API_URL, headers=headers, json=json_data, timeout=30)
+        return knowledge.load_or_build(log=lambda msg: print(msg, file=sys.stderr))
     except Exception as e:
-        return f"Error calling OpenRouter: {e}"
-    if response.status_code == 200:
-        data = response.json()
-        try:
-            return data['choices'][0]['message']['content']
-        except Exception:
-            return str(data)
-    else:
-        return f"Error: {response.status_code} - {response.text}"
-
-# --- Custom CSS (app styling) ---
-st.markdown("""
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Poppins:wght@400;600;700&display=swap');
-html, body, [class*="css"] {
-    font-family: 'Poppins', sans-serif;
-}
-.main {
-    background: linear-gradient(135deg, #141E30 0%, #243B55 100%);
-    color: #fff;
-}
-.glass-card {
-    background: rgba(255,255,255,0.08);
-    border-radius: 20px;
-    padding: 2rem;
-    backdrop-filter: blur(15px);
-    -webkit-backdrop-filter: blur(15px);
-    box-shadow: 0 8px 32px rgba(0,0,0,0.37);
-    transition: all 0.3s ease-in-out;
-}
-.glass-card:hover {
-    transform: translateY(-8px);
-    box-shadow: 0 12px 40px rgba(0,0,0,0.5);
-}
-.result-box {
-    border-radius: 20px;
-    padding: 1.5rem;
-    height:80px;
-    font-weight: 700;
-    font-size: 1.5rem;
-    text-align:center;
-    margin-top: 1rem;
-    box-shadow: 0 4px 25px rgba(0,0,0,0.25);
-}
-.tumor {
-    background: linear-gradient(90deg, #ff4b2b, #ff416c);
-    color: white;
-}
-.no-tumor {
-    background: linear-gradient(90deg, #00b09b, #96c93d);
-    color: white;
-}
-.footer {
-    text-align: center;
-    margin-top: 3rem;
-    padding: 1rem;
-    font-size: 0.9rem;
-    opacity: 0.8;
-}
-a { color: #00c6ff; text-decoration:none; }
-a:hover { text-decoration: underline; }
-/* Download button style */
-div[data-testid="stDownloadButton"] button {
-    background: linear-gradient(90deg, #ff416c, #ff4b2b);
-    color: white;
-    font-weight: 700;
-    font-size: 18px;
-    width:100%;
-    height:70px;
-    padding: 12px 24px;
-    border-radius: 12px;
-    transition: all 0.3s ease;
-}
-div[data-testid="stDownloadButton"] button:hover {
-    background: linear-gradient(90deg, #ff4b2b, #ff416c);
-    box-shadow: 0 6px 12px rgba(255, 75, 108, 0.6);
-    cursor: pointer;
-}
-div[data-testid="stDownloadButton"] button span {
-    font-size: 35px;
-    font-weight: 800;
-}
-</style>
-""", unsafe_allow_html=True)
+        print(f"Offline knowledge base unavailable: {e}", file=sys.stderr)
+        return None
+
+get_knowledge_base()  # built / memory-mapped up front (a few ms) so the first offline answer does not pay for it
+
+def offline_answer(messages) -> str:
+    kb = get_knowledge_base()
+    if kb is None:
+        return "NeuroBot is unavailable: the chat API cannot be reached and the offline knowledge base could not be loaded."
+    question = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+    metrics.inc("chat_offline_answers")
+    with metrics.timed("chat_offline"):
+        return kb.answer(question)
+
+def stream_ai_response(messages, status: dict = None):
+    """
+    Yield the reply as it arrives (server-sent events). Without an API key, or when the API is
+    unreachable / fails before the first token, answer from the offline knowledge base instead.
+    ``status["error"]`` / ``status["offline"]`` mark replies that should not be cached.
+    """
+    if status is None:
+        status = {}
+    if not OPENROUTER_API_KEY or CHAT_OFFLINE:
+        status["offline"] = True
+        yield offline_answer(messages)
+        return
+    metrics.inc("chat_requests")
+    started = False
+    try:
+        for token in get_chat_client(OPENROUTER_API_KEY).stream(messages):
+            started = True
+            yield token
+    except Exception as e:
+        metrics.inc("chat_errors")
+        if started:
+            status["error"] = True
+            yield f"\n\n{e}"
+        else:
+            status["offline"] = True
+            yield offline_answer(messages)
+
 
 # --- Sidebar and About ---
 st.sidebar.title("🧠 NeuroScan AI")
@@ -444,17 +367,79 @@ with st.sidebar.expander("📌 About NeuroScan AI", expanded=True):
     🚀 *Our vision is to enhance clinical workflows, ensure faster diagnoses, and help save lives.*
     """)
 
-# --- Lottie animation loader helper ---
-def load_lottieurl(url: str):
-    try:
-        r = requests.get(url, timeout=10)
-        if r.status_code != 200:
-            return None
-        return r.json()
-    except Exception:
-        return None
+with st.sidebar.expander("⏱ Model Latency", expanded=False):
+    latency = model.stats()
+    warmup_total = sum(latency["warmup_ms"].values())
+    st.markdown(f"**Backend:** {latency['backend']} (`{MODEL_PATH}`, {model.img_size}×{model.img_size} input)")
+    zoo_info = variant_info(MODEL_PATH)
+    if zoo_info:
+        st.markdown(
+            f"**Variant:** {zoo_info['name']} - {zoo_info['params']:,} params, "
+            f"{zoo_info['file_size_bytes'] / 1e6:.1f} MB, cold load {zoo_info['cold_load_ms']:.0f} ms, "
+            f"{zoo_info['latency_ms']:.2f} ms/scan"
+        )
+    startup = model_preloader.stats()
+    st.markdown(
+        f"**Startup:** imports {startup['import_ms'] or 0:.0f} ms · model load {startup['load_ms'] or 0:.0f} ms · "
+        f"waited after login {startup['waited_ms']:.0f} ms"
+    )
+    if startup["time_to_first_prediction_ms"] is not None:
+        st.markdown(f"**Time to first prediction:** {startup['time_to_first_prediction_ms'] / 1000:.1f} s after process start")
+    st.markdown(f"**Warm-up:** {warmup_total:.0f} ms over batch sizes {list(latency['warmup_ms'])}")
+    if latency["first_request_ms"] is not None:
+        st.markdown(f"**First request:** {latency['first_request_ms']:.1f} ms")
+    if latency["steady_state_count"]:
+        st.markdown(
+            f"**Steady state:** p50 {latency['steady_state_p50_ms']:.1f} ms · "
+            f"p99 {latency['steady_state_p99_ms']:.1f} ms ({latency['steady_state_count']} calls)"
+        )
+
+with st.sidebar.expander("🚦 Inference Queue", expanded=False):
+    queue_stats = inference_executor.stats()
+    st.markdown(
+        f"**Workers:** {queue_stats['workers']} · **Queue:** {queue_stats['queue_depth']} / {queue_stats['max_queue']}  \n"
+        f"**Completed:** {queue_stats['completed']} · **Rejected (busy):** {queue_stats['rejected']}"
+    )
+    if "wait_p50_ms" in queue_stats:
+        st.markdown(f"**Queue wait:** p50 {queue_stats['wait_p50_ms']:.1f} ms · p99 {queue_stats['wait_p99_ms']:.1f} ms")
+
+with st.sidebar.expander("⚙️ Prediction Cache", expanded=False):
+    cache_stats = prediction_cache.stats()
+    st.markdown(
+        f"**Entries:** {cache_stats['entries']} / {cache_stats['max_entries']}  \n"
+        f"**Hits:** {cache_stats['hits']} (disk: {cache_stats['disk_hits']})  \n"
+        f"**Misses:** {cache_stats['misses']}  \n"
+        f"**Hit rate:** {cache_stats['hit_rate'] * 100:.1f}%"
+    )
+
+if metrics.registry.enabled and st.session_state.get("user") in ADMIN_USERS:
+    with st.sidebar.expander("📊 Stage Metrics (admin)", expanded=False):
+        snapshot = metrics.registry.snapshot()
+        if snapshot["stages"]:
+            st.dataframe(
+                [{"Stage": stage, "Count": s["count"], "p50 ms": round(s["p50_ms"], 1),
+                  "p95 ms": round(s["p95_ms"], 1), "p99 ms": round(s["p99_ms"], 1)}
+                 for stage, s in snapshot["stages"].items()],
+                use_container_width=True, hide_index=True,
+            )
+        else:
+            st.markdown("No timings recorded yet.")
+        if snapshot["counters"]:
+            st.markdown("  \n".join(f"**{name}:** {value}" for name, value in snapshot["counters"].items()))
+        st.download_button("Export (Prometheus text)", data=metrics.registry.render_prometheus(),
+                           file_name="neuroscan_metrics.prom", mime="text/plain")
+
+with st.sidebar.expander("💬 NeuroBot Cache", expanded=False):
+    chat_cache_stats = get_response_cache().stats()
+    st.markdown(
+        f"**Entries:** {chat_cache_stats['entries']} / {chat_cache_stats['max_entries']}  \n"
+        f"**Hits:** {chat_cache_stats['exact_hits']} exact · {chat_cache_stats['similar_hits']} similar  \n"
+        f"**Misses:** {chat_cache_stats['misses']}  \n"
+        f"**Hit rate:** {chat_cache_stats['hit_rate'] * 100:.1f}%"
+    )
 
-lottie_brain = load_lottieurl("https://assets10.lottiefiles.com/packages/lf20_cg3nq9.json")
+# --- Lottie animation (bundled in assets/lottie, parsed once per process; CDN fallback while it is the placeholder) ---
+lottie_brain = assets.load_lottie("brain")
 
 # --- Header ---
 col1, col2 = st.columns([2,1])
@@ -463,16 +448,6 @@ with col1:
 <h1 class="custom-title">
 🧠NeuroScan AI - An AI-Powered Brain Tumor Detector for Radiologists
 </h1>
-
-<style>
-.custom-title {
-    color: white;
-    white-space: nowrap;
-    text-align: center;
-    font-size: 30px;
-    width: 100%;
-}
-</style>
 """, unsafe_allow_html=True)
 
     st.write("Upload an **MRI Scan** and let AI assist in detecting possible tumors with modern deep learning models.")
@@ -482,46 +457,132 @@ with col2:
 
 st.markdown("---")
 
+# --- Batch mode: many scans (or a zipped series) in one batched model call ---
+def run_batch_mode():
+    uploaded_files = st.file_uploader(
+        "📤 Upload MRI Scans (jpg, jpeg, png or a .zip of a series)",
+        type=["jpg", "jpeg", "png", "zip"],
+        accept_multiple_files=True,
+        key="batch_uploader",
+    )
+    if not uploaded_files:
+        st.info("📌 Upload several MRI scans or a zip archive to run a batch prediction.")
+        return
+
+    items, skipped = expand_uploads(uploaded_files)
+    for name, reason in skipped:
+        st.warning(f"Skipped {name}: {reason}")
+    if not items:
+        st.warning("No jpg/jpeg/png images found in the uploaded files.")
+        return
+
+    # Serve already-seen scans from the cache; only decode and run the CNN on the rest
+    keys = [prediction_cache.key_for(data) for _, data in items]
+    cached = [prediction_cache.get(k) for k in keys]
+    pending = [(item, key) for item, key, hit in zip(items, keys, cached) if hit is None]
+    metrics.inc("prediction_cache_hits", len(items) - len(pending))
+    metrics.inc("prediction_cache_misses", len(pending))
+
+    progress = st.progress(0.0, text=f"Decoding {len(pending)} new scans ({len(items) - len(pending)} cached)...")
+    decoded = decode_many([item for item, _ in pending], img_size=model.img_size)
+    ok = [(name, image, key) for (name, image, err), (_, key) in zip(decoded, pending) if err is None]
+    failed = [(name, err) for name, image, err in decoded if err is not None]
+
+    def on_progress(done, total):
+        progress.progress(done / total, text=f"🔍 Analyzed {done}/{total} scans")
+
+    try:
+        probs = run_inference([image for _, image, _ in ok], status=st.empty(), on_progress=on_progress) if ok else []
+    except ServerBusy as e:
+        progress.empty()
+        st.warning(f"⏳ Server busy, position {e.position} - please retry the batch in a few seconds.")
+        return
+    fresh = {}
+    for (name, _, key), p in zip(ok, probs):
+        prediction_cache.put(key, p)
+        fresh[key] = p
+    progress.progress(1.0, text=f"✅ Done - {len(ok)} scans analyzed, {len(items) - len(pending)} from cache, {len(failed)} failed")
+
+    results = []
+    for (name, _), key, hit in zip(items, keys, cached):
+        p = hit if hit is not None else fresh.get(key)
+        if p is not None:
+            results.append((name, p))
+
+    rows = []
+    for name, p in results:
+        rows.append({
+            "File": name,
+            "Prediction": CLASS_NAMES[int(np.argmax(p))],
+            "Tumor %": round(float(p[1]) * 100, 2),
+            "No Tumor %": round(float(p[0]) * 100, 2),
+            "Unsupported %": round(float(p[2]) * 100, 2),
+            "Error": "",
+        })
+    for name, err in failed:
+        rows.append({"File": name, "Prediction": "Error", "Tumor %": None,
+                     "No Tumor %": None, "Unsupported %": None, "Error": err})
+    rows.sort(key=lambda r: -(r["Tumor %"] or 0.0))
+
+    tumor_count = sum(1 for r in rows if r["Prediction"] == "Tumor")
+    st.markdown(f"**{tumor_count}** of **{len(rows)}** scans flagged as tumor (table is sortable by any column).")
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+
+    csv_buf = io.StringIO()
+    writer = csv.DictWriter(csv_buf, fieldnames=list(rows[0].keys()))
+    writer.writeheader()
+    writer.writerows(rows)
+    st.download_button(
+        label="📥 Download Batch Results (CSV)",
+        data=csv_buf.getvalue(),
+        file_name="neuroscan_batch_results.csv",
+        mime="text/csv",
+    )
+
 # --- File Upload and Prediction ---
-uploaded_file = st.file_uploader("📤 Upload MRI Scan (jpg, jpeg, png)", type=["jpg","jpeg","png"])
+scan_mode = st.radio("Scan mode", ["Single scan", "Batch (multiple files / zip)"], horizontal=True, key="scan_mode")
+batch_mode = scan_mode != "Single scan"
+
+uploaded_file = None
+if batch_mode:
+    run_batch_mode()
+else:
+    uploaded_file = st.file_uploader("📤 Upload MRI Scan (jpg, jpeg, png)", type=["jpg","jpeg","png"])
 
 if uploaded_file is not None:
-    image = Image.open(uploaded_file).convert("L")
+    image_bytes = uploaded_file.getvalue()
 
     col_left, col_right = st.columns([1,1])
 
     with col_left:
         st.markdown("<div class='glass-card'>", unsafe_allow_html=True)
-        st.image(image, caption="🖼 Uploaded Image", use_container_width=True)
+        # grayscale, as the model sees it; decode_image enforces the same pixel budget as decode_scan
+        try:
+            st.image(decode_image(image_bytes), caption="🖼 Uploaded Image", use_container_width=True)
+        except Exception as e:
+            st.error(f"❌ Could not display image: {e}")
         st.markdown("</div>", unsafe_allow_html=True)
 
     with col_right:
         try:
-            # Preprocess
-            img = np.array(image)
-            img = cv2.resize(img, (IMG_SIZE, IMG_SIZE))
-            img = img.reshape(1, IMG_SIZE, IMG_SIZE, 1) / 255.0
-
-            with st.spinner("🔍 Analyzing image..."):
-                pred = model.predict(img)[0]
+            # Reruns / re-uploads of the same bytes are served from the prediction cache
+            cache_key = prediction_cache.key_for(image_bytes)
+            pred = prediction_cache.get(cache_key)
+            metrics.inc("prediction_cache_hits" if pred is not None else "prediction_cache_misses")
+            if pred is None:
+                # Preprocess + single forward pass on the shared worker pool
+                with st.spinner("🔍 Analyzing image..."):
+                    pred = run_inference([decode_scan(image_bytes, model.img_size)], status=st.empty())[0]
+                prediction_cache.put(cache_key, pred)
 
             # 3 classes: no tumor, tumor, unsupported
             no_tumor_prob = float(pred[0])
             tumor_prob = float(pred[1])
             unsupported_prob = float(pred[2])
 
-            fig = go.Figure(go.Indicator(
-                mode="gauge+number",
-                value=tumor_prob*100,
-                title={'text': "Tumor Probability (%)"},
-                gauge={'axis': {'range': [0, 100]},
-                       'bar': {'color': "crimson"},
-                       'steps': [
-                           {'range': [0, 40], 'color': "green"},
-                           {'range': [40, 70], 'color': "orange"},
-                           {'range': [70, 100], 'color': "red"}]}))
-            fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", font={'color':"white"})
-            st.plotly_chart(fig, use_container_width=True)
+            with metrics.timed("gauge"):
+                fig = gauge_figure(tumor_prob)
+                st.plotly_chart(fig, use_container_width=True)
 
             predicted_class = int(np.argmax(pred))
             if predicted_class == 0:
@@ -532,69 +593,10 @@ if uploaded_file is not None:
                 st.markdown('<div class="result-box" style="background:gray; color:white;">⚠️ Image not supported. Please upload a valid MRI scan.</div>', unsafe_allow_html=True)
 
             # Generate report text
-            def generate_report(prediction_probs, class_names):
-                predicted_class = int(np.argmax(prediction_probs))
-                confidence = float(prediction_probs[predicted_class] * 100)
-
-                if predicted_class == 2:  # Unsupported
-                    return "Image is not a valid MRI scan. Please upload a proper MRI scan for analysis."
-
-                report = "NeuroScan AI Brain Tumor Detection Report\n"
-                report += "---------------------------------------\n"
-                report += f"Prediction: {class_names[predicted_class]}\n"
-                report += f"Confidence: {confidence:.2f}%\n\n"
-                if predicted_class == 1:  # Tumor detected
-                    report += (
-                        "Findings: \n"
-                        "The AI model detected a brain tumor in the provided MRI scan with a high confidence level.\n"
-                        "It is highly recommended to consult a qualified radiologist or neurologist for further evaluation.\n"
-                        "This report serves as a support tool and does not replace professional medical diagnosis.\n"
-                    )
-                else:
-                    report += "Findings: \n"
-                    report += "No brain tumor was detected in the MRI scan based on current AI model analysis.\n"
-
-                report += "\nThank you for using NeuroScan AI."
-
-                return report
-
-            class_names = ['No Tumor', 'Tumor', 'Unsupported Image']
-            report = generate_report(pred, class_names)
-
-            st.markdown(
-            """
-            <style>
-            /* Make all Streamlit download buttons larger and bolder */
-            div[data-testid="stDownloadButton"] > button {
-                height: 86px !important;
-                padding: 18px 28px !important;
-                background: linear-gradient(90deg, #ff416c, #ff4b2b) !important;
-                color: white !important;
-                font-weight: 900 !important;
-                font-size: 100px !important;      /* larger label text */
-                border-radius: 14px !important;
-                width: 630px;
-                box-shadow: 0 10px 30px rgba(255,65,108,0.35) !important;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                line-height: 1.0 !important;
-            }
-            div[data-testid="stDownloadButton"] > button:hover {
-                transform: translateY(-3px);
-                box-shadow: 0 16px 40px rgba(255,65,108,0.45) !important;
-            }
-            /* The inner span contains the label text — enlarge it too */
-            div[data-testid="stDownloadButton"] > button span {
-                font-size: 50px;
-                letter-spacing: 0.6px !important;
-                font-weight: 900 !important;
-                
-            }
-            </style>
-            """,
-            unsafe_allow_html=True,
-        )
+            with metrics.timed("report"):
+                report = generate_report(pred, CLASS_NAMES)
+
+            st.markdown(assets.stylesheet(("report_button",), fonts=False), unsafe_allow_html=True)
         
         # Use the normal st.download_button call (it will inherit the CSS above)
             st.download_button(
@@ -605,62 +607,47 @@ if uploaded_file is not None:
             )
 
 
+        except ServerBusy as e:
+            st.warning(f"⏳ Server busy, position {e.position} - please retry in a few seconds.")
         except Exception as e:
             st.error(f"❌ Error processing image: {e}")
-else:
+elif not batch_mode:
     st.info("📌 Please upload an MRI scan image to start the prediction.")
 
 st.markdown("---")
 
 # --- Chatbot UI ---
-user_query = st.text_input("Ask Questions to NeuroBot:", key="user_input")
-st.markdown(
-    """
-    <style>
-    /* Make the "Ask your neuroscience question" label much larger and bolder */
-    label[for="user_input"] {
-        font-size: 40px !important;       /* label text size */
-        font-weight: 800 !important;
-        color: #ffffff !important;
-        margin-bottom: 6px !important;
-        display: block !important;
-    }
-
-    /* Increase the input text size so typed text is easier to read */
-    #user_input {
-        font-size: 18px !important;
-        padding: 10px !important;
-    }
-
-    /* If Streamlit wraps the input in another container, also target the common wrapper */
-    div[data-testid="stTextInput"] label[for="user_input"] {
-        font-size: 28px !important;
-        font-weight: 800 !important;
-    }
-    div[data-testid="stTextInput"] input {
-        font-size: 18px !important;
-    }
+# Sent per question: system prompt + rolling summary + recent turns, within a token budget
+if "chat_context" not in st.session_state:
+    st.session_state.chat_context = ChatContext(
+        NEUROBOT_SYSTEM_PROMPT,
+        budget_tokens=int(os.environ.get("NEUROSCAN_CHAT_CONTEXT_TOKENS", "1500")),
+        summary_tokens=int(os.environ.get("NEUROSCAN_CHAT_SUMMARY_TOKENS", "250")),
+    )
+chat_context = st.session_state.chat_context
+response_cache = get_response_cache()
 
-    /* Responsive tweak for small screens */
-    @media (max-width: 640px) {
-        label[for="user_input"] {
-            font-size: 22px !important;
-        }
-        #user_input, div[data-testid="stTextInput"] input {
-            font-size: 16px !important;
-        }
-    }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
-if user_query:
+user_query = st.text_input("Ask Questions to NeuroBot:", key="user_input")
+# The text box keeps its value across reruns: only a new question goes to the API
+if user_query and user_query != st.session_state.get("last_user_query"):
+    st.session_state.last_user_query = user_query
     st.session_state.chat_messages.append({"role": "user", "content": user_query})
-    with st.spinner("NeuroScan AI is thinking..."):
-        reply = get_ai_response(st.session_state.chat_messages)
+    chat_context.add("user", user_query)
+    metrics.inc("chat_prompt_tokens", chat_context.tokens())
+    reply_box = st.empty()
+    reply = response_cache.get(user_query)
+    if reply is None:
+        reply_box.markdown("**NeuroBot:** _NeuroScan AI is thinking..._")
+        reply, status = "", {}
+        for token in stream_ai_response(chat_context.messages(), status):
+            reply += token
+            reply_box.markdown(f"**NeuroBot:** {reply}▌")
+        if not (status.get("error") or status.get("offline")):
+            response_cache.put(user_query, reply)
+    reply_box.markdown(f"**NeuroBot:** {reply}")
     st.session_state.chat_messages.append({"role": "assistant", "content": reply})
-
-if st.session_state.chat_messages and st.session_state.chat_messages[-1]['role'] == 'assistant':
+    chat_context.add("assistant", reply)
+elif st.session_state.chat_messages and st.session_state.chat_messages[-1]['role'] == 'assistant':
     st.markdown(f"**NeuroBot:** {st.session_state.chat_messages[-1]['content']}")
 
 # --- Footer ---
@@ -0,0 +1,7 @@
+"""
+NeuroScan AI core package - model inference and helpers shared by the
+Streamlit app (app.py) and offline tooling.
+"""
+
+IMG_SIZE = 128
+CLASS_NAMES = ["No Tumor", "Tumor", "Unsupported Image"]
@@ -0,0 +1,5 @@
+import sys
+
+from neuroscan.cli import main
+
+sys.exit(main())
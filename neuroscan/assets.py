@@ -0,0 +1,155 @@
+"""
+Bundled static assets: Lottie animations, fonts and CSS, served without network access.
+
+Everything lives in ``assets/`` next to ``app.py``:
+
+    assets/css/*.css          app stylesheets (login, app, chat, report_button)
+    assets/lottie/*.json      Lottie animations
+    assets/fonts/*.woff2      optional web fonts (Poppins-400.woff2, ...), inlined as data: URIs
+
+Files are read and the stylesheet minified once per process (``functools.lru_cache``); the
+page only embeds the resulting strings, so a render makes no outbound requests.
+
+Until the originals are vendored, ``assets/lottie/brain.json`` is a locally authored placeholder
+and ``assets/fonts`` is empty. In that case the original CDN sources are used as a fallback: the
+animation is fetched once per process (short timeout, falling back to the placeholder) and the
+stylesheet ``@import``s Google Fonts for the missing weights. Set ``NEUROSCAN_ASSET_CDN=0`` to
+disable the fallback on offline deployments.
+
+    python -m neuroscan.assets vendor
+
+is a one-off build step for a machine with internet access: it downloads the original
+LottieFiles animation and the Poppins web fonts into ``assets/`` for commit / deployment.
+"""
+import argparse
+import base64
+import functools
+import json
+import os
+import re
+
+ASSET_DIR = os.environ.get("NEUROSCAN_ASSET_DIR") or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+
+# login page only (emitted before authentication) and the main app (order matters: later sheets win)
+LOGIN_STYLESHEETS = ("login",)
+APP_STYLESHEETS = ("app", "chat")
+
+FONT_FAMILY = "Poppins"
+FONT_WEIGHTS = (400, 600, 700)
+LOTTIE_SOURCES = {"brain": "https://assets10.lottiefiles.com/packages/lf20_cg3nq9.json"}
+FONT_CSS_URL = "https://fonts.googleapis.com/css2?family={family}:wght@{weight}&display=swap"
+# "nm" of the bundled stand-in animation; replaced by ``vendor`` with the original
+PLACEHOLDER_LOTTIE = "neuroscan-pulse"
+CDN_FALLBACK = os.environ.get("NEUROSCAN_ASSET_CDN", "1") != "0"
+
+
+def _path(*parts) -> str:
+    return os.path.join(ASSET_DIR, *parts)
+
+
+@functools.lru_cache(maxsize=None)
+def load_lottie(name: str = "brain", cdn_fallback: bool = CDN_FALLBACK):
+    """Parsed Lottie animation ``assets/lottie/<name>.json``, or None if it is missing / invalid.
+
+    If the bundled file is missing or still the placeholder, the original is fetched from
+    ``LOTTIE_SOURCES`` once per process; on any network error the bundled file is used.
+    """
+    try:
+        with open(_path("lottie", f"{name}.json"), encoding="utf-8") as f:
+            animation = json.load(f)
+    except (OSError, ValueError):
+        animation = None
+    if cdn_fallback and name in LOTTIE_SOURCES and (animation is None or animation.get("nm") == PLACEHOLDER_LOTTIE):
+        try:
+            import requests
+
+            r = requests.get(LOTTIE_SOURCES[name], timeout=5)
+            r.raise_for_status()
+            return r.json()
+        except Exception:
+            pass
+    return animation
+
+
+def minify_css(css: str) -> str:
+    """Strip comments and redundant whitespace (enough for hand-written CSS; not a full parser)."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r"([{;])\s*([\w-]+)\s*:\s*", r"\1\2:", css)
+    css = css.replace(";}", "}")
+    return css.strip()
+
+
+@functools.lru_cache(maxsize=None)
+def font_face_css(cdn_fallback: bool = CDN_FALLBACK) -> str:
+    """``@font-face`` rules for the bundled font files, embedded as base64 data: URIs.
+
+    Weights without a bundled file are ``@import``ed from Google Fonts (if ``cdn_fallback``).
+    """
+    rules, missing = [], []
+    for weight in FONT_WEIGHTS:
+        path = _path("fonts", f"{FONT_FAMILY}-{weight}.woff2")
+        if not os.path.exists(path):
+            missing.append(str(weight))
+            continue
+        with open(path, "rb") as f:
+            data = base64.b64encode(f.read()).decode("ascii")
+        rules.append(
+            f"@font-face{{font-family:'{FONT_FAMILY}';font-style:normal;font-weight:{weight};"
+            f"font-display:swap;src:url(data:font/woff2;base64,{data}) format('woff2')}}"
+        )
+    if missing and cdn_fallback:
+        # @import must precede every other rule in the sheet
+        rules.insert(0, f"@import url('{FONT_CSS_URL.format(family=FONT_FAMILY, weight=';'.join(missing))}');")
+    return "".join(rules)
+
+
+@functools.lru_cache(maxsize=None)
+def stylesheet(names=APP_STYLESHEETS, fonts: bool = True) -> str:
+    """One minified ``<style>`` element built from ``assets/css/<name>.css`` (plus bundled fonts)."""
+    parts = [font_face_css()] if fonts else []
+    for name in names:
+        with open(_path("css", f"{name}.css"), encoding="utf-8") as f:
+            parts.append(minify_css(f.read()))
+    return "<style>" + "".join(parts) + "</style>"
+
+
+# --- Build-time vendoring (needs internet; never called by the app) ---
+def vendor(log=print) -> None:
+    import requests
+
+    os.makedirs(_path("lottie"), exist_ok=True)
+    os.makedirs(_path("fonts"), exist_ok=True)
+    for name, url in LOTTIE_SOURCES.items():
+        r = requests.get(url, timeout=30)
+        r.raise_for_status()
+        with open(_path("lottie", f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(r.json(), f, separators=(",", ":"))
+        log(f"lottie/{name}.json <- {url}")
+
+    # a browser user agent makes Google Fonts answer with woff2; the latin subset is listed last
+    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120 Safari/537.36"}
+    for weight in FONT_WEIGHTS:
+        css = requests.get(FONT_CSS_URL.format(family=FONT_FAMILY, weight=weight), headers=headers, timeout=30)
+        css.raise_for_status()
+        urls = re.findall(r"url\((https://[^)]+\.woff2)\)", css.text)
+        if not urls:
+            raise RuntimeError(f"no woff2 font found for {FONT_FAMILY} {weight}")
+        font = requests.get(urls[-1], timeout=30)
+        font.raise_for_status()
+        with open(_path("fonts", f"{FONT_FAMILY}-{weight}.woff2"), "wb") as f:
+            f.write(font.content)
+        log(f"fonts/{FONT_FAMILY}-{weight}.woff2 <- {urls[-1]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bundled static assets")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("vendor", help="download the Lottie animation and web fonts into assets/ (needs internet)")
+    sub.add_parser("css", help="print the minified app stylesheet")
+    args = parser.parse_args()
+    if args.command == "vendor":
+        vendor()
+    else:
+        print(stylesheet())
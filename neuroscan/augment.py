@@ -0,0 +1,134 @@
+"""
+Batched, multi-threaded data augmentation.
+
+Same transforms and ranges as the notebook's (previously unused) ``ImageDataGenerator``:
+rotation (degrees), width/height shift (fraction of size), shear (degrees, as Keras
+interprets ``shear_range``), zoom and horizontal flip, with ``fill_mode='nearest'``. The
+per-image affine matrices for a whole batch are drawn and composed with vectorized numpy,
+flips are one slice over the batch, and the warps run as ``cv2.warpAffine`` calls (which
+release the GIL) spread over a thread pool. It works on uint8 batches inside the tf.data
+pipeline (``neuroscan.data``) before per-batch normalization.
+
+    python -m neuroscan.augment --batch-size 64
+
+benchmarks throughput in images/second for increasing thread counts.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from neuroscan import IMG_SIZE
+
+DEFAULT_PARAMS = {
+    "rotation_range": 15,
+    "width_shift_range": 0.1,
+    "height_shift_range": 0.1,
+    "shear_range": 0.1,
+    "zoom_range": 0.1,
+    "horizontal_flip": True,
+}
+
+
+def random_affine_matrices(n: int, height: int, width: int, rng: np.random.RandomState,
+                           rotation_range=15, width_shift_range=0.1, height_shift_range=0.1,
+                           shear_range=0.1, zoom_range=0.1, **_) -> np.ndarray:
+    """
+    ``(n, 2, 3)`` output->input affine matrices (cv2 ``WARP_INVERSE_MAP`` convention), composed
+    as rotation @ shift @ shear @ zoom about the image centre, like Keras' ``apply_affine_transform``.
+    """
+    theta = np.deg2rad(rng.uniform(-rotation_range, rotation_range, n))
+    tx = rng.uniform(-width_shift_range, width_shift_range, n) * width
+    ty = rng.uniform(-height_shift_range, height_shift_range, n) * height
+    shear = np.deg2rad(rng.uniform(-shear_range, shear_range, n))
+    zx = rng.uniform(1 - zoom_range, 1 + zoom_range, n)
+    zy = rng.uniform(1 - zoom_range, 1 + zoom_range, n)
+
+    def stack(rows):
+        m = np.zeros((n, 3, 3))
+        for (i, j), v in rows.items():
+            m[:, i, j] = v
+        m[:, 2, 2] = 1.0
+        return m
+
+    cos, sin = np.cos(theta), np.sin(theta)
+    rotation = stack({(0, 0): cos, (0, 1): -sin, (1, 0): sin, (1, 1): cos})
+    shift = stack({(0, 0): 1.0, (1, 1): 1.0, (0, 2): tx, (1, 2): ty})
+    shear_m = stack({(0, 0): 1.0, (0, 1): -np.sin(shear), (1, 1): np.cos(shear)})
+    zoom = stack({(0, 0): zx, (1, 1): zy})
+
+    cx, cy = (width - 1) / 2.0, (height - 1) / 2.0
+    to_center = np.array([[1, 0, cx], [0, 1, cy], [0, 0, 1]], dtype=np.float64)
+    from_center = np.array([[1, 0, -cx], [0, 1, -cy], [0, 0, 1]], dtype=np.float64)
+    m = to_center @ rotation @ shift @ shear_m @ zoom @ from_center
+    return m[:, :2, :].astype(np.float32)
+
+
+class BatchAugmenter:
+    def __init__(self, workers: int = None, seed: int = None, **params):
+        self.params = {**DEFAULT_PARAMS, **params}
+        self.workers = workers or os.cpu_count() or 1
+        self._rng = np.random.RandomState(seed)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="neuroscan-augment")
+
+    def _warp_range(self, src, dst, matrices, start, stop):
+        h, w = src.shape[1:3]
+        for i in range(start, stop):
+            cv2.warpAffine(src[i], matrices[i], (w, h), dst=dst[i],
+                           flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP, borderMode=cv2.BORDER_REPLICATE)
+
+    def __call__(self, batch: np.ndarray) -> np.ndarray:
+        """Augment an ``(N, H, W)`` (or ``(N, H, W, 1)``) uint8/float32 batch; returns a new array of the same shape."""
+        src = np.ascontiguousarray(batch)
+        squeeze = src.ndim == 4
+        if squeeze:
+            src = src[..., 0]
+        n, h, w = src.shape
+        matrices = random_affine_matrices(n, h, w, self._rng, **self.params)
+        flip = self._rng.rand(n) < 0.5 if self.params.get("horizontal_flip") else np.zeros(n, dtype=bool)
+
+        out = np.empty_like(src)
+        step = max(1, -(-n // self.workers))
+        futures = [self._pool.submit(self._warp_range, src, out, matrices, s, min(s + step, n))
+                   for s in range(0, n, step)]
+        for f in futures:
+            f.result()
+        out[flip] = out[flip, :, ::-1]
+        return out[..., None] if squeeze else out
+
+
+def benchmark(images: np.ndarray, batch_size: int = 64, thread_counts=None, seconds: float = 2.0) -> dict:
+    """Images/second of ``BatchAugmenter`` over ``images`` for each thread count."""
+    thread_counts = thread_counts or sorted({1, 2, 4, os.cpu_count() or 1})
+    results = {}
+    for workers in thread_counts:
+        augment = BatchAugmenter(workers=workers, seed=0)
+        augment(images[:batch_size])  # warm-up
+        done, start = 0, time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            for s in range(0, len(images), batch_size):
+                done += len(augment(images[s:s + batch_size]))
+        results[workers] = round(done / (time.perf_counter() - start), 1)
+    return {"batch_size": batch_size, "images": int(len(images)), "images_per_second": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batch augmentation throughput")
+    parser.add_argument("--data", default="dataset")
+    parser.add_argument("--cache-dir", default="dataset_cache")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    if os.path.isdir(args.data):
+        from neuroscan.shards import load_or_build
+
+        pixels, _, _ = load_or_build(args.data, args.cache_dir)
+        pixels = np.asarray(pixels)
+    else:
+        pixels = np.random.RandomState(0).randint(0, 256, (512, IMG_SIZE, IMG_SIZE), dtype=np.uint8)
+    print(json.dumps(benchmark(pixels, args.batch_size, seconds=args.seconds), indent=2))
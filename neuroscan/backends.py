@@ -0,0 +1,218 @@
+"""
+Pluggable inference backends.
+
+Every backend exposes ``predict_on_batch(batch) -> (N, 3) probabilities`` and ``stats()``
+so it can be passed anywhere a Keras model was used (``predict_batch``, the app).
+
+    keras   compiled tf.function over the .h5 model (neuroscan.serving)  - needs tensorflow
+    tflite  TFLite interpreter over a float16 / INT8 .tflite export       - tflite-runtime or tensorflow
+    onnx    ONNX Runtime session over a .onnx export                      - onnxruntime
+    remote  shared micro-batching service (neuroscan.server); the "model path" is its URL
+
+Pick one with ``load_backend(name, path)`` or the ``NEUROSCAN_BACKEND`` /
+``NEUROSCAN_MODEL_PATH`` environment variables. Exports are produced by ``neuroscan.export``.
+Only the selected backend's runtime is imported, so a tflite/onnx worker never loads
+the full TensorFlow runtime.
+"""
+import os
+import threading
+import time
+
+import numpy as np
+
+from neuroscan import IMG_SIZE, metrics
+from neuroscan.latency import LatencyStats
+
+DEFAULT_BATCH_SIZES = (1, 8, 32, 128)
+
+DEFAULT_MODEL_PATHS = {
+    "keras": "brain_tumor_model.h5",
+    "tflite": "brain_tumor_model_int8.tflite",
+    "onnx": "brain_tumor_model.onnx",
+    "remote": "http://127.0.0.1:8765",
+}
+
+
+class BucketedBackend:
+    """
+    Base class: pads each request up to the nearest of a small set of batch sizes so the
+    runtime only ever sees a fixed set of input shapes, warms every bucket at load time
+    and records latency. Subclasses implement ``_forward`` for an already padded batch.
+    """
+
+    name = "base"
+
+    def __init__(self, batch_sizes=DEFAULT_BATCH_SIZES, img_size: int = IMG_SIZE):
+        self.img_size = img_size
+        self.batch_sizes = tuple(sorted(set(int(b) for b in batch_sizes)))
+        self.latency = LatencyStats()
+        self.warmup_ms = {}
+
+    def _forward(self, batch: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    @property
+    def max_batch_size(self) -> int:
+        return self.batch_sizes[-1]
+
+    def _bucket(self, n: int) -> int:
+        for b in self.batch_sizes:
+            if b >= n:
+                return b
+        return self.max_batch_size
+
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        n = len(batch)
+        bucket = self._bucket(n)
+        if n != bucket:
+            padded = np.zeros((bucket, self.img_size, self.img_size, 1), dtype=np.float32)
+            padded[:n] = batch
+            batch = padded
+        return np.asarray(self._forward(batch))[:n]
+
+    def warmup(self, rounds: int = 2) -> dict:
+        """Run ``rounds`` passes per bucket so kernels and buffers are allocated before real traffic."""
+        for b in self.batch_sizes:
+            dummy = np.zeros((b, self.img_size, self.img_size, 1), dtype=np.float32)
+            start = time.perf_counter()
+            for _ in range(rounds):
+                self._run(dummy)
+            self.warmup_ms[b] = (time.perf_counter() - start) * 1000.0
+        return self.warmup_ms
+
+    def predict_on_batch(self, batch) -> np.ndarray:
+        """Same contract as ``keras.Model.predict_on_batch`` for ``(N, H, W, 1)`` float32 input."""
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+        start = time.perf_counter()
+        if len(batch) <= self.max_batch_size:
+            out = self._run(batch)
+        else:
+            out = np.concatenate([
+                self._run(batch[i:i + self.max_batch_size])
+                for i in range(0, len(batch), self.max_batch_size)
+            ])
+        elapsed = time.perf_counter() - start
+        self.latency.record(elapsed * 1000.0)
+        metrics.observe("model_predict", elapsed)
+        return out
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "warmup_ms": dict(self.warmup_ms), **self.latency.summary()}
+
+
+class TFLiteBackend(BucketedBackend):
+    """
+    One interpreter per batch bucket, each allocated once for its fixed input shape (during
+    warm-up), so alternating single-scan and batch requests never resize / reallocate tensors.
+    The model file is read once and shared by all interpreters.
+    """
+
+    name = "tflite"
+
+    def __init__(self, model_path: str, num_threads: int = None, warmup: bool = True, **kwargs):
+        super().__init__(**kwargs)
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+
+        self.model_path = model_path
+        self._interpreter_cls = Interpreter
+        self._num_threads = num_threads or os.cpu_count()
+        with open(model_path, "rb") as f:
+            self._model_content = f.read()
+        probe = Interpreter(model_content=self._model_content, num_threads=self._num_threads)
+        self.img_size = int(probe.get_input_details()[0]["shape"][1])
+        self._interpreters = {}  # bucket -> (interpreter, input details, output details, lock)
+        self._create_lock = threading.Lock()
+        if warmup:
+            self.warmup()
+
+    def _interpreter_for(self, bucket: int):
+        slot = self._interpreters.get(bucket)
+        if slot is None:
+            with self._create_lock:
+                slot = self._interpreters.get(bucket)
+                if slot is None:
+                    interp = self._interpreter_cls(model_content=self._model_content, num_threads=self._num_threads)
+                    index = interp.get_input_details()[0]["index"]
+                    interp.resize_tensor_input(index, [bucket, self.img_size, self.img_size, 1])
+                    interp.allocate_tensors()
+                    # each interpreter keeps per-invocation state, so its calls are serialized
+                    slot = (interp, interp.get_input_details()[0], interp.get_output_details()[0], threading.Lock())
+                    self._interpreters[bucket] = slot
+        return slot
+
+    def _forward(self, batch: np.ndarray) -> np.ndarray:
+        interp, input_details, output_details, lock = self._interpreter_for(len(batch))
+        in_dtype = input_details["dtype"]
+        if in_dtype != np.float32:
+            # fully integer-quantized input: x_q = x / scale + zero_point
+            scale, zero_point = input_details["quantization"]
+            info = np.iinfo(in_dtype)
+            batch = np.clip(np.round(batch / scale + zero_point), info.min, info.max).astype(in_dtype)
+        with lock:
+            interp.set_tensor(input_details["index"], batch)
+            interp.invoke()
+            out = interp.get_tensor(output_details["index"]).copy()
+
+        if out.dtype != np.float32:
+            scale, zero_point = output_details["quantization"]
+            out = (out.astype(np.float32) - zero_point) * scale
+        return out
+
+
+class OnnxBackend(BucketedBackend):
+    name = "onnx"
+
+    def __init__(self, model_path: str, num_threads: int = None, warmup: bool = True, **kwargs):
+        super().__init__(**kwargs)
+        import onnxruntime as ort
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            opts.intra_op_num_threads = num_threads
+        self.model_path = model_path
+        self._session = ort.InferenceSession(model_path, sess_options=opts, providers=["CPUExecutionProvider"])
+        model_input = self._session.get_inputs()[0]
+        self._input_name = model_input.name
+        if isinstance(model_input.shape[1], int):
+            self.img_size = model_input.shape[1]
+        if warmup:
+            self.warmup()
+
+    def _forward(self, batch: np.ndarray) -> np.ndarray:
+        return self._session.run(None, {self._input_name: batch})[0]
+
+
+def available_backends():
+    return tuple(DEFAULT_MODEL_PATHS)
+
+
+def load_backend(name: str = None, model_path: str = None, warmup: bool = True, **kwargs):
+    """
+    Load an inference backend by name (``keras``, ``tflite``, ``onnx`` or ``remote``). Defaults come from
+    ``NEUROSCAN_BACKEND`` / ``NEUROSCAN_MODEL_PATH`` and then ``DEFAULT_MODEL_PATHS``.
+    """
+    name = (name or os.environ.get("NEUROSCAN_BACKEND") or "keras").lower()
+    if name not in DEFAULT_MODEL_PATHS:
+        raise ValueError(f"Unknown inference backend '{name}'. Choose one of: {', '.join(available_backends())}")
+    model_path = model_path or os.environ.get("NEUROSCAN_MODEL_PATH") or DEFAULT_MODEL_PATHS[name]
+    if name != "remote":
+        from neuroscan.zoo import resolve_model_path
+
+        # a model-zoo variant name ("gap", "separable_64", ...) also works as the path
+        model_path = resolve_model_path(model_path, backend=name)
+
+    if name == "keras":
+        from neuroscan.serving import load_serving_model
+
+        return load_serving_model(model_path, warmup=warmup, **kwargs)
+    if name == "tflite":
+        return TFLiteBackend(model_path, warmup=warmup, **kwargs)
+    if name == "remote":
+        from neuroscan.remote import RemoteModel
+
+        return RemoteModel(model_path, **kwargs)
+    return OnnxBackend(model_path, warmup=warmup, **kwargs)
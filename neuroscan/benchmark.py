@@ -0,0 +1,247 @@
+"""
+End-to-end inference benchmark over the bundled dataset.
+
+    python -m neuroscan.benchmark --batch-sizes 1,8,32 --concurrency 1,2,4 --out bench.json
+    python -m neuroscan.benchmark --out bench.json --baseline bench_main.json --tolerance 0.15
+
+replays the scans in ``dataset/`` through every stage of a prediction as the app runs it -
+``decode`` (upload bytes -> model-sized uint8), ``preprocess`` (normalize into a float32
+batch), ``predict`` (the configured backend), ``gauge`` (Plotly figure) and ``report`` (text
+report) - for each combination of request batch size and number of concurrent clients.
+For every configuration it records p50/p95/p99/mean request latency, per-stage p50/p95/p99,
+throughput in scans/s and the peak resident memory seen while it ran, and writes one JSON
+document tagged with the git commit, backend and model fingerprint.
+
+With ``--baseline`` the run is compared against an earlier JSON file and the process exits
+with status 1 if any configuration's p95 latency grew, or its throughput dropped, by more
+than ``--tolerance`` - so a CI job can fail a build on a performance regression.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from neuroscan.preprocessing import decode_scan, list_dataset, preprocess_batch
+from neuroscan.report import gauge_figure, generate_report
+
+STAGES = ("decode", "preprocess", "predict", "gauge", "report")
+PERCENTILES = (50, 95, 99)
+
+
+def _current_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        # no procfs: fall back to the lifetime peak (KB on Linux, bytes on macOS)
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class PeakRSS:
+    """Samples the process RSS in a background thread while the ``with`` block runs."""
+
+    def __init__(self, interval_s: float = 0.01):
+        self.interval_s = interval_s
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while True:
+            self.peak_bytes = max(self.peak_bytes, _current_rss_bytes())
+            if self._stop.wait(self.interval_s):
+                return
+
+    def __enter__(self):
+        self.peak_bytes = _current_rss_bytes()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_bytes = max(self.peak_bytes, _current_rss_bytes())
+
+
+def _summarize(samples_ms) -> dict:
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    out = {f"p{p}_ms": round(float(np.percentile(samples, p)), 3) for p in PERCENTILES}
+    out["mean_ms"] = round(float(samples.mean()), 3)
+    return out
+
+
+def load_payloads(data_dir: str = "dataset", limit: int = None):
+    """Raw file bytes of the dataset scans, as they would arrive in an upload."""
+    paths, _ = list_dataset(data_dir)
+    payloads = []
+    for path in paths[:limit]:
+        with open(path, "rb") as f:
+            payloads.append(f.read())
+    if not payloads:
+        raise FileNotFoundError(f"No scans found under {data_dir}")
+    return payloads
+
+
+def run_request(model, payloads) -> dict:
+    """One request through every stage; returns milliseconds per stage plus ``total``."""
+    t = {}
+    start = time.perf_counter()
+    decoded = [decode_scan(data, model.img_size) for data in payloads]
+    t["decode"] = time.perf_counter()
+    batch = preprocess_batch(decoded, model.img_size)
+    t["preprocess"] = time.perf_counter()
+    probs = np.asarray(model.predict_on_batch(batch))
+    t["predict"] = time.perf_counter()
+    for p in probs:
+        gauge_figure(float(p[1]))
+    t["gauge"] = time.perf_counter()
+    for p in probs:
+        generate_report(p)
+    t["report"] = time.perf_counter()
+
+    out, prev = {}, start
+    for stage in STAGES:
+        out[stage] = (t[stage] - prev) * 1000.0
+        prev = t[stage]
+    out["total"] = (prev - start) * 1000.0
+    return out
+
+
+def run_config(model, payloads, batch_size: int, concurrency: int, requests: int) -> dict:
+    """``requests`` requests of ``batch_size`` scans issued by ``concurrency`` client threads."""
+    n = len(payloads)
+    batches = [[payloads[(r * batch_size + i) % n] for i in range(batch_size)] for r in range(requests)]
+    with PeakRSS() as rss, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        timings = list(pool.map(lambda b: run_request(model, b), batches))
+        wall = time.perf_counter() - start
+
+    return {
+        "batch_size": batch_size,
+        "concurrency": concurrency,
+        "requests": requests,
+        "scans": requests * batch_size,
+        "wall_seconds": round(wall, 3),
+        "throughput_scans_per_s": round(requests * batch_size / wall, 2),
+        "latency": _summarize([t["total"] for t in timings]),
+        "stages": {stage: _summarize([t[stage] for t in timings]) for stage in STAGES},
+        "peak_rss_mb": round(rss.peak_bytes / 1e6, 1),
+    }
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(model, data_dir: str = "dataset", batch_sizes=(1, 8, 32), concurrency=(1, 2, 4),
+                  requests: int = 50, model_version: str = None, log=print) -> dict:
+    payloads = load_payloads(data_dir)
+    # one untimed pass so lazy imports (plotly) and first-call allocations are not measured
+    run_request(model, payloads[:1])
+
+    results = []
+    for bs in batch_sizes:
+        for c in concurrency:
+            result = run_config(model, payloads, bs, c, max(requests, c))
+            log(f"batch={bs:<4} clients={c:<3} p50={result['latency']['p50_ms']:.1f}ms "
+                f"p99={result['latency']['p99_ms']:.1f}ms {result['throughput_scans_per_s']:.1f} scans/s "
+                f"rss={result['peak_rss_mb']:.0f}MB")
+            results.append(result)
+
+    stats = model.stats() if hasattr(model, "stats") else {}
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "backend": stats.get("backend"),
+            "model_version": model_version,
+            "img_size": model.img_size,
+            "dataset_scans": len(payloads),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.10):
+    """Regressions of ``current`` against ``baseline`` beyond ``tolerance`` (a fraction), as messages."""
+    base = {(r["batch_size"], r["concurrency"]): r for r in baseline["results"]}
+    regressions = []
+    for r in current["results"]:
+        key = (r["batch_size"], r["concurrency"])
+        old = base.get(key)
+        if old is None:
+            continue
+        p95, old_p95 = r["latency"]["p95_ms"], old["latency"]["p95_ms"]
+        if p95 > old_p95 * (1 + tolerance):
+            regressions.append(f"batch={key[0]} clients={key[1]}: p95 {old_p95:.1f}ms -> {p95:.1f}ms")
+        tput, old_tput = r["throughput_scans_per_s"], old["throughput_scans_per_s"]
+        if tput < old_tput * (1 - tolerance):
+            regressions.append(f"batch={key[0]} clients={key[1]}: throughput {old_tput:.1f} -> {tput:.1f} scans/s")
+    return regressions
+
+
+def _int_list(value: str):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end NeuroScan inference benchmark")
+    parser.add_argument("--data", default="dataset")
+    parser.add_argument("--backend", default=None, help="keras, tflite, onnx or remote (default: NEUROSCAN_BACKEND or keras)")
+    parser.add_argument("--model", default=None, help="model file, zoo variant name or service URL")
+    parser.add_argument("--batch-sizes", type=_int_list, default=[1, 8, 32])
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=50, help="requests per configuration")
+    parser.add_argument("--out", default=None, help="write the JSON results here (default: stdout)")
+    parser.add_argument("--baseline", default=None, help="earlier JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative slowdown, e.g. 0.10")
+    args = parser.parse_args(argv)
+
+    from neuroscan.backends import load_backend
+    from neuroscan.cache import file_fingerprint
+    from neuroscan.zoo import resolve_model_path
+
+    model = load_backend(args.backend, args.model)
+    path = getattr(model, "model_path", None) or (resolve_model_path(args.model, args.backend or "keras") if args.model else None)
+    version = getattr(model, "model_version", None) or (file_fingerprint(path) if path and os.path.exists(path) else None)
+    report = run_benchmark(model, args.data, args.batch_sizes, args.concurrency, args.requests,
+                           model_version=version, log=lambda msg: print(msg, file=sys.stderr))
+
+    payload = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for msg in regressions:
+            print(f"REGRESSION {msg}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
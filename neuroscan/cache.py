@@ -0,0 +1,110 @@
+"""
+Content-addressed prediction cache.
+
+Predictions are keyed by ``sha256(model_version + image bytes)`` so Streamlit reruns,
+re-uploads and the same study opened by two users are served without touching
+TensorFlow. Entries live in a bounded in-memory LRU with an optional on-disk tier
+(one ``.npy`` file per key) that survives restarts and is shared between workers.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def file_fingerprint(path: str, chunk_size: int = 1 << 20) -> str:
+    """sha256 of a file's contents - used as the model version in cache keys."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class PredictionCache:
+    def __init__(self, model_version: str, max_entries: int = 512, disk_dir: str = None):
+        self.model_version = model_version
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def key_for(self, data: bytes) -> str:
+        h = hashlib.sha256(self.model_version.encode("utf-8"))
+        h.update(data)
+        return h.hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.npy")
+
+    def _remember(self, key, probs):
+        # caller holds the lock
+        self._entries[key] = probs
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str):
+        """Return the cached probability vector for ``key`` or None."""
+        with self._lock:
+            probs = self._entries.get(key)
+            if probs is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return probs
+
+        if self.disk_dir:
+            try:
+                probs = np.load(self._disk_path(key))
+            except (OSError, ValueError):
+                probs = None
+            if probs is not None:
+                with self._lock:
+                    self._remember(key, probs)
+                    self.hits += 1
+                    self.disk_hits += 1
+                return probs
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, probs) -> None:
+        probs = np.asarray(probs, dtype=np.float32)
+        probs.setflags(write=False)
+        with self._lock:
+            self._remember(key, probs)
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # write-then-rename so concurrent readers never see a partial file
+                tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp, "wb") as f:
+                    np.save(f, probs)
+                os.replace(tmp, path)
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
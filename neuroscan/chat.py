@@ -0,0 +1,143 @@
+"""
+HTTP client for the NeuroBot chat completions API (OpenRouter, OpenAI-compatible).
+
+One ``ChatClient`` per process keeps a ``requests.Session`` with a keep-alive connection
+pool, so follow-up questions skip DNS + TCP + TLS setup. Requests that fail with a
+connection error, a timeout, HTTP 429 or a 5xx are retried a bounded number of times with
+full-jitter exponential backoff (``Retry-After`` is honoured when the server sends it).
+
+``stream`` asks for server-sent events and yields the reply token by token as it arrives,
+so the UI can render the first words after the time-to-first-token instead of after the
+whole reply. Time to first token and total time are recorded as ``chat_first_token`` /
+``chat`` stage metrics.
+"""
+import json
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from neuroscan import metrics
+
+OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+MODEL_ID = "openai/gpt-4o-mini"
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class ChatError(Exception):
+    pass
+
+
+class ChatClient:
+    def __init__(self, api_key: str, url: str = OPENROUTER_API_URL, model: str = MODEL_ID,
+                 max_tokens: int = 300, temperature: float = 0.7, connect_timeout: float = 5.0,
+                 read_timeout: float = 30.0, max_retries: int = 3, backoff_base: float = 0.5,
+                 backoff_max: float = 8.0, pool_size: int = 8):
+        self.url = url
+        self.model = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retries = 0
+
+        self.session = requests.Session()
+        # retries are handled here (status-aware, with jitter), not by urllib3
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}" if api_key else "",
+            "Content-Type": "application/json",
+        })
+        self._lock = threading.Lock()
+
+    def _payload(self, messages, stream: bool) -> dict:
+        return {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "stream": stream,
+        }
+
+    def _backoff(self, attempt: int, response=None) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _post(self, messages, stream: bool) -> requests.Response:
+        """POST with bounded retries; returns a 200 response or raises ChatError."""
+        for attempt in range(self.max_retries + 1):
+            last = attempt == self.max_retries
+            try:
+                response = self.session.post(self.url, json=self._payload(messages, stream),
+                                             timeout=self.timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if last:
+                    raise ChatError(f"Error calling OpenRouter: {e}") from e
+                delay = self._backoff(attempt)
+            else:
+                if response.status_code == 200:
+                    return response
+                if last or response.status_code not in RETRY_STATUSES:
+                    raise ChatError(f"Error: {response.status_code} - {response.text}")
+                delay = self._backoff(attempt, response)
+                response.content  # read the (small) error body so the connection goes back to the pool
+                response.close()
+            with self._lock:
+                self.retries += 1
+            metrics.inc("chat_retries")
+            time.sleep(delay)
+
+    def complete(self, messages) -> str:
+        """The whole reply in one piece."""
+        with metrics.timed("chat"):
+            data = self._post(messages, stream=False).json()
+        try:
+            return data['choices'][0]['message']['content']
+        except Exception:
+            return str(data)
+
+    def stream(self, messages):
+        """Yield the reply as text deltas, parsed from the server-sent event stream."""
+        start = time.perf_counter()
+        first, done = True, False
+        response = self._post(messages, stream=True)
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                # blank lines separate events; lines starting with ":" are keep-alive comments
+                if done or not line or not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    # keep reading to the end of the body so the connection can be reused
+                    done = True
+                    continue
+                try:
+                    event = json.loads(data)
+                except ValueError:
+                    continue
+                if "error" in event:
+                    raise ChatError(f"Error from OpenRouter: {event['error']}")
+                choices = event.get("choices") or [{}]
+                text = (choices[0].get("delta") or {}).get("content")
+                if text:
+                    if first:
+                        metrics.observe("chat_first_token", time.perf_counter() - start)
+                        first = False
+                    yield text
+        finally:
+            response.close()
+            metrics.observe("chat", time.perf_counter() - start)
+
+    def close(self) -> None:
+        self.session.close()
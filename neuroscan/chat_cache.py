@@ -0,0 +1,181 @@
+"""
+Local response cache for repeated NeuroBot questions.
+
+Answers are keyed by the normalized question text (case, punctuation and whitespace
+folded). A question that is not an exact repeat is matched against the cached ones with a
+small TF-IDF index (word unigrams + bigrams, stop words dropped, cosine similarity over an
+inverted index), so "What is a glioma?" and "what's a glioma" share one answer. Entries
+expire after ``ttl_s`` and the cache is bounded to ``max_entries`` with LRU eviction; hit /
+miss counters feed the sidebar and the ``chat_cache_*`` metrics.
+
+Follow-up questions that lean on the conversation ("what about its treatment?") are never
+served from or written to the cache, since their answer depends on context.
+"""
+import math
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from neuroscan import metrics
+
+_WORD = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset(
+    "a an the is are was were be been being am do does did what whats which who whom how why when "
+    "where can could would should will shall may might must of in on at to for from by with about into "
+    "and or but if so than then please tell me explain describe define meaning mean means i you we "
+    "my your our us s vs versus".split()
+)
+# words that make a question depend on the previous turns
+CONTEXT_WORDS = frozenset("it its that this those these they them their he she his her same above previous".split())
+
+
+def normalize_question(text: str) -> str:
+    return " ".join(_WORD.findall(text.lower().replace("'", "")))
+
+
+def stem(word: str) -> str:
+    # crude plural folding: "gliomas" -> "glioma", "scans" -> "scan" (not "mass" -> "mas")
+    return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+
+def question_terms(text: str) -> Counter:
+    words = [stem(w) for w in normalize_question(text).split() if w not in STOP_WORDS]
+    terms = Counter(words)
+    # unordered bigrams: "t1 vs t2" and "t2 vs t1" are the same question
+    terms.update("_".join(sorted(pair)) for pair in zip(words, words[1:]))
+    return terms
+
+
+def is_standalone(text: str) -> bool:
+    return not (set(normalize_question(text).split()) & CONTEXT_WORDS)
+
+
+class _Entry:
+    __slots__ = ("question", "answer", "created", "terms")
+
+    def __init__(self, question, answer, created, terms):
+        self.question = question
+        self.answer = answer
+        self.created = created
+        self.terms = terms
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 1024, ttl_s: float = 24 * 3600, similarity: float = 0.8, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.similarity = similarity
+        self._clock = clock
+        self._entries = OrderedDict()  # normalized question -> _Entry, oldest first
+        self._postings = {}  # term -> set of normalized questions
+        self._df = Counter()
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # --- index maintenance (lock held) ---
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        for term in entry.terms:
+            self._df[term] -= 1
+            if not self._df[term]:
+                del self._df[term]
+            postings = self._postings[term]
+            postings.discard(key)
+            if not postings:
+                del self._postings[term]
+
+    def _idf(self, term: str) -> float:
+        return math.log((1 + len(self._entries)) / (1 + self._df.get(term, 0))) + 1.0
+
+    def _vector(self, terms: Counter) -> dict:
+        vec = {t: n * self._idf(t) for t, n in terms.items()}
+        norm = math.sqrt(sum(w * w for w in vec.values())) or 1.0
+        return {t: w / norm for t, w in vec.items()}
+
+    def _most_similar(self, terms: Counter):
+        candidates = set()
+        for term in terms:
+            candidates |= self._postings.get(term, set())
+        if not candidates:
+            return None, 0.0
+        query = self._vector(terms)
+        best, best_score = None, 0.0
+        for key in candidates:
+            vec = self._vector(self._entries[key].terms)
+            score = sum(w * vec.get(t, 0.0) for t, w in query.items())
+            if score > best_score:
+                best, best_score = key, score
+        return best, best_score
+
+    def _expired(self, entry: _Entry, now: float) -> bool:
+        return now - entry.created > self.ttl_s
+
+    # --- public API ---
+    def get(self, question: str):
+        """Cached answer for ``question`` (exact or near-duplicate), or None."""
+        if not is_standalone(question):
+            return None
+        key = normalize_question(question)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                self._remove(key)
+                entry = None
+            if entry is not None:
+                self.exact_hits += 1
+            else:
+                terms = question_terms(question)
+                match, score = self._most_similar(terms) if terms else (None, 0.0)
+                if match is not None and score >= self.similarity:
+                    if self._expired(self._entries[match], now):
+                        self._remove(match)
+                    else:
+                        key, entry = match, self._entries[match]
+                        self.similar_hits += 1
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+        metrics.inc("chat_cache_hits" if entry is not None else "chat_cache_misses")
+        return entry.answer if entry is not None else None
+
+    def put(self, question: str, answer: str) -> None:
+        if not is_standalone(question) or not answer:
+            return
+        key = normalize_question(question)
+        terms = question_terms(question)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(question, answer, self._clock(), terms)
+            for term in terms:
+                self._df[term] += 1
+                self._postings.setdefault(term, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._postings.clear()
+            self._df.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.exact_hits + self.similar_hits
+            total = hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": hits / total if total else 0.0,
+            }
@@ -0,0 +1,96 @@
+"""
+Token-budgeted context window for the NeuroBot conversation.
+
+``ChatContext`` holds the system prompt, the most recent turns verbatim and a compact
+rolling summary of everything older. Whenever the prompt would exceed ``budget_tokens``,
+the oldest turns are folded into the summary (first sentence of each question / answer,
+made locally - no extra API call), and the summary itself is capped at ``summary_tokens``
+by dropping its oldest lines. The payload sent per question therefore stays flat no matter
+how long the session runs.
+
+Tokens are counted with ``tiktoken`` when it is installed and estimated otherwise
+(~4 characters per token plus a per-message overhead, which errs on the large side).
+"""
+import functools
+import re
+
+MESSAGE_OVERHEAD_TOKENS = 4  # role + separators per chat message
+TIKTOKEN_ENCODING = "o200k_base"  # gpt-4o family
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+@functools.lru_cache(maxsize=1)
+def _encoder():
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.get_encoding(TIKTOKEN_ENCODING)
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoder = _encoder()
+    if encoder is not None:
+        return len(encoder.encode(text))
+    return (len(text) + 3) // 4
+
+
+def message_tokens(messages) -> int:
+    return sum(count_tokens(m["content"]) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def first_sentence(text: str, max_chars: int = 160) -> str:
+    text = " ".join(text.split())
+    sentence = _SENTENCE_END.split(text, maxsplit=1)[0]
+    return sentence if len(sentence) <= max_chars else sentence[:max_chars - 1].rstrip() + "…"
+
+
+class ChatContext:
+    def __init__(self, system_prompt: str, budget_tokens: int = 1500, summary_tokens: int = 250):
+        self.system = {"role": "system", "content": system_prompt}
+        self.budget_tokens = budget_tokens
+        self.summary_tokens = summary_tokens
+        self.turns = []
+        self.summary_lines = []
+        self.folded = 0
+
+    def add(self, role: str, content: str) -> None:
+        self.turns.append({"role": role, "content": content})
+        self._fit()
+
+    def _summary_message(self):
+        if not self.summary_lines:
+            return None
+        return {"role": "system",
+                "content": "Summary of the earlier conversation:\n" + "\n".join(f"- {line}" for line in self.summary_lines)}
+
+    def messages(self) -> list:
+        """What to send: system prompt, rolling summary (if any), recent turns."""
+        summary = self._summary_message()
+        return [self.system] + ([summary] if summary else []) + list(self.turns)
+
+    def tokens(self) -> int:
+        return message_tokens(self.messages())
+
+    def _fold(self, message: dict) -> None:
+        who = "User asked" if message["role"] == "user" else "NeuroBot answered"
+        self.summary_lines.append(f"{who}: {first_sentence(message['content'])}")
+        self.folded += 1
+        while len(self.summary_lines) > 1 and message_tokens([self._summary_message()]) > self.summary_tokens:
+            self.summary_lines.pop(0)
+
+    def _fit(self) -> None:
+        # always keep the latest message verbatim, even if it alone is over budget
+        while len(self.turns) > 1 and self.tokens() > self.budget_tokens:
+            self._fold(self.turns.pop(0))
+            # drop the answer together with its question so the window never starts mid-exchange
+            if self.turns and self.turns[0]["role"] == "assistant" and len(self.turns) > 1:
+                self._fold(self.turns.pop(0))
+
+    def stats(self) -> dict:
+        return {"tokens": self.tokens(), "budget_tokens": self.budget_tokens, "recent_messages": len(self.turns),
+                "summary_lines": len(self.summary_lines), "folded_messages": self.folded}
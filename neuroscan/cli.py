@@ -0,0 +1,214 @@
+"""
+Command line entry points.
+
+    python -m neuroscan scan <dir> --out results.jsonl --batch-size 64 --workers 8
+    python -m neuroscan serve --port 8765 --max-batch-size 32 --max-wait-ms 5
+
+``scan`` is the headless batch scanner: it walks ``<dir>`` lazily, decodes scans in a thread
+pool (decoding of the next batch overlaps inference on the current one), runs batched
+inference and streams one result per line to ``--out`` (``.jsonl`` or ``.csv``) as it goes. Re-running with the same ``--out`` skips files
+already present in it, so an interrupted backfill resumes where it stopped.
+
+``serve`` runs the micro-batching HTTP service from ``neuroscan.server``.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from neuroscan import IMG_SIZE, CLASS_NAMES
+from neuroscan.preprocessing import is_image_name, decode_scan
+
+RESULT_FIELDS = ["path", "prediction", "no_tumor", "tumor", "unsupported", "error"]
+
+
+def iter_image_paths(root: str):
+    """Yield image paths under ``root`` depth-first in a stable order, without listing the whole tree up front."""
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                # hidden directories (.ipynb_checkpoints, .git, ...) only hold copies / metadata
+                if not entry.name.startswith("."):
+                    subdirs.append(entry.path)
+            elif entry.is_file() and is_image_name(entry.name):
+                yield entry.path
+        stack.extend(reversed(subdirs))
+
+
+def completed_paths(out_path: str) -> set:
+    """Paths already recorded in an existing output file (for resuming)."""
+    done = set()
+    if not os.path.exists(out_path):
+        return done
+    with open(out_path, newline="", encoding="utf-8") as f:
+        if out_path.endswith(".csv"):
+            done.update(row["path"] for row in csv.DictReader(f) if row.get("path"))
+        else:
+            for line in f:
+                try:
+                    done.add(json.loads(line)["path"])
+                except (ValueError, KeyError):
+                    # a partially written last line from an interrupted run is simply redone
+                    continue
+    return done
+
+
+class ResultWriter:
+    """Appends results as JSON lines or CSV rows, flushing after every batch."""
+
+    def __init__(self, out_path: str):
+        self.is_csv = out_path.endswith(".csv")
+        new_file = not os.path.exists(out_path) or os.path.getsize(out_path) == 0
+        self._f = open(out_path, "a", newline="", encoding="utf-8")
+        if self.is_csv:
+            self._csv = csv.DictWriter(self._f, fieldnames=RESULT_FIELDS)
+            if new_file:
+                self._csv.writeheader()
+
+    def write(self, records) -> None:
+        for record in records:
+            if self.is_csv:
+                self._csv.writerow(record)
+            else:
+                self._f.write(json.dumps(record) + "\n")
+        self._f.flush()
+
+    def close(self) -> None:
+        self._f.close()
+
+
+def _decode_path(path, img_size: int = IMG_SIZE):
+    try:
+        with open(path, "rb") as f:
+            return path, decode_scan(f.read(), img_size), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+def _batches(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _records(decoded, model):
+    from neuroscan.inference import predict_batch
+
+    ok = [(path, image) for path, image, err in decoded if err is None]
+    probs = predict_batch(model, [image for _, image in ok]) if ok else []
+    by_path = {path: p for (path, _), p in zip(ok, probs)}
+
+    records = []
+    for path, _, err in decoded:
+        if err is not None:
+            records.append({"path": path, "prediction": None, "no_tumor": None, "tumor": None,
+                            "unsupported": None, "error": err})
+            continue
+        p = by_path[path]
+        records.append({
+            "path": path,
+            "prediction": CLASS_NAMES[int(p.argmax())],
+            "no_tumor": round(float(p[0]), 6),
+            "tumor": round(float(p[1]), 6),
+            "unsupported": round(float(p[2]), 6),
+            "error": None,
+        })
+    return records
+
+
+def scan(directory: str, out_path: str, model, batch_size: int = 64, workers: int = 8, log=sys.stderr) -> int:
+    """Score every image under ``directory`` into ``out_path``. Returns the number of new results written."""
+    done = completed_paths(out_path)
+    pending = (p for p in iter_image_paths(directory) if p not in done)
+    writer = ResultWriter(out_path)
+    img_size = getattr(model, "img_size", IMG_SIZE)
+    written = 0
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            batches = _batches(pending, batch_size)
+            futures = [pool.submit(_decode_path, p, img_size) for p in next(batches, [])]
+            while futures:
+                decoded = [f.result() for f in futures]
+                # start decoding the next batch while this one runs through the model
+                futures = [pool.submit(_decode_path, p, img_size) for p in next(batches, [])]
+                writer.write(_records(decoded, model))
+                written += len(decoded)
+                if log is not None:
+                    rate = written / max(time.perf_counter() - start, 1e-9)
+                    print(f"scanned {written} new files ({len(done)} skipped) - {rate:.1f} img/s", file=log)
+    finally:
+        writer.close()
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="neuroscan", description="NeuroScan AI command line tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_scan = sub.add_parser("scan", help="score a directory of MRI scans into a JSONL/CSV file")
+    p_scan.add_argument("directory")
+    p_scan.add_argument("--out", default="results.jsonl", help="output file (.jsonl or .csv); existing entries are skipped")
+    p_scan.add_argument("--batch-size", type=int, default=64)
+    p_scan.add_argument("--workers", type=int, default=8, help="decode threads")
+    p_scan.add_argument("--backend", default=None,
+                        help="keras, tflite, onnx or remote (default: NEUROSCAN_BACKEND or keras)")
+    p_scan.add_argument("--model", default=None, help="model file for the backend, or service URL for remote")
+
+    p_serve = sub.add_parser("serve", help="run the micro-batching HTTP inference service")
+    p_serve.add_argument("--host", default="127.0.0.1")
+    p_serve.add_argument("--port", type=int, default=8765)
+    p_serve.add_argument("--max-batch-size", type=int, default=32)
+    p_serve.add_argument("--max-wait-ms", type=float, default=5.0, help="longest a queued scan waits for a batch to fill")
+    p_serve.add_argument("--backend", default=None, help="keras, tflite or onnx (default: NEUROSCAN_BACKEND or keras)")
+    p_serve.add_argument("--model", default=None, help="model file for the backend")
+
+    args = parser.parse_args(argv)
+    if args.command == "scan":
+        from neuroscan.backends import load_backend
+
+        if not os.path.isdir(args.directory):
+            parser.error(f"not a directory: {args.directory}")
+        model = load_backend(args.backend, args.model)
+        scan(args.directory, args.out, model, batch_size=args.batch_size, workers=args.workers)
+    elif args.command == "serve":
+        import asyncio
+
+        from neuroscan.backends import load_backend, DEFAULT_MODEL_PATHS
+        from neuroscan.cache import file_fingerprint
+        from neuroscan.server import serve
+        from neuroscan.zoo import resolve_model_path
+
+        backend = (args.backend or os.environ.get("NEUROSCAN_BACKEND") or "keras").lower()
+        model_path = args.model or os.environ.get("NEUROSCAN_MODEL_PATH") or DEFAULT_MODEL_PATHS.get(backend)
+        model = load_backend(backend, model_path)
+        # a zoo variant name resolves to its file; a remote backend reports its own version
+        if backend == "remote":
+            model_version = model.model_version
+        else:
+            model_version = file_fingerprint(resolve_model_path(model_path, backend))
+        try:
+            asyncio.run(serve(model, args.host, args.port, args.max_batch_size, args.max_wait_ms,
+                              model_version=model_version))
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Parallel tf.data training input pipeline.
+
+Replaces the notebook's serial ``for`` loop (one ``cv2.imread`` at a time, every error
+swallowed, everything materialized as one float64 array before ``model.fit``): files are
+listed once, decoded and resized in parallel with the shared ``neuroscan.preprocessing``
+code, cached as uint8, shuffled, batched, normalized per batch and prefetched so the CPU
+keeps the optimizer fed.
+
+With a ``shard_dir`` (see ``neuroscan.shards``) the pipeline instead gathers batches of rows
+straight from the memory-mapped uint8 shard and never touches the JPEGs. Adding a
+``memory_budget_mb`` switches to out-of-core mode: the shard is streamed in chunks sized to
+that budget, so datasets larger than RAM train with bounded peak memory.
+"""
+import itertools
+
+import numpy as np
+import tensorflow as tf
+
+from neuroscan import IMG_SIZE, CLASS_NAMES
+from neuroscan.preprocessing import list_dataset, load_scan
+
+AUTOTUNE = tf.data.AUTOTUNE
+
+
+def train_val_split(paths, labels, val_fraction: float = 0.2, seed: int = 42):
+    """Reproducible shuffled split of ``(paths, labels)`` -> ``(train_paths, train_labels, val_paths, val_labels)``."""
+    paths = np.asarray(paths)
+    labels = np.asarray(labels)
+    order = np.random.RandomState(seed).permutation(len(paths))
+    n_val = int(round(len(paths) * val_fraction))
+    val, train = order[:n_val], order[n_val:]
+    return paths[train], labels[train], paths[val], labels[val]
+
+
+def _loader(img_size: int):
+    def load(path):
+        path = path.decode("utf-8")
+        try:
+            return load_scan(path, img_size), True
+        except Exception as e:
+            # reported, then dropped by the filter below - never silently swallowed
+            print(f"Skipping unreadable scan {path}: {e}")
+            return np.zeros((img_size, img_size), dtype=np.uint8), False
+    return load
+
+
+def normalize_batch(pixels, labels, num_classes: int = len(CLASS_NAMES)):
+    """uint8 ``(B, H, W)`` batch -> float32 ``(B, H, W, 1)`` in [0, 1] plus one-hot labels."""
+    x = tf.cast(pixels[..., None], tf.float32) * (1.0 / 255.0)
+    return x, tf.one_hot(labels, num_classes)
+
+
+def _augment_and_normalize(ds, num_classes: int, augment=None, seed: int = 42):
+    """
+    Final per-batch stage: optional augmentation of the uint8 batch (``augment`` is True for
+    the notebook's default transforms, or a ``BatchAugmenter``), then normalization.
+    """
+    if augment:
+        from neuroscan.augment import BatchAugmenter
+
+        augmenter = augment if isinstance(augment, BatchAugmenter) else BatchAugmenter(seed=seed)
+
+        def apply(pixels, labels):
+            out = tf.numpy_function(augmenter, [pixels], tf.uint8)
+            out.set_shape(pixels.shape)
+            return out, labels
+
+        ds = ds.map(apply, num_parallel_calls=AUTOTUNE)
+    return ds.map(lambda p, l: normalize_batch(p, l, num_classes), num_parallel_calls=AUTOTUNE)
+
+
+def make_dataset(paths, labels, batch_size: int = 32, training: bool = True, cache: str = "",
+                 img_size: int = IMG_SIZE, num_classes: int = len(CLASS_NAMES),
+                 shuffle_buffer: int = None, seed: int = 42, augment=None) -> tf.data.Dataset:
+    """
+    Build the input pipeline for one split.
+
+    ``cache`` is passed to ``Dataset.cache``: ``""`` keeps decoded uint8 scans in memory
+    (16 KB each), a file path caches them on disk, ``None`` disables caching.
+    """
+    load = _loader(img_size)
+
+    def decode(path, label):
+        pixels, ok = tf.numpy_function(load, [path], [tf.uint8, tf.bool])
+        pixels.set_shape((img_size, img_size))
+        ok.set_shape(())
+        return pixels, label, ok
+
+    ds = tf.data.Dataset.from_tensor_slices((np.asarray(paths, dtype=str), np.asarray(labels, dtype=np.int32)))
+    ds = ds.map(decode, num_parallel_calls=AUTOTUNE, deterministic=not training)
+    ds = ds.filter(lambda pixels, label, ok: ok).map(lambda pixels, label, ok: (pixels, label))
+    if cache is not None:
+        ds = ds.cache(cache)
+    if training:
+        ds = ds.shuffle(shuffle_buffer or max(len(paths), 1), seed=seed, reshuffle_each_iteration=True)
+    ds = ds.batch(batch_size)
+    ds = _augment_and_normalize(ds, num_classes, augment if training else None, seed)
+    return ds.prefetch(AUTOTUNE)
+
+
+def make_shard_dataset(pixels, labels, indices, batch_size: int = 32, training: bool = True,
+                       num_classes: int = len(CLASS_NAMES), seed: int = 42, augment=None) -> tf.data.Dataset:
+    """
+    Pipeline over rows ``indices`` of a memory-mapped ``(N, H, W)`` uint8 shard. Only the
+    rows of the current batch are read (sorted, so reads stay mostly sequential).
+    """
+    img_size = pixels.shape[1]
+    labels = np.asarray(labels, dtype=np.int32)
+
+    def gather(idx):
+        idx = np.sort(idx)
+        return np.ascontiguousarray(pixels[idx]), labels[idx]
+
+    def read(idx):
+        x, y = tf.numpy_function(gather, [idx], [tf.uint8, tf.int32])
+        x.set_shape((None, img_size, img_size))
+        y.set_shape((None,))
+        return x, y
+
+    ds = tf.data.Dataset.from_tensor_slices(np.asarray(indices, dtype=np.int64))
+    if training:
+        ds = ds.shuffle(max(len(indices), 1), seed=seed, reshuffle_each_iteration=True)
+    ds = ds.batch(batch_size).map(read, num_parallel_calls=AUTOTUNE, deterministic=not training)
+    ds = _augment_and_normalize(ds, num_classes, augment if training else None, seed)
+    return ds.prefetch(AUTOTUNE)
+
+
+def make_streaming_dataset(shard_dir: str, indices, batch_size: int = 32, memory_budget_mb: float = 256,
+                           training: bool = True, img_size: int = IMG_SIZE,
+                           num_classes: int = len(CLASS_NAMES), seed: int = 42, augment=None) -> tf.data.Dataset:
+    """Out-of-core pipeline: uint8 batches streamed from the shard, normalized per batch."""
+    from neuroscan.shards import iter_shard_batches
+
+    epochs = itertools.count()
+
+    def generate():
+        # a new shuffle order every epoch, the same validation order every time
+        epoch_seed = seed + next(epochs) if training else seed
+        yield from iter_shard_batches(shard_dir, indices, batch_size, memory_budget_mb,
+                                      shuffle=training, seed=epoch_seed, img_size=img_size)
+
+    ds = tf.data.Dataset.from_generator(generate, output_signature=(
+        tf.TensorSpec((None, img_size, img_size), tf.uint8),
+        tf.TensorSpec((None,), tf.int64),
+    ))
+    ds = _augment_and_normalize(ds, num_classes, augment if training else None, seed)
+    # small fixed prefetch: accounted for in shards.rows_for_budget
+    return ds.prefetch(2)
+
+
+def build_datasets(data_dir: str = "dataset", batch_size: int = 32, val_fraction: float = 0.2,
+                   seed: int = 42, img_size: int = IMG_SIZE, cache: str = "", shard_dir: str = None,
+                   memory_budget_mb: float = None, augment=None):
+    """
+    List ``data_dir`` once and return ``(train_ds, val_ds)`` pipelines. With ``shard_dir`` the
+    preprocessed shard there is brought up to date first and both splits read from it; with
+    ``memory_budget_mb`` as well, both splits stream it out-of-core within that budget.
+    ``augment`` (True or a ``BatchAugmenter``) is applied to the training split only.
+    """
+    if shard_dir:
+        from neuroscan.shards import load_or_build
+
+        pixels, labels, _ = load_or_build(data_dir, shard_dir, img_size)
+        train_idx, _, val_idx, _ = train_val_split(np.arange(len(labels)), labels, val_fraction, seed)
+        if memory_budget_mb:
+            del pixels
+            return (make_streaming_dataset(shard_dir, train_idx, batch_size, memory_budget_mb / 2,
+                                           training=True, img_size=img_size, seed=seed, augment=augment),
+                    make_streaming_dataset(shard_dir, val_idx, batch_size, memory_budget_mb / 2,
+                                           training=False, img_size=img_size, seed=seed))
+        return (make_shard_dataset(pixels, labels, train_idx, batch_size, training=True, seed=seed,
+                                   augment=augment),
+                make_shard_dataset(pixels, labels, val_idx, batch_size, training=False, seed=seed))
+
+    paths, labels = list_dataset(data_dir)
+    train_paths, train_labels, val_paths, val_labels = train_val_split(paths, labels, val_fraction, seed)
+    val_cache = None if cache is None else (f"{cache}.val" if cache else "")
+    train_ds = make_dataset(train_paths, train_labels, batch_size, training=True, cache=cache,
+                            img_size=img_size, seed=seed, augment=augment)
+    val_ds = make_dataset(val_paths, val_labels, batch_size, training=False, cache=val_cache,
+                          img_size=img_size, seed=seed)
+    return train_ds, val_ds
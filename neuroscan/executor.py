@@ -0,0 +1,124 @@
+"""
+Bounded inference worker pool with admission control.
+
+All Streamlit sessions share one model, and concurrent reruns used to call it from every
+script thread at once with no limit, so a reading-room peak slowed everyone down together.
+``InferenceExecutor`` runs inference on a fixed number of worker threads behind a bounded
+queue: requests beyond the queue limit are rejected immediately with ``ServerBusy`` (which
+carries the caller's would-be position), and accepted requests can report their live queue
+position while they wait.
+"""
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+from neuroscan.inference import predict_batch
+
+
+class ServerBusy(RuntimeError):
+    def __init__(self, position: int, queue_depth: int):
+        super().__init__(f"Server busy - position {position} (queue depth {queue_depth})")
+        self.position = position
+        self.queue_depth = queue_depth
+
+
+class InferenceJob:
+    def __init__(self, executor, ticket: int, future: Future):
+        self._executor = executor
+        self.ticket = ticket
+        self.future = future
+
+    @property
+    def position(self) -> int:
+        """1-based position in the queue; 0 once a worker has picked the job up."""
+        return max(0, self.ticket - self._executor._started)
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self, timeout: float = None):
+        return self.future.result(timeout)
+
+
+class InferenceExecutor:
+    def __init__(self, model, workers: int = 2, max_queue: int = 16, window: int = 2000):
+        self.model = model
+        self.workers = workers
+        self.max_queue = max_queue
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._issued = 0        # tickets handed out
+        self._started = 0       # jobs picked up by a worker
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._wait_ms = deque(maxlen=window)
+        self._run_ms = deque(maxlen=window)
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"neuroscan-infer-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, images) -> InferenceJob:
+        """Queue ``predict_batch(model, images)``. Raises ``ServerBusy`` if the queue is full."""
+        future = Future()
+        with self._lock:
+            ticket = self._issued + 1
+            try:
+                self._queue.put_nowait((ticket, list(images), future, time.perf_counter()))
+            except queue.Full:
+                self.rejected += 1
+                depth = self._queue.qsize()
+                raise ServerBusy(position=depth + 1, queue_depth=depth) from None
+            self._issued = ticket
+        return InferenceJob(self, ticket, future)
+
+    def predict(self, images, timeout: float = None) -> np.ndarray:
+        return self.submit(images).result(timeout)
+
+    def _worker(self) -> None:
+        while True:
+            ticket, images, future, queued_at = self._queue.get()
+            started_at = time.perf_counter()
+            with self._lock:
+                self._started = max(self._started, ticket)
+                self._wait_ms.append((started_at - queued_at) * 1000.0)
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                probs = predict_batch(self.model, images)
+            except BaseException as e:
+                with self._lock:
+                    self.failed += 1
+                future.set_exception(e)
+            else:
+                with self._lock:
+                    self.completed += 1
+                    self._run_ms.append((time.perf_counter() - started_at) * 1000.0)
+                future.set_result(probs)
+
+    def stats(self) -> dict:
+        with self._lock:
+            wait = np.array(self._wait_ms, dtype=np.float64)
+            run = np.array(self._run_ms, dtype=np.float64)
+            out = {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queue.qsize(),
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+        if wait.size:
+            out.update({"wait_p50_ms": float(np.percentile(wait, 50)),
+                        "wait_p99_ms": float(np.percentile(wait, 99))})
+        if run.size:
+            out.update({"run_p50_ms": float(np.percentile(run, 50)),
+                        "run_p99_ms": float(np.percentile(run, 99))})
+        return out
@@ -0,0 +1,150 @@
+"""
+Export ``brain_tumor_model.h5`` to lighter inference formats and check they still agree
+with the Keras model.
+
+    python -m neuroscan.export --model brain_tumor_model.h5 --data dataset
+
+writes ``brain_tumor_model_fp16.tflite``, ``brain_tumor_model_int8.tflite`` (post-training
+quantized, calibrated on the ``dataset/`` images) and ``brain_tumor_model.onnx``, then prints
+an agreement report (max |dp| and top-1 agreement vs Keras) for each export as JSON.
+
+The input size is taken from the Keras model, so model-zoo variants export too:
+
+    python -m neuroscan.export --model gap --out-dir models   # models/gap_int8.tflite, models/gap.onnx
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+from neuroscan import IMG_SIZE
+from neuroscan.preprocessing import load_dataset, preprocess_batch
+from neuroscan.shards import load_or_build
+
+
+def load_dataset_images(data_dir: str = "dataset", limit: int = None, seed: int = 42, cache_dir: str = None,
+                        img_size: int = IMG_SIZE):
+    """
+    Up to ``limit`` preprocessed ``img_size`` uint8 scans from ``data_dir``, shuffled reproducibly
+    (for calibration / agreement). With ``cache_dir`` they come from the memory-mapped shard.
+    """
+    if cache_dir:
+        # one shard per input size, as in neuroscan.zoo
+        shard_dir = cache_dir if img_size == IMG_SIZE else f"{cache_dir}_{img_size}"
+        pixels, _, _ = load_or_build(data_dir, shard_dir, img_size)
+    else:
+        pixels, _, _ = load_dataset(data_dir, img_size)
+    order = np.random.RandomState(seed).permutation(len(pixels))
+    return pixels[order[:limit] if limit else order]
+
+
+def _load_keras(model_path: str):
+    from tensorflow.keras.models import load_model
+
+    return load_model(model_path, compile=False)
+
+
+def _input_size(model) -> int:
+    return int(model.input_shape[1] or IMG_SIZE)
+
+
+def export_tflite(model_path: str, out_path: str, quantize: str = "float16", calibration_images=None) -> str:
+    """
+    Convert the Keras model to TFLite. ``quantize`` is ``None`` (float32), ``"float16"``
+    (fp16 weights) or ``"int8"`` (full post-training integer quantization of weights and
+    activations, calibrated on ``calibration_images``; the model keeps a float32 interface).
+    """
+    import tensorflow as tf
+
+    model = _load_keras(model_path)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantize == "float16":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantize == "int8":
+        if calibration_images is None or len(calibration_images) == 0:
+            raise ValueError("INT8 quantization needs calibration images")
+        calibration = preprocess_batch(calibration_images, _input_size(model))
+
+        def representative_dataset():
+            for i in range(len(calibration)):
+                yield [calibration[i:i + 1]]
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    elif quantize is not None:
+        raise ValueError(f"Unknown quantization mode '{quantize}'")
+
+    with open(out_path, "wb") as f:
+        f.write(converter.convert())
+    return out_path
+
+
+def export_onnx(model_path: str, out_path: str, opset: int = 13) -> str:
+    import tensorflow as tf
+    import tf2onnx
+
+    model = _load_keras(model_path)
+    size = _input_size(model)
+    spec = (tf.TensorSpec((None, size, size, 1), tf.float32, name="input"),)
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=opset, output_path=out_path)
+    return out_path
+
+
+def check_agreement(reference, candidate, images, batch_size: int = 32) -> dict:
+    """Compare two backends (anything with ``predict_on_batch``) on the same images."""
+    from neuroscan.inference import predict_batch
+
+    ref = predict_batch(reference, images, batch_size=batch_size)
+    cand = predict_batch(candidate, images, batch_size=batch_size)
+    diff = np.abs(ref - cand)
+    return {
+        "images": len(images),
+        "max_abs_diff": float(diff.max()) if len(images) else 0.0,
+        "mean_abs_diff": float(diff.mean()) if len(images) else 0.0,
+        "top1_agreement": float(np.mean(ref.argmax(axis=1) == cand.argmax(axis=1))) if len(images) else 1.0,
+    }
+
+
+def main(argv=None):
+    from neuroscan.backends import load_backend
+    from neuroscan.zoo import resolve_model_path
+
+    parser = argparse.ArgumentParser(description="Export the NeuroScan model to TFLite / ONNX")
+    parser.add_argument("--model", default="brain_tumor_model.h5", help="Keras model file or model-zoo variant name")
+    parser.add_argument("--data", default="dataset", help="directory used for INT8 calibration and the agreement check")
+    parser.add_argument("--cache-dir", default="dataset_cache", help="preprocessed dataset shard ('' to decode the JPEGs)")
+    parser.add_argument("--out-dir", default=".")
+    parser.add_argument("--formats", default="fp16,int8,onnx", help="comma separated subset of fp16,int8,onnx")
+    parser.add_argument("--calibration-size", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    args.model = resolve_model_path(args.model)
+    stem = os.path.splitext(os.path.basename(args.model))[0]
+    reference = load_backend("keras", args.model, warmup=False)
+    images = load_dataset_images(args.data, cache_dir=args.cache_dir or None, img_size=reference.img_size)
+
+    report = {}
+    for fmt in [f.strip() for f in args.formats.split(",") if f.strip()]:
+        if fmt == "fp16":
+            path = export_tflite(args.model, os.path.join(args.out_dir, f"{stem}_fp16.tflite"), "float16")
+            backend = load_backend("tflite", path, warmup=False)
+        elif fmt == "int8":
+            path = export_tflite(args.model, os.path.join(args.out_dir, f"{stem}_int8.tflite"), "int8",
+                                 calibration_images=images[:args.calibration_size])
+            backend = load_backend("tflite", path, warmup=False)
+        elif fmt == "onnx":
+            path = export_onnx(args.model, os.path.join(args.out_dir, f"{stem}.onnx"))
+            backend = load_backend("onnx", path, warmup=False)
+        else:
+            parser.error(f"unknown format '{fmt}'")
+        report[fmt] = {"path": path, "size_bytes": os.path.getsize(path), **check_agreement(reference, backend, images)}
+
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Batched inference for the brain tumor CNN.
+
+The Streamlit app used to preprocess one upload and call ``model.predict`` per scan,
+paying the full Keras ``predict`` setup cost (callbacks, data adapter, progress bar)
+for every image. ``predict_batch`` stacks N decoded scans into one contiguous float32
+tensor and runs a single forward pass instead.
+"""
+import numpy as np
+
+from neuroscan import IMG_SIZE, CLASS_NAMES
+from neuroscan.preprocessing import preprocess_batch
+
+
+def predict_batch(model, images, batch_size: int = 256, img_size: int = None, on_progress=None) -> np.ndarray:
+    """
+    Run the classifier over N decoded scans and return an ``(N, 3)`` float32 array of
+    per-scan probabilities in ``CLASS_NAMES`` order.
+
+    Scans are forwarded in chunks of ``batch_size`` through ``predict_on_batch``, which
+    skips the per-call setup that ``model.predict`` does. ``on_progress(done, total)`` is
+    called after each chunk, e.g. to drive a progress bar. ``img_size`` defaults to the
+    backend's input size (model-zoo variants may be smaller than ``IMG_SIZE``).
+    """
+    img_size = img_size or getattr(model, "img_size", IMG_SIZE)
+    if not isinstance(images, np.ndarray):
+        images = list(images)
+    n = len(images)
+    if n == 0:
+        return np.empty((0, len(CLASS_NAMES)), dtype=np.float32)
+
+    probs = np.empty((n, len(CLASS_NAMES)), dtype=np.float32)
+    for start in range(0, n, batch_size):
+        chunk = preprocess_batch(images[start:start + batch_size], img_size)
+        probs[start:start + len(chunk)] = np.asarray(model.predict_on_batch(chunk))
+        if on_progress is not None:
+            on_progress(start + len(chunk), n)
+    return probs
+
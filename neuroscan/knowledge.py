@@ -0,0 +1,198 @@
+"""
+Offline NeuroBot answers from a local, BM25-indexed knowledge base.
+
+The corpus is the markdown under ``assets/knowledge`` (one passage per ``##`` section).
+
+    python -m neuroscan.knowledge build
+    python -m neuroscan.knowledge ask "what is the difference between T1 and T2?"
+
+``build_index`` tokenizes every passage once and writes an inverted index as flat ``.npy``
+arrays (CSR postings: ``term_offsets`` into ``postings_doc`` / ``postings_tf``, plus
+``doc_len``) with ``vocab.json``, ``passages.json`` and a ``manifest.json`` recording a hash
+of the corpus. ``load_or_build`` rebuilds only when the corpus changed, then
+``KnowledgeBase`` memory-maps the arrays, so start-up is a few small file opens and queries
+touch only the postings of their own terms.
+
+``KnowledgeBase.answer`` ranks passages with Okapi BM25 and assembles a reply from the best
+ones; the app uses it whenever the remote chat API is unavailable (no key, no network, or
+an error).
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+from collections import Counter
+
+import numpy as np
+
+from neuroscan.assets import ASSET_DIR
+from neuroscan.chat_cache import STOP_WORDS, normalize_question, stem
+
+CORPUS_DIR = os.path.join(ASSET_DIR, "knowledge")
+# a per-user cache dir: writable even when the app is deployed read-only or started elsewhere
+INDEX_DIR = os.environ.get("NEUROSCAN_KB_INDEX") or os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "neuroscan", "knowledge_index")
+FORMAT_VERSION = 1  # bump when tokenization changes so existing indexes are rebuilt
+BM25_K1 = 1.2
+BM25_B = 0.75
+# a passage must match at least this well to be used as an answer
+MIN_SCORE = 1.0
+
+OFFLINE_NOTE = ("_Answered offline from the NeuroScan reference notes. "
+                "This is general information and not a substitute for professional medical advice._")
+NO_ANSWER = ("I could not find this in the offline NeuroScan reference notes. Try rephrasing the question "
+             "with specific terms (for example \"glioma\", \"FLAIR\" or \"contrast enhancement\").")
+
+# question verbs that say nothing about the topic ("what does FLAIR show")
+QUERY_WORDS = frozenset("show look like appear happen work use used cause caused need know".split())
+
+
+def tokenize(text: str):
+    return [t for t in (stem(w) for w in normalize_question(text).split() if w not in STOP_WORDS) if t not in QUERY_WORDS]
+
+
+def read_corpus(corpus_dir: str = CORPUS_DIR):
+    """``[{"doc", "title", "text"}]``, one per ``##`` section of each markdown file, in stable order."""
+    passages = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "*.md"))):
+        with open(path, encoding="utf-8") as f:
+            content = f.read()
+        doc = os.path.splitext(os.path.basename(path))[0]
+        for section in re.split(r"^## ", content, flags=re.M)[1:]:
+            title, _, body = section.partition("\n")
+            text = " ".join(body.split())
+            if text:
+                passages.append({"doc": doc, "title": title.strip(), "text": text})
+    return passages
+
+
+def _corpus_hash(corpus_dir: str) -> str:
+    h = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "*.md"))):
+        h.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def build_index(corpus_dir: str = CORPUS_DIR, index_dir: str = INDEX_DIR) -> dict:
+    start = time.perf_counter()
+    passages = read_corpus(corpus_dir)
+    if not passages:
+        raise FileNotFoundError(f"No knowledge base passages found in {corpus_dir}")
+    # title terms count three times: the title names the topic the passage answers
+    doc_terms = [Counter(tokenize(p["title"]) * 3 + tokenize(p["text"])) for p in passages]
+
+    vocab = {}
+    postings = {}
+    for doc_id, terms in enumerate(doc_terms):
+        for term, tf in terms.items():
+            postings.setdefault(vocab.setdefault(term, len(vocab)), []).append((doc_id, tf))
+
+    offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+    for term_id in range(len(vocab)):
+        offsets[term_id + 1] = offsets[term_id] + len(postings[term_id])
+    docs = np.empty(offsets[-1], dtype=np.int32)
+    tfs = np.empty(offsets[-1], dtype=np.float32)
+    for term_id, plist in postings.items():
+        lo = offsets[term_id]
+        docs[lo:lo + len(plist)] = [d for d, _ in plist]
+        tfs[lo:lo + len(plist)] = [tf for _, tf in plist]
+    doc_len = np.array([sum(t.values()) for t in doc_terms], dtype=np.float32)
+
+    os.makedirs(index_dir, exist_ok=True)
+    for name, arr in (("term_offsets", offsets), ("postings_doc", docs), ("postings_tf", tfs), ("doc_len", doc_len)):
+        np.save(os.path.join(index_dir, f"{name}.npy"), arr)
+    for name, payload in (("vocab", vocab), ("passages", passages)):
+        with open(os.path.join(index_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+    manifest = {"version": FORMAT_VERSION, "corpus_sha256": _corpus_hash(corpus_dir),
+                "passages": len(passages), "terms": len(vocab), "postings": int(offsets[-1])}
+    # written last: an interrupted build is never picked up as valid
+    with open(os.path.join(index_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    return {**manifest, "seconds": round(time.perf_counter() - start, 3)}
+
+
+class KnowledgeBase:
+    """BM25 search over a built index; the postings arrays are memory-mapped read-only."""
+
+    def __init__(self, index_dir: str = INDEX_DIR):
+        def array(name):
+            return np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r")
+
+        self.term_offsets = array("term_offsets")
+        self.postings_doc = array("postings_doc")
+        self.postings_tf = array("postings_tf")
+        self.doc_len = np.asarray(array("doc_len"))
+        with open(os.path.join(index_dir, "vocab.json"), encoding="utf-8") as f:
+            self.vocab = json.load(f)
+        with open(os.path.join(index_dir, "passages.json"), encoding="utf-8") as f:
+            self.passages = json.load(f)
+        self.avg_len = float(self.doc_len.mean())
+        self._norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_len / self.avg_len)
+
+    def search(self, query: str, k: int = 3):
+        """Top ``k`` ``(score, passage)`` pairs by BM25, best first."""
+        n = len(self.passages)
+        scores = np.zeros(n, dtype=np.float32)
+        for term in set(tokenize(query)):
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+            lo, hi = int(self.term_offsets[term_id]), int(self.term_offsets[term_id + 1])
+            docs = np.asarray(self.postings_doc[lo:hi])
+            tf = np.asarray(self.postings_tf[lo:hi])
+            idf = np.log(1.0 + (n - (hi - lo) + 0.5) / ((hi - lo) + 0.5))
+            scores[docs] += idf * tf * (BM25_K1 + 1) / (tf + self._norm[docs])
+        top = np.argsort(-scores)[:k]
+        return [(float(scores[i]), self.passages[i]) for i in top if scores[i] > 0]
+
+    def answer(self, question: str, max_passages: int = 2) -> str:
+        hits = [(s, p) for s, p in self.search(question, k=max_passages) if s >= MIN_SCORE]
+        if not hits:
+            return NO_ANSWER
+        best = hits[0][0]
+        parts = []
+        for score, passage in hits:
+            # a second passage only if it is nearly as relevant as the best one
+            if parts and score < 0.6 * best:
+                break
+            title = passage["title"] if passage["title"][-1] in ".?!" else passage["title"] + "."
+            parts.append(f"**{title}** {passage['text']}")
+        return "\n\n".join(parts) + "\n\n" + OFFLINE_NOTE
+
+
+def load_or_build(corpus_dir: str = CORPUS_DIR, index_dir: str = INDEX_DIR, log=print) -> KnowledgeBase:
+    """Memory-map the index, (re)building it first if it is missing or the corpus changed."""
+    manifest_path = os.path.join(index_dir, "manifest.json")
+    manifest = None
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    if (manifest is None or manifest.get("version") != FORMAT_VERSION
+            or manifest.get("corpus_sha256") != _corpus_hash(corpus_dir)):
+        log(f"Knowledge base index built: {build_index(corpus_dir, index_dir)}")
+    return KnowledgeBase(index_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline NeuroBot knowledge base")
+    parser.add_argument("--corpus", default=CORPUS_DIR)
+    parser.add_argument("--index", default=INDEX_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="(re)build the BM25 index")
+    p_ask = sub.add_parser("ask", help="answer a question offline")
+    p_ask.add_argument("question")
+    args = parser.parse_args()
+    if args.command == "build":
+        print(json.dumps(build_index(args.corpus, args.index), indent=2))
+    else:
+        kb = load_or_build(args.corpus, args.index)
+        start = time.perf_counter()
+        reply = kb.answer(args.question)
+        print(reply)
+        print(f"\n({(time.perf_counter() - start) * 1000:.2f} ms)")
@@ -0,0 +1,35 @@
+"""
+Dependency-free latency bookkeeping shared by all inference backends.
+"""
+import threading
+from collections import deque
+
+import numpy as np
+
+
+class LatencyStats:
+    """First-request vs steady-state latency, kept over a rolling window."""
+
+    def __init__(self, window: int = 1000):
+        self.first_request_ms = None
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, ms: float) -> None:
+        with self._lock:
+            if self.first_request_ms is None:
+                self.first_request_ms = ms
+            else:
+                self._samples.append(ms)
+
+    def summary(self) -> dict:
+        with self._lock:
+            samples = np.array(self._samples, dtype=np.float64)
+        out = {"first_request_ms": self.first_request_ms, "steady_state_count": int(samples.size)}
+        if samples.size:
+            out.update({
+                "steady_state_p50_ms": float(np.percentile(samples, 50)),
+                "steady_state_p99_ms": float(np.percentile(samples, 99)),
+                "steady_state_mean_ms": float(samples.mean()),
+            })
+        return out
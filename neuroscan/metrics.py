@@ -0,0 +1,216 @@
+"""
+Lightweight per-stage timing and counters (stdlib + no extra dependencies).
+
+    from neuroscan import metrics
+
+    with metrics.timed("decode"):
+        ...
+    metrics.inc("cache_hits")
+
+Durations go into fixed-bucket histograms (one per stage), counters into plain integers,
+both process-wide. ``render_prometheus`` returns the Prometheus text exposition format,
+served on ``GET /metrics`` by ``start_http_server`` (and by the inference service) or
+written periodically to a file by ``start_textfile_writer`` for a node-exporter textfile
+collector.
+
+Set ``NEUROSCAN_METRICS=0`` to disable: ``timed`` then hands back one shared no-op context
+manager and ``observe`` / ``inc`` return immediately, so instrumented hot paths cost a
+function call and an attribute check.
+"""
+import bisect
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# seconds, roughly x2.5 apart: 0.1 ms (a resize) .. 30 s (a slow chat call)
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram (seconds), Prometheus style."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate by linear interpolation inside the bucket holding the ``q`` quantile."""
+        if not self.count:
+            return float("nan")
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+
+class _Timer:
+    __slots__ = ("_registry", "_stage", "_start")
+
+    def __init__(self, registry, stage):
+        self._registry = registry
+        self._stage = stage
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._registry.observe(self._stage, time.perf_counter() - self._start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = True, prefix: str = "neuroscan", buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def timed(self, stage: str):
+        """Context manager recording the duration of the block under ``stage``."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, stage)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            hist = self._histograms.get(stage)
+            if hist is None:
+                hist = self._histograms[stage] = Histogram(self.buckets)
+            hist.observe(seconds)
+
+    def inc(self, name: str, n: int = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> dict:
+        """Per-stage count / mean / estimated p50, p95, p99 (ms) and all counters."""
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": h.count,
+                    "mean_ms": h.sum / h.count * 1000.0,
+                    "p50_ms": h.quantile(0.50) * 1000.0,
+                    "p95_ms": h.quantile(0.95) * 1000.0,
+                    "p99_ms": h.quantile(0.99) * 1000.0,
+                }
+                for stage, h in sorted(self._histograms.items())
+            }
+            counters = dict(sorted(self._counters.items()))
+        return {"enabled": self.enabled, "stages": stages, "counters": counters}
+
+    def render_prometheus(self) -> str:
+        name = f"{self.prefix}_stage_duration_seconds"
+        lines = [f"# HELP {name} Wall time per processing stage.", f"# TYPE {name} histogram"]
+        with self._lock:
+            for stage, h in sorted(self._histograms.items()):
+                cumulative = 0
+                for upper, n in zip(self.buckets + (float("inf"),), h.counts):
+                    cumulative += n
+                    le = "+Inf" if upper == float("inf") else repr(upper)
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {h.sum!r}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {h.count}')
+            for counter, value in sorted(self._counters.items()):
+                metric = f"{self.prefix}_{counter}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str) -> None:
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp, path)
+
+
+registry = MetricsRegistry(
+    enabled=os.environ.get("NEUROSCAN_METRICS", "1").lower() not in ("0", "false", "no", "off"))
+
+
+def timed(stage: str):
+    return registry.timed(stage)
+
+
+def observe(stage: str, seconds: float) -> None:
+    registry.observe(stage, seconds)
+
+
+def inc(name: str, n: int = 1) -> None:
+    registry.inc(name, n)
+
+
+# --- Exporters ---
+def start_http_server(port: int, host: str = "127.0.0.1", metrics: MetricsRegistry = None) -> ThreadingHTTPServer:
+    """Serve ``GET /metrics`` from a daemon thread; returns the server (call ``shutdown()`` to stop)."""
+    metrics = metrics or registry
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="neuroscan-metrics").start()
+    return server
+
+
+def start_textfile_writer(path: str, interval_s: float = 15.0, metrics: MetricsRegistry = None) -> threading.Event:
+    """Rewrite ``path`` every ``interval_s`` seconds; set the returned event to stop."""
+    metrics = metrics or registry
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(interval_s):
+            metrics.write_textfile(path)
+
+    threading.Thread(target=loop, daemon=True, name="neuroscan-metrics-file").start()
+    return stop
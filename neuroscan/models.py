@@ -0,0 +1,80 @@
+"""
+Model definitions shared by the notebook, the training driver, the sweep runner and the
+model zoo (``neuroscan.zoo``).
+
+The original architecture flattens a 30x30x64 feature map into ``Dense(64)``, so almost all
+of its ~3.7M parameters (and its weight-load time) sit in that one layer. The other
+variants replace Flatten -> Dense with a global-average-pooling head, optionally use
+depthwise-separable convolutions, and some run on a smaller input.
+"""
+from tensorflow.keras.models import Sequential
+from tensorflow.keras.layers import (
+    Conv2D, MaxPooling2D, Flatten, Dense, Dropout, SeparableConv2D, GlobalAveragePooling2D,
+)
+
+from neuroscan import IMG_SIZE, CLASS_NAMES
+
+
+def build_cnn(img_size: int = IMG_SIZE, filters=(32, 64), dense_units: int = 64, dropout: float = 0.5,
+              num_classes: int = len(CLASS_NAMES)):
+    """The original NeuroScan CNN (Conv 32 -> Conv 64 -> Dense 64 -> Dropout 0.5 -> Dense 3) with knobs."""
+    layers = []
+    for i, f in enumerate(filters):
+        kwargs = {"input_shape": (img_size, img_size, 1)} if i == 0 else {}
+        layers.append(Conv2D(f, (3, 3), activation='relu', **kwargs))
+        layers.append(MaxPooling2D(pool_size=(2, 2)))
+    layers += [
+        Flatten(),
+        Dense(dense_units, activation='relu'),
+        Dropout(dropout),
+        Dense(num_classes, activation='softmax'),
+    ]
+    return Sequential(layers)
+
+
+def build_gap_cnn(img_size: int = IMG_SIZE, filters=(32, 64, 128), dropout: float = 0.3,
+                  num_classes: int = len(CLASS_NAMES)):
+    """Conv blocks -> GlobalAveragePooling2D -> Dense 3: no large dense layer."""
+    layers = []
+    for i, f in enumerate(filters):
+        kwargs = {"input_shape": (img_size, img_size, 1)} if i == 0 else {}
+        layers.append(Conv2D(f, (3, 3), activation='relu', padding='same', **kwargs))
+        layers.append(MaxPooling2D(pool_size=(2, 2)))
+    layers += [GlobalAveragePooling2D(), Dropout(dropout), Dense(num_classes, activation='softmax')]
+    return Sequential(layers)
+
+
+def build_separable_cnn(img_size: int = IMG_SIZE, filters=(32, 64, 128), dropout: float = 0.3,
+                        num_classes: int = len(CLASS_NAMES)):
+    """Like ``build_gap_cnn`` but every conv after the first is depthwise-separable."""
+    layers = [
+        Conv2D(filters[0], (3, 3), activation='relu', padding='same', input_shape=(img_size, img_size, 1)),
+        MaxPooling2D(pool_size=(2, 2)),
+    ]
+    for f in filters[1:]:
+        layers.append(SeparableConv2D(f, (3, 3), activation='relu', padding='same'))
+        layers.append(MaxPooling2D(pool_size=(2, 2)))
+    layers += [GlobalAveragePooling2D(), Dropout(dropout), Dense(num_classes, activation='softmax')]
+    return Sequential(layers)
+
+
+MODEL_VARIANTS = {
+    "baseline": {"builder": build_cnn, "img_size": 128,
+                 "description": "original Conv 32 -> Conv 64 -> Flatten -> Dense 64 CNN"},
+    "gap": {"builder": build_gap_cnn, "img_size": 128,
+            "description": "3 conv blocks with a global-average-pooling head"},
+    "gap_96": {"builder": build_gap_cnn, "img_size": 96,
+               "description": "gap variant on 96x96 input"},
+    "separable": {"builder": build_separable_cnn, "img_size": 128,
+                  "description": "depthwise-separable convs with a global-average-pooling head"},
+    "separable_64": {"builder": build_separable_cnn, "img_size": 64,
+                     "description": "separable variant on 64x64 input"},
+}
+
+
+def build_variant(name: str, **kwargs):
+    """Build a model-zoo variant by name (see ``MODEL_VARIANTS``)."""
+    if name not in MODEL_VARIANTS:
+        raise ValueError(f"Unknown model variant '{name}'. Choose one of: {', '.join(MODEL_VARIANTS)}")
+    spec = MODEL_VARIANTS[name]
+    return spec["builder"](kwargs.pop("img_size", spec["img_size"]), **kwargs)
@@ -0,0 +1,162 @@
+"""
+Single preprocessing implementation shared by training (code.ipynb) and serving (app,
+CLI, inference service).
+
+Training used ``cv2.imread(IMREAD_GRAYSCALE)`` + ``cv2.resize`` + ``/ 255.0`` while the app
+used PIL ``convert("L")`` + ``cv2.resize`` + ``/ 255.0``; both produced float64. Everything
+now goes through ``decode_scan`` (bytes -> ``IMG_SIZE x IMG_SIZE`` uint8) and ``normalize``
+(uint8 -> float32 in [0, 1]), with a scalar (``preprocess``) and a batched
+(``preprocess_batch``) API that give bit-identical results.
+
+tests/test_preprocessing.py checks the pipeline against both legacy paths on the bundled
+images.
+"""
+import io
+import os
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from neuroscan import IMG_SIZE, metrics
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+CATEGORIES = ["no", "yes", "unsupported"]  # label index = position, as in training
+
+# ~7000 x 7000; far beyond any real MRI export
+MAX_PIXELS = int(os.environ.get("NEUROSCAN_MAX_PIXELS", 50_000_000))
+
+_SCALE = np.float32(1.0 / 255.0)
+
+
+class ImageTooLarge(ValueError):
+    pass
+
+
+def is_image_name(name: str) -> bool:
+    return name.lower().endswith(IMAGE_EXTENSIONS) and not os.path.basename(name).startswith(".")
+
+
+# --- Decoding ---
+def _open_checked(data: bytes, max_pixels: int) -> Image.Image:
+    # Image.open only parses the header; nothing is decoded yet
+    try:
+        image = Image.open(io.BytesIO(data))
+    except Image.DecompressionBombError as e:
+        raise ImageTooLarge(str(e)) from None
+    width, height = image.size
+    if width * height > max_pixels:
+        raise ImageTooLarge(f"image is {width}x{height} ({width * height} px), limit is {max_pixels} px")
+    return image
+
+
+def decode_image(data: bytes, max_pixels: int = MAX_PIXELS) -> Image.Image:
+    """Decode raw upload bytes into a full-resolution grayscale PIL image (for display)."""
+    return _open_checked(data, max_pixels).convert("L")
+
+
+def decode_scan(data: bytes, img_size: int = IMG_SIZE, max_pixels: int = MAX_PIXELS,
+                draft_factor: int = 2) -> np.ndarray:
+    """
+    Decode raw upload bytes straight to the model's ``img_size x img_size`` uint8 grayscale array.
+
+    JPEGs are decoded at the smallest DCT scale that still leaves at least
+    ``draft_factor * img_size`` pixels per side, in grayscale, so a large export is never
+    materialized at full size. The only intermediate copy is the reduced decode itself.
+    ``draft_factor=0`` decodes at full size.
+    """
+    with metrics.timed("decode"):
+        image = _open_checked(data, max_pixels)
+        if image.format == "JPEG" and draft_factor:
+            image.draft("L", (img_size * draft_factor, img_size * draft_factor))
+        if image.mode != "L":
+            image = image.convert("L")
+        arr = np.asarray(image)
+    if arr.shape != (img_size, img_size):
+        with metrics.timed("resize"):
+            arr = cv2.resize(arr, (img_size, img_size))
+    return arr
+
+
+def load_scan(path: str, img_size: int = IMG_SIZE) -> np.ndarray:
+    """Read and decode one scan from disk (same code path as an upload)."""
+    with open(path, "rb") as f:
+        return decode_scan(f.read(), img_size)
+
+
+# --- Resize / normalize ---
+def prepare_image(image, img_size: int = IMG_SIZE) -> np.ndarray:
+    """Convert a decoded scan (PIL image or array) to a ``img_size x img_size`` uint8 grayscale array."""
+    arr = np.asarray(image)
+    if arr.ndim == 3:
+        # RGB(A) input -> grayscale, same as PIL convert("L")
+        code = cv2.COLOR_RGBA2GRAY if arr.shape[2] == 4 else cv2.COLOR_RGB2GRAY
+        arr = cv2.cvtColor(arr, code)
+    if arr.dtype != np.uint8:
+        arr = arr.astype(np.uint8)
+    if arr.shape != (img_size, img_size):
+        arr = cv2.resize(arr, (img_size, img_size))
+    return arr
+
+
+def normalize(pixels: np.ndarray) -> np.ndarray:
+    """uint8 pixels (any shape) -> float32 in [0, 1]."""
+    out = np.asarray(pixels, dtype=np.float32)
+    if out is pixels:
+        out = out.copy()
+    out *= _SCALE
+    return out
+
+
+def preprocess(image, img_size: int = IMG_SIZE) -> np.ndarray:
+    """Scalar API: one decoded scan -> ``(img_size, img_size, 1)`` float32 model input."""
+    return normalize(prepare_image(image, img_size))[:, :, None]
+
+
+def preprocess_batch(images, img_size: int = IMG_SIZE) -> np.ndarray:
+    """
+    Batched API: N decoded scans (list, or an ``(N, H, W)`` uint8 array) -> one contiguous
+    ``(N, img_size, img_size, 1)`` float32 tensor in [0, 1].
+    """
+    if isinstance(images, np.ndarray) and images.dtype == np.uint8 and images.shape[1:3] == (img_size, img_size):
+        # already model-sized pixels (e.g. a memory-mapped shard): one vectorized convert
+        return normalize(images.reshape(len(images), img_size, img_size, 1))
+    batch = np.empty((len(images), img_size, img_size, 1), dtype=np.float32)
+    for i, image in enumerate(images):
+        batch[i, :, :, 0] = prepare_image(image, img_size)
+    batch *= _SCALE
+    return batch
+
+
+# --- Dataset helpers (training / evaluation / calibration) ---
+def list_dataset(data_dir: str = "dataset"):
+    """``(paths, labels)`` for ``data_dir/{no,yes,unsupported}``, sorted for reproducibility."""
+    paths, labels = [], []
+    for label, category in enumerate(CATEGORIES):
+        folder = os.path.join(data_dir, category)
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            if is_image_name(name):
+                paths.append(os.path.join(folder, name))
+                labels.append(label)
+    return paths, np.array(labels, dtype=np.int64)
+
+
+def load_dataset(data_dir: str = "dataset", img_size: int = IMG_SIZE):
+    """
+    Decode every scan under ``data_dir`` -> ``(pixels, labels, skipped)`` where ``pixels`` is an
+    ``(N, img_size, img_size)`` uint8 array. Unreadable files are reported in ``skipped``
+    instead of being silently dropped.
+    """
+    paths, labels = list_dataset(data_dir)
+    pixels = np.empty((len(paths), img_size, img_size), dtype=np.uint8)
+    keep = np.zeros(len(paths), dtype=bool)
+    skipped = []
+    for i, path in enumerate(paths):
+        try:
+            pixels[i] = load_scan(path, img_size)
+            keep[i] = True
+        except Exception as e:
+            skipped.append((path, str(e)))
+    return pixels[keep], labels[keep], skipped
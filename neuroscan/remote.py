@@ -0,0 +1,52 @@
+"""
+Client for the micro-batching inference service (neuroscan.server).
+
+``RemoteModel`` has the same ``predict_on_batch`` / ``stats`` contract as the local
+backends, so the app can point at a shared service instead of loading the model in every
+Streamlit worker. Scans are sent already resized as raw uint8 pixels (16 KB per scan).
+"""
+import json
+import time
+import urllib.request
+
+import numpy as np
+
+from neuroscan import IMG_SIZE
+from neuroscan.latency import LatencyStats
+from neuroscan.server import RAW_BATCH_CONTENT_TYPE
+
+
+class RemoteModel:
+    name = "remote"
+
+    def __init__(self, url: str = "http://127.0.0.1:8765", timeout: float = 30.0):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.latency = LatencyStats()
+        self.warmup_ms = {}
+        health = self._get("/healthz")
+        self.model_version = health.get("model_version", "")
+        self.img_size = int(health.get("img_size", IMG_SIZE))
+
+    def _get(self, path: str) -> dict:
+        with urllib.request.urlopen(self.url + path, timeout=self.timeout) as r:
+            return json.loads(r.read())
+
+    def predict_on_batch(self, batch) -> np.ndarray:
+        batch = np.asarray(batch, dtype=np.float32)
+        # inputs are uint8 / 255, so this round trip is lossless
+        pixels = np.rint(batch[..., 0] * 255.0).clip(0, 255).astype(np.uint8)
+        request = urllib.request.Request(
+            self.url + "/predict/batch",
+            data=pixels.tobytes(),
+            headers={"Content-Type": RAW_BATCH_CONTENT_TYPE},
+            method="POST",
+        )
+        start = time.perf_counter()
+        with urllib.request.urlopen(request, timeout=self.timeout) as r:
+            payload = json.loads(r.read())
+        self.latency.record((time.perf_counter() - start) * 1000.0)
+        return np.asarray(payload["probabilities"], dtype=np.float32).reshape(len(batch), -1)
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "warmup_ms": {}, **self.latency.summary()}
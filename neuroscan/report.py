@@ -0,0 +1,52 @@
+"""
+Result presentation shared by the app and the benchmark suite: the tumor-probability gauge
+and the downloadable text report.
+"""
+import numpy as np
+
+from neuroscan import CLASS_NAMES
+
+
+def gauge_figure(tumor_prob: float):
+    """Plotly gauge of the tumor probability (0-1) as shown next to an uploaded scan."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=tumor_prob*100,
+        title={'text': "Tumor Probability (%)"},
+        gauge={'axis': {'range': [0, 100]},
+               'bar': {'color': "crimson"},
+               'steps': [
+                   {'range': [0, 40], 'color': "green"},
+                   {'range': [40, 70], 'color': "orange"},
+                   {'range': [70, 100], 'color': "red"}]}))
+    fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", font={'color':"white"})
+    return fig
+
+
+def generate_report(prediction_probs, class_names=CLASS_NAMES) -> str:
+    predicted_class = int(np.argmax(prediction_probs))
+    confidence = float(prediction_probs[predicted_class] * 100)
+
+    if predicted_class == 2:  # Unsupported
+        return "Image is not a valid MRI scan. Please upload a proper MRI scan for analysis."
+
+    report = "NeuroScan AI Brain Tumor Detection Report\n"
+    report += "---------------------------------------\n"
+    report += f"Prediction: {class_names[predicted_class]}\n"
+    report += f"Confidence: {confidence:.2f}%\n\n"
+    if predicted_class == 1:  # Tumor detected
+        report += (
+            "Findings: \n"
+            "The AI model detected a brain tumor in the provided MRI scan with a high confidence level.\n"
+            "It is highly recommended to consult a qualified radiologist or neurologist for further evaluation.\n"
+            "This report serves as a support tool and does not replace professional medical diagnosis.\n"
+        )
+    else:
+        report += "Findings: \n"
+        report += "No brain tumor was detected in the MRI scan based on current AI model analysis.\n"
+
+    report += "\nThank you for using NeuroScan AI."
+
+    return report
@@ -0,0 +1,210 @@
+"""
+Standalone asyncio HTTP inference service with dynamic micro-batching (stdlib only).
+
+    python -m neuroscan serve --port 8765 --max-batch-size 32 --max-wait-ms 5
+
+Concurrent requests are queued and coalesced into one model call per batch, bounded by
+``max_batch_size`` and a ``max_wait_ms`` deadline measured from the first queued scan, so a
+lone request waits at most ``max_wait_ms`` while a burst shares a single forward pass.
+
+Endpoints
+    POST /predict         body = encoded jpg/png bytes -> {"prediction", "probabilities"}
+    POST /predict/batch   body = N x IMG_SIZE x IMG_SIZE raw uint8 pixels
+                          (Content-Type application/x-neuroscan-uint8) -> {"probabilities": [[...], ...]}
+    GET  /healthz         liveness + model version
+    GET  /stats           batching and latency counters
+    GET  /metrics         per-stage histograms and counters (Prometheus text format)
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from neuroscan import IMG_SIZE, CLASS_NAMES, metrics
+from neuroscan.preprocessing import decode_scan, preprocess_batch
+
+RAW_BATCH_CONTENT_TYPE = "application/x-neuroscan-uint8"
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class MicroBatcher:
+    def __init__(self, model, max_batch_size: int = 32, max_wait_ms: float = 5.0, img_size: int = None):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.img_size = img_size or getattr(model, "img_size", IMG_SIZE)
+        self._queue = None
+        # one model thread: batches are serialized, the event loop never blocks on TensorFlow
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="neuroscan-model")
+        self.batches = 0
+        self.items = 0
+        self._latencies_ms = deque(maxlen=5000)
+        self._batch_sizes = deque(maxlen=5000)
+
+    async def submit(self, pixels: np.ndarray) -> np.ndarray:
+        """Queue one ``img_size x img_size`` uint8 scan and wait for its probability vector."""
+        if self._queue is None:
+            raise RuntimeError("MicroBatcher.run() has not been started")
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((pixels, fut, time.perf_counter()))
+        return await fut
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def run(self) -> None:
+        self._queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            x = preprocess_batch(np.stack([pixels for pixels, _, _ in batch]), self.img_size)
+            try:
+                probs = await loop.run_in_executor(self._executor, self.model.predict_on_batch, x)
+            except Exception as e:
+                for _, fut, _ in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+
+            now = time.perf_counter()
+            self.batches += 1
+            self.items += len(batch)
+            self._batch_sizes.append(len(batch))
+            for (_, fut, queued_at), p in zip(batch, probs):
+                self._latencies_ms.append((now - queued_at) * 1000.0)
+                if not fut.done():
+                    fut.set_result(np.asarray(p, dtype=np.float32))
+
+    def stats(self) -> dict:
+        lat = np.array(self._latencies_ms, dtype=np.float64)
+        out = {
+            "batches": self.batches,
+            "items": self.items,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "mean_batch_size": float(np.mean(self._batch_sizes)) if self._batch_sizes else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+        }
+        if lat.size:
+            out.update({"latency_p50_ms": float(np.percentile(lat, 50)),
+                        "latency_p99_ms": float(np.percentile(lat, 99))})
+        return out
+
+
+class InferenceServer:
+    def __init__(self, batcher: MicroBatcher, model_version: str = "", decode_workers: int = 4):
+        self.batcher = batcher
+        self.model_version = model_version
+        self._decode_pool = ThreadPoolExecutor(max_workers=decode_workers, thread_name_prefix="neuroscan-decode")
+
+    def _decode(self, data: bytes) -> np.ndarray:
+        return decode_scan(data, self.batcher.img_size)
+
+    async def _route(self, method: str, path: str, headers: dict, body: bytes):
+        path = path.split("?", 1)[0]
+        if path == "/healthz":
+            return 200, {"status": "ok", "model_version": self.model_version, "img_size": self.batcher.img_size}
+        if path == "/stats":
+            return 200, {"model_version": self.model_version, **self.batcher.stats()}
+        if path == "/metrics":
+            return 200, metrics.registry.render_prometheus()
+        if path not in ("/predict", "/predict/batch"):
+            return 404, {"error": f"unknown path {path}"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        if not body:
+            return 400, {"error": "empty body"}
+
+        if path == "/predict/batch" or headers.get("content-type", "").startswith(RAW_BATCH_CONTENT_TYPE):
+            pixels_per_scan = self.batcher.img_size * self.batcher.img_size
+            if len(body) % pixels_per_scan:
+                return 400, {"error": f"body is not a multiple of {self.batcher.img_size}x{self.batcher.img_size} uint8 scans"}
+            scans = np.frombuffer(body, dtype=np.uint8).reshape(-1, self.batcher.img_size, self.batcher.img_size)
+            probs = await asyncio.gather(*(self.batcher.submit(s) for s in scans))
+            return 200, {"probabilities": [[float(v) for v in p] for p in probs]}
+
+        try:
+            pixels = await asyncio.get_running_loop().run_in_executor(self._decode_pool, self._decode, body)
+        except Exception as e:
+            return 400, {"error": f"could not decode image: {e}"}
+        p = await self.batcher.submit(pixels)
+        return 200, {
+            "prediction": CLASS_NAMES[int(np.argmax(p))],
+            "probabilities": {name: float(v) for name, v in zip(CLASS_NAMES, p)},
+        }
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", "0"))
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                if length > MAX_BODY_BYTES:
+                    status, payload, keep_alive = 413, {"error": "request body too large"}, False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    try:
+                        status, payload = await self._route(method.upper(), path, headers, body)
+                    except Exception as e:
+                        status, payload = 500, {"error": str(e)}
+
+                if isinstance(payload, str):
+                    data, content_type = payload.encode("utf-8"), metrics.CONTENT_TYPE
+                else:
+                    data, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(model, host: str = "127.0.0.1", port: int = 8765, max_batch_size: int = 32,
+                max_wait_ms: float = 5.0, model_version: str = "") -> None:
+    batcher = MicroBatcher(model, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    server = InferenceServer(batcher, model_version=model_version)
+    batch_task = asyncio.create_task(batcher.run())
+    tcp = await asyncio.start_server(server.handle, host, port)
+    print(f"NeuroScan inference service listening on http://{host}:{port} "
+          f"(max batch {max_batch_size}, max wait {max_wait_ms} ms)", flush=True)
+    try:
+        async with tcp:
+            await tcp.serve_forever()
+    finally:
+        batch_task.cancel()
@@ -0,0 +1,46 @@
+"""
+Compiled, warmed-up serving wrapper around the Keras classifier.
+
+``model.predict`` retraces / rebuilds its execution function lazily, so the first scan
+after every deploy pays graph tracing and allocation costs. ``ServingModel`` traces one
+concrete ``tf.function`` per padded batch size (fixed ``H x W x 1`` input from the model)
+up front, runs warm-up passes at load time, and pads each request up to the nearest
+bucket so no request ever triggers a retrace.
+"""
+import tensorflow as tf
+
+from neuroscan import IMG_SIZE
+from neuroscan.backends import BucketedBackend, DEFAULT_BATCH_SIZES
+
+
+class ServingModel(BucketedBackend):
+    name = "keras"
+
+    def __init__(self, model, batch_sizes=DEFAULT_BATCH_SIZES, img_size: int = None, warmup: bool = True):
+        # model-zoo variants can use a smaller input than IMG_SIZE
+        img_size = img_size or model.input_shape[1] or IMG_SIZE
+        super().__init__(batch_sizes=batch_sizes, img_size=img_size)
+        self.model = model
+
+        @tf.function
+        def _serve(x):
+            return model(x, training=False)
+
+        self._concrete = {
+            b: _serve.get_concrete_function(tf.TensorSpec([b, img_size, img_size, 1], tf.float32))
+            for b in self.batch_sizes
+        }
+        if warmup:
+            self.warmup()
+
+    def _forward(self, batch):
+        return self._concrete[len(batch)](tf.constant(batch, dtype=tf.float32)).numpy()
+
+
+def load_serving_model(model_path: str, batch_sizes=DEFAULT_BATCH_SIZES, warmup: bool = True) -> ServingModel:
+    from neuroscan.zoo import resolve_model_path
+
+    from tensorflow.keras.models import load_model
+
+    model_path = resolve_model_path(model_path)
+    return ServingModel(load_model(model_path, compile=False), batch_sizes=batch_sizes, warmup=warmup)
@@ -0,0 +1,277 @@
+"""
+Incremental on-disk cache of the preprocessed dataset.
+
+    python -m neuroscan.shards --data dataset --cache-dir dataset_cache
+
+writes every scan as a ``IMG_SIZE x IMG_SIZE`` uint8 row of one memory-mappable ``.npy``
+shard plus a ``manifest.json`` (path, size, mtime, content hash, label, row). Later runs
+only decode files that are new or changed - unchanged files are recognised by size + mtime,
+touched-but-identical or renamed files by their sha256 - and copy the other rows over from
+the previous shard. Unreadable files are recorded in the manifest as ``failed`` and skipped
+until they change, so one corrupt JPEG does not force a rewrite on every run. Training and
+evaluation then ``load_shard`` it as a read-only memmap instead of touching the JPEGs.
+
+For datasets larger than RAM, ``iter_shard_batches`` streams the shard in fixed-size chunks
+of contiguous rows read into one reused buffer, so peak memory is set by a configurable
+budget rather than by the dataset size (normalization to float32 happens per batch).
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from neuroscan import IMG_SIZE
+from neuroscan.cache import file_fingerprint
+from neuroscan.preprocessing import CATEGORIES, list_dataset, load_scan
+
+SHARD_FILE = "pixels.npy"
+MANIFEST_FILE = "manifest.json"
+FORMAT_VERSION = 1
+DECODE_CHUNK = 1024
+
+
+def read_manifest(cache_dir: str, img_size: int = IMG_SIZE):
+    """The existing manifest, or None if missing / built with different settings."""
+    path = os.path.join(cache_dir, MANIFEST_FILE)
+    if not os.path.exists(path) or not os.path.exists(os.path.join(cache_dir, SHARD_FILE)):
+        return None
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != FORMAT_VERSION or manifest.get("img_size") != img_size:
+        return None
+    return manifest
+
+
+def _write_atomic_json(path: str, payload: dict) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=1)
+    os.replace(tmp, path)
+
+
+def build_shard(data_dir: str = "dataset", cache_dir: str = "dataset_cache", img_size: int = IMG_SIZE,
+                workers: int = None, log=print) -> dict:
+    """Create or incrementally update the shard for ``data_dir``. Returns a summary of what was done."""
+    start = time.perf_counter()
+    os.makedirs(cache_dir, exist_ok=True)
+    shard_path = os.path.join(cache_dir, SHARD_FILE)
+
+    old = read_manifest(cache_dir, img_size)
+    old_entries = {e["path"]: e for e in old["entries"]} if old else {}
+    old_by_hash = {e["sha256"]: e for e in old["entries"]} if old else {}
+    old_failed = {e["path"]: e for e in old.get("failed", [])} if old else {}
+    old_pixels = np.load(shard_path, mmap_mode="r") if old else None
+
+    # 1. decide per file: reuse an existing row, skip a known-unreadable file, or decode
+    plan = []
+    known_failed = []
+    paths, labels = list_dataset(data_dir)
+    for path, label in zip(paths, labels):
+        rel = os.path.relpath(path, data_dir).replace(os.sep, "/")
+        st = os.stat(path)
+        bad = old_failed.get(rel)
+        if bad and bad["size"] == st.st_size and bad["mtime_ns"] == st.st_mtime_ns:
+            known_failed.append(bad)
+            continue
+        prev = old_entries.get(rel)
+        if prev and prev["size"] == st.st_size and prev["mtime_ns"] == st.st_mtime_ns:
+            digest, source = prev["sha256"], prev["index"]
+        else:
+            digest = file_fingerprint(path)
+            match = old_by_hash.get(digest)
+            source = match["index"] if match else None
+        entry = {"path": rel, "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                 "sha256": digest, "label": int(label), "category": CATEGORIES[int(label)]}
+        plan.append((path, entry, source))
+
+    # nothing new, changed or removed: keep the shard file as is (safe for concurrent readers)
+    unchanged = (old is not None and len(plan) == len(old["entries"])
+                 and all(source == row for row, (_, _, source) in enumerate(plan)))
+    if unchanged:
+        del old_pixels
+        entries = [{**entry, "index": row} for row, (_, entry, _) in enumerate(plan)]
+        if entries != old["entries"] or known_failed != old.get("failed", []):
+            # only metadata (e.g. mtimes of touched files, deleted unreadable files) moved
+            _write_atomic_json(os.path.join(cache_dir, MANIFEST_FILE),
+                               {**old, "entries": entries, "failed": known_failed})
+        return {"total": len(entries), "decoded": 0, "reused": len(entries), "removed": 0,
+                "failed": len(known_failed), "seconds": round(time.perf_counter() - start, 3)}
+
+    # 2. write rows straight into the new shard: reused rows are copied from the old one,
+    #    new / changed files are decoded in parallel in bounded chunks (memory stays flat).
+    #    Temp files are per process, so concurrent builders never write into each other's file.
+    tmp_path = f"{shard_path}.{os.getpid()}.tmp.npy"
+    pixels = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.uint8, shape=(len(plan), img_size, img_size))
+    for row, (_, _, source) in enumerate(plan):
+        if source is not None:
+            pixels[row] = old_pixels[source]
+
+    todo = [i for i, (_, _, source) in enumerate(plan) if source is None]
+
+    def decode(i):
+        try:
+            return load_scan(plan[i][0], img_size), None
+        except Exception as e:
+            return None, str(e)
+
+    ok = np.ones(len(plan), dtype=bool)
+    failed = []
+    with ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 1) + 4)) as pool:
+        for chunk_start in range(0, len(todo), DECODE_CHUNK):
+            chunk = todo[chunk_start:chunk_start + DECODE_CHUNK]
+            for i, (arr, err) in zip(chunk, pool.map(decode, chunk)):
+                if err is None:
+                    pixels[i] = arr
+                else:
+                    ok[i] = False
+                    failed.append((i, err))
+    for i, err in failed:
+        log(f"Skipping unreadable scan {plan[i][0]}: {err}")
+    del old_pixels
+
+    # 3. drop rows of unreadable files (rare) by compacting, then swap the new shard in
+    keep = np.flatnonzero(ok)
+    if len(keep) != len(plan):
+        compact_path = f"{shard_path}.{os.getpid()}.compact.npy"
+        compact = np.lib.format.open_memmap(compact_path, mode="w+", dtype=np.uint8,
+                                            shape=(len(keep), img_size, img_size))
+        for chunk_start in range(0, len(keep), DECODE_CHUNK):
+            rows = keep[chunk_start:chunk_start + DECODE_CHUNK]
+            compact[chunk_start:chunk_start + len(rows)] = pixels[rows]
+        compact.flush()
+        del compact, pixels
+        os.replace(compact_path, tmp_path)
+    else:
+        pixels.flush()
+        del pixels
+    os.replace(tmp_path, shard_path)
+    entries = [{**plan[i][1], "index": row} for row, i in enumerate(keep)]
+    failed_entries = known_failed + [
+        {"path": plan[i][1]["path"], "size": plan[i][1]["size"], "mtime_ns": plan[i][1]["mtime_ns"],
+         "failed": True, "error": err}
+        for i, err in failed
+    ]
+
+    summary = {
+        "total": len(entries),
+        "decoded": len(todo) - len(failed),
+        "reused": len(entries) - (len(todo) - len(failed)),
+        "removed": len(set(old_entries) - {e["path"] for e in entries} - {e["path"] for e in failed_entries}),
+        "failed": len(failed_entries),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    _write_atomic_json(os.path.join(cache_dir, MANIFEST_FILE), {
+        "version": FORMAT_VERSION,
+        "img_size": img_size,
+        "data_dir": os.path.abspath(data_dir),
+        "shard": SHARD_FILE,
+        "entries": entries,
+        "failed": failed_entries,
+    })
+    return summary
+
+
+def load_shard(cache_dir: str = "dataset_cache", img_size: int = IMG_SIZE):
+    """``(pixels, labels, manifest)`` with ``pixels`` a read-only ``(N, H, W)`` uint8 memmap (zero copy)."""
+    manifest = read_manifest(cache_dir, img_size)
+    if manifest is None:
+        raise FileNotFoundError(f"No dataset shard in {cache_dir} - run `python -m neuroscan.shards` first")
+    pixels = np.load(os.path.join(cache_dir, manifest["shard"]), mmap_mode="r")
+    labels = np.array([e["label"] for e in manifest["entries"]], dtype=np.int64)
+    return pixels, labels, manifest
+
+
+def load_or_build(data_dir: str = "dataset", cache_dir: str = "dataset_cache", img_size: int = IMG_SIZE, log=print):
+    """Bring the shard up to date with ``data_dir`` (cheap when nothing changed) and memory-map it."""
+    summary = build_shard(data_dir, cache_dir, img_size, log=log)
+    if summary["decoded"] or summary["removed"]:
+        log(f"Dataset cache updated: {summary}")
+    return load_shard(cache_dir, img_size)
+
+
+def rows_for_budget(memory_budget_mb: float, batch_size: int, img_size: int = IMG_SIZE, prefetch: int = 2) -> int:
+    """
+    Rows per streamed chunk that fit ``memory_budget_mb``: the reused uint8 read buffer and
+    the shuffled selection taken from it (2 x chunk), plus ``prefetch + 1`` float32 batches
+    in flight downstream.
+    """
+    row_bytes = img_size * img_size
+    batches_bytes = (prefetch + 1) * batch_size * row_bytes * 4
+    available = memory_budget_mb * 1024 * 1024 - batches_bytes
+    rows = int(available // (2 * row_bytes))
+    if rows < batch_size:
+        raise ValueError(f"memory budget of {memory_budget_mb} MB is too small for batch size {batch_size}")
+    return rows
+
+
+def _read_into(f, view) -> None:
+    while len(view):
+        n = f.readinto(view)
+        if not n:
+            raise EOFError("dataset shard is truncated")
+        view = view[n:]
+
+
+def iter_shard_batches(cache_dir: str = "dataset_cache", indices=None, batch_size: int = 32,
+                       memory_budget_mb: float = 256, shuffle: bool = True, seed: int = 42,
+                       img_size: int = IMG_SIZE):
+    """
+    Yield ``(pixels, labels)`` uint8 / int64 batches for rows ``indices`` (default: all) of the
+    shard, reading it chunk by chunk with plain file reads (no memmap pages pile up in RSS).
+    With ``shuffle`` the chunk order and the rows inside each chunk are shuffled.
+    """
+    manifest = read_manifest(cache_dir, img_size)
+    if manifest is None:
+        raise FileNotFoundError(f"No dataset shard in {cache_dir} - run `python -m neuroscan.shards` first")
+    shard_path = os.path.join(cache_dir, manifest["shard"])
+    header = np.load(shard_path, mmap_mode="r")
+    n, offset = header.shape[0], header.offset
+    del header
+    labels = np.array([e["label"] for e in manifest["entries"]], dtype=np.int64)
+
+    selected = np.zeros(n, dtype=bool)
+    selected[np.arange(n) if indices is None else np.asarray(indices)] = True
+    row_bytes = img_size * img_size
+    chunk_rows = min(rows_for_budget(memory_budget_mb, batch_size, img_size), max(n, 1))
+
+    rng = np.random.RandomState(seed)
+    starts = np.arange(0, n, chunk_rows)
+    if shuffle:
+        rng.shuffle(starts)
+
+    buffer = np.empty((chunk_rows, img_size, img_size), dtype=np.uint8)
+    flat = memoryview(buffer.reshape(-1))
+    carry_x = np.empty((0, img_size, img_size), dtype=np.uint8)
+    carry_y = np.empty((0,), dtype=np.int64)
+    with open(shard_path, "rb", buffering=0) as f:
+        for start in starts:
+            stop = min(start + chunk_rows, n)
+            rows = np.flatnonzero(selected[start:stop])
+            if not len(rows):
+                continue
+            f.seek(offset + int(start) * row_bytes)
+            _read_into(f, flat[:(stop - start) * row_bytes])
+            if shuffle:
+                rng.shuffle(rows)
+            x = buffer[rows]
+            y = labels[start:stop][rows]
+            if len(carry_x):
+                x, y = np.concatenate([carry_x, x]), np.concatenate([carry_y, y])
+            full = len(x) - len(x) % batch_size
+            for b in range(0, full, batch_size):
+                yield x[b:b + batch_size], y[b:b + batch_size]
+            carry_x, carry_y = x[full:], y[full:]
+    if len(carry_x):
+        yield carry_x, carry_y
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build / update the preprocessed dataset shard")
+    parser.add_argument("--data", default="dataset")
+    parser.add_argument("--cache-dir", default="dataset_cache")
+    parser.add_argument("--img-size", type=int, default=IMG_SIZE)
+    args = parser.parse_args()
+    print(json.dumps(build_shard(args.data, args.cache_dir, args.img_size), indent=2))
@@ -0,0 +1,103 @@
+"""
+Background model preloading for a fast cold start.
+
+The app creates one ``ModelPreloader`` as soon as the process starts (before the login form
+is drawn). Its thread imports the heavy modules (TensorFlow, OpenCV, Plotly, ...) and then
+loads and warms up the model while the user is still typing their password, so by the time
+the first scan is uploaded the model is usually ready and warm. ``result()`` blocks only if
+loading has not finished yet.
+
+``stats()`` reports the import time, model load time, how long a caller had to wait for the
+model and the time from process start to the first finished prediction.
+"""
+import importlib
+import threading
+import time
+
+from neuroscan import metrics
+
+# heavy third-party modules worth importing off the request path, per backend
+PRELOAD_IMPORTS = {
+    "keras": ("tensorflow", "cv2", "PIL.Image", "plotly.graph_objects"),
+    "tflite": ("cv2", "PIL.Image", "plotly.graph_objects"),
+    "onnx": ("onnxruntime", "cv2", "PIL.Image", "plotly.graph_objects"),
+    "remote": ("cv2", "PIL.Image", "plotly.graph_objects"),
+}
+
+_PROCESS_START = time.perf_counter()
+
+
+class ModelPreloader:
+    """Runs ``imports`` then ``loader()`` in a daemon thread; ``result()`` returns the loaded model."""
+
+    def __init__(self, loader, imports=(), start: bool = True):
+        self._loader = loader
+        self._imports = tuple(imports)
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._model = None
+        self._error = None
+        self.import_ms = None
+        self.load_ms = None
+        self.waited_ms = 0.0
+        self.first_prediction_ms = None
+        self._thread = threading.Thread(target=self._run, daemon=True, name="neuroscan-preload")
+        if start:
+            self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            start = time.perf_counter()
+            for name in self._imports:
+                try:
+                    importlib.import_module(name)
+                except ImportError:
+                    pass  # optional for this backend; the loader raises if it is really needed
+            loaded = time.perf_counter()
+            self.import_ms = (loaded - start) * 1000.0
+            metrics.observe("startup_import", loaded - start)
+
+            self._model = self._loader()
+            self.load_ms = (time.perf_counter() - loaded) * 1000.0
+            metrics.observe("startup_model_load", time.perf_counter() - loaded)
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._done.set()
+
+    def ready(self) -> bool:
+        return self._done.is_set()
+
+    def result(self, timeout: float = None):
+        """The loaded model; waits for the background load if needed and re-raises its error."""
+        if not self._done.is_set():
+            start = time.perf_counter()
+            if not self._thread.is_alive() and not self._thread.ident:
+                self._thread.start()
+            self._done.wait(timeout)
+            with self._lock:
+                self.waited_ms += (time.perf_counter() - start) * 1000.0
+            if not self._done.is_set():
+                raise TimeoutError("model is still loading")
+        if self._error is not None:
+            raise self._error
+        return self._model
+
+    def record_prediction(self) -> None:
+        """Call after each finished prediction; only the first one is recorded."""
+        if self.first_prediction_ms is not None:
+            return
+        with self._lock:
+            if self.first_prediction_ms is None:
+                elapsed = time.perf_counter() - _PROCESS_START
+                self.first_prediction_ms = elapsed * 1000.0
+                metrics.observe("startup_first_prediction", elapsed)
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready(),
+            "import_ms": self.import_ms,
+            "load_ms": self.load_ms,
+            "waited_ms": self.waited_ms,
+            "time_to_first_prediction_ms": self.first_prediction_ms,
+        }
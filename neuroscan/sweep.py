@@ -0,0 +1,190 @@
+"""
+Parallel hyperparameter sweep over the NeuroScan CNN.
+
+    python -m neuroscan.sweep --trials 16 --workers 4 --epochs 10 --out sweep_results.jsonl
+
+Trials (conv filters, dense width, dropout, learning rate, input size) run as separate
+worker processes that read memory-mapped preprocessed shards (``neuroscan.shards``, one per
+input size, as ``neuroscan.zoo`` uses), so the dataset is decoded once per size up front and
+shared through the page cache. A median stopping rule prunes a trial whose validation
+accuracy falls below the median of the other trials at the same epoch.
+Every finished trial is recorded with its accuracy, parameter count and measured per-scan
+CPU latency, and the accuracy/latency Pareto frontier is printed at the end.
+"""
+import argparse
+import itertools
+import json
+import multiprocessing as mp
+import os
+import random
+import time
+
+import numpy as np
+
+from neuroscan import IMG_SIZE
+
+SEARCH_SPACE = {
+    "filters": [(16, 32), (32, 64), (64, 128)],
+    "dense_units": [32, 64, 128],
+    "dropout": [0.3, 0.5],
+    "learning_rate": [3e-4, 1e-3, 3e-3],
+    "img_size": [64, 96, 128],
+}
+
+
+def sample_trials(n: int, seed: int = 42, space=SEARCH_SPACE):
+    """``n`` distinct configurations drawn from the grid (all of it if smaller)."""
+    grid = [dict(zip(space, values)) for values in itertools.product(*space.values())]
+    random.Random(seed).shuffle(grid)
+    return [{"trial": i, **cfg} for i, cfg in enumerate(grid[:n])]
+
+
+def measure_latency_ms(model, img_size: int, runs: int = 50) -> float:
+    """Median single-scan CPU latency of a direct forward call (after warm-up)."""
+    import tensorflow as tf
+
+    x = tf.zeros((1, img_size, img_size, 1), tf.float32)
+    forward = tf.function(lambda t: model(t, training=False))
+    for _ in range(5):
+        forward(x)
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        forward(x).numpy()
+        times.append((time.perf_counter() - start) * 1000.0)
+    return float(np.median(times))
+
+
+def pareto_front(results):
+    """Trials not dominated on (higher val accuracy, lower latency)."""
+    done = [r for r in results if r.get("status") == "completed"]
+    front = []
+    for r in done:
+        dominated = any(
+            o["val_accuracy"] >= r["val_accuracy"] and o["latency_ms"] <= r["latency_ms"]
+            and (o["val_accuracy"] > r["val_accuracy"] or o["latency_ms"] < r["latency_ms"])
+            for o in done
+        )
+        if not dominated:
+            front.append(r)
+    return sorted(front, key=lambda r: r["latency_ms"])
+
+
+def _shard_dir(cache_dir: str, size: int) -> str:
+    # one shard per input size, as neuroscan.zoo uses, so trials never resize or rebuild each other's cache
+    return cache_dir if size == IMG_SIZE else f"{cache_dir}_{size}"
+
+
+def _run_trial(cfg, settings, history):
+    """Worker-process entry point: train one configuration and report its metrics."""
+    import tensorflow as tf
+
+    threads = settings["threads_per_trial"]
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(max(1, threads // 2))
+
+    from neuroscan.data import build_datasets
+    from neuroscan.models import build_cnn
+
+    size = cfg["img_size"]
+    train_ds, val_ds = build_datasets(settings["data"], batch_size=settings["batch_size"],
+                                      val_fraction=settings["val_fraction"], seed=settings["seed"], img_size=size,
+                                      shard_dir=_shard_dir(settings["cache_dir"], size), augment=settings["augment"])
+
+    tf.keras.utils.set_random_seed(settings["seed"] + cfg["trial"])
+    model = build_cnn(size, filters=cfg["filters"], dense_units=cfg["dense_units"], dropout=cfg["dropout"])
+    model.compile(optimizer=tf.keras.optimizers.Adam(cfg["learning_rate"]),
+                  loss='categorical_crossentropy', metrics=['accuracy'])
+
+    trial_id = cfg["trial"]
+    pruned_at = []
+
+    class MedianStopping(tf.keras.callbacks.Callback):
+        def on_epoch_end(self, epoch, logs=None):
+            acc = float(logs.get("val_accuracy", 0.0))
+            history[trial_id] = list(history.get(trial_id, [])) + [acc]
+            if epoch + 1 < settings["prune_after"]:
+                return
+            others = [h[epoch] for t, h in history.items() if t != trial_id and len(h) > epoch]
+            if len(others) >= settings["min_trials_to_prune"] and acc < float(np.median(others)):
+                pruned_at.append(epoch + 1)
+                self.model.stop_training = True
+
+    start = time.perf_counter()
+    fit = model.fit(train_ds, epochs=settings["epochs"], validation_data=val_ds,
+                    callbacks=[MedianStopping()], verbose=0)
+    train_seconds = time.perf_counter() - start
+
+    return {
+        **cfg,
+        "filters": list(cfg["filters"]),
+        "status": "pruned" if pruned_at else "completed",
+        "epochs_run": len(fit.history["val_accuracy"]),
+        "val_accuracy": float(max(fit.history["val_accuracy"])),
+        "params": int(model.count_params()),
+        "latency_ms": measure_latency_ms(model, size),
+        "train_seconds": round(train_seconds, 2),
+    }
+
+
+def run_sweep(trials, settings, workers: int, out_path: str, log=print):
+    """Run ``trials`` on ``workers`` processes, appending each result to ``out_path`` as it lands."""
+    ctx = mp.get_context("spawn")
+    results = []
+    with ctx.Manager() as manager:
+        history = manager.dict()
+        with ctx.Pool(processes=workers, maxtasksperchild=1) as pool, open(out_path, "a", encoding="utf-8") as out:
+            pending = [pool.apply_async(_run_trial, (cfg, settings, history)) for cfg in trials]
+            for job in pending:
+                result = job.get()
+                results.append(result)
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+                log(f"trial {result['trial']} {result['status']}: val_acc={result['val_accuracy']:.3f} "
+                    f"latency={result['latency_ms']:.2f} ms params={result['params']}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel accuracy/latency hyperparameter sweep")
+    parser.add_argument("--data", default="dataset")
+    parser.add_argument("--cache-dir", default="dataset_cache")
+    parser.add_argument("--trials", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1) // 2))
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--val-fraction", type=float, default=0.2)
+    parser.add_argument("--prune-after", type=int, default=3, help="first epoch at which trials may be pruned")
+    parser.add_argument("--min-trials-to-prune", type=int, default=2)
+    parser.add_argument("--no-augment", dest="augment", action="store_false")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="sweep_results.jsonl")
+    args = parser.parse_args(argv)
+
+    from neuroscan.shards import build_shard
+
+    # decode once per input size up front; trial processes only memory-map the shards
+    trials = sample_trials(args.trials, args.seed)
+    for size in sorted({cfg["img_size"] for cfg in trials}):
+        build_shard(args.data, _shard_dir(args.cache_dir, size), size)
+    settings = {
+        "data": args.data,
+        "cache_dir": args.cache_dir,
+        "epochs": args.epochs,
+        "batch_size": args.batch_size,
+        "val_fraction": args.val_fraction,
+        "prune_after": args.prune_after,
+        "min_trials_to_prune": args.min_trials_to_prune,
+        "augment": args.augment,
+        "seed": args.seed,
+        "threads_per_trial": max(1, (os.cpu_count() or 1) // args.workers),
+    }
+    results = run_sweep(trials, settings, args.workers, args.out)
+    front = pareto_front(results)
+    print(json.dumps({"trials": len(results), "pruned": sum(r["status"] == "pruned" for r in results),
+                      "pareto_front": front}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
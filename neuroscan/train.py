@@ -0,0 +1,167 @@
+"""
+Scripted, data-parallel training driver (replaces the single ``model.fit`` notebook cell).
+
+    # all local cores: one process, K synchronous CPU replicas
+    python -m neuroscan.train --data dataset --epochs 10 --cpu-replicas 4
+
+    # several machines: run one process per host with TF_CONFIG set (MultiWorkerMirroredStrategy)
+    TF_CONFIG='{"cluster": {"worker": ["host1:12345", "host2:12345"]}, "task": {"type": "worker", "index": 0}}' \
+        python -m neuroscan.train --data dataset
+
+    # the same multi-worker setup as N local processes on one host (for testing)
+    python -m neuroscan.train --data dataset --local-workers 2
+
+Training state is checkpointed every ``--checkpoint-every`` steps into ``--checkpoint-dir``;
+re-running the same command after an interruption resumes from the last checkpoint
+(mid-epoch included); after a completed run the checkpoint is removed. Only the chief worker writes the final model to ``--out``.
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+
+from neuroscan import IMG_SIZE
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def launch_local_workers(n: int, argv) -> int:
+    """Run this driver as ``n`` local worker processes wired together through TF_CONFIG."""
+    cluster = {"worker": [f"127.0.0.1:{_free_port()}" for _ in range(n)]}
+    procs = []
+    for index in range(n):
+        env = dict(os.environ, TF_CONFIG=json.dumps({"cluster": cluster, "task": {"type": "worker", "index": index}}))
+        procs.append(subprocess.Popen([sys.executable, "-m", "neuroscan.train", *argv], env=env))
+    codes = [p.wait() for p in procs]
+    return max(codes, key=abs)
+
+
+def _strategy(cpu_replicas: int):
+    import tensorflow as tf
+
+    if os.environ.get("TF_CONFIG"):
+        return tf.distribute.MultiWorkerMirroredStrategy()
+    if cpu_replicas > 1:
+        # split the host CPU into K logical devices and mirror the model across them
+        cpu = tf.config.list_physical_devices("CPU")[0]
+        tf.config.set_logical_device_configuration(cpu, [tf.config.LogicalDeviceConfiguration()] * cpu_replicas)
+        return tf.distribute.MirroredStrategy([f"/cpu:{i}" for i in range(cpu_replicas)])
+    return tf.distribute.get_strategy()
+
+
+def _is_chief(strategy) -> bool:
+    resolver = getattr(strategy, "cluster_resolver", None)
+    if resolver is None or not resolver.task_type:
+        return True
+    return resolver.task_type == "chief" or (resolver.task_type == "worker" and resolver.task_id == 0)
+
+
+def _shard_dir(args):
+    """Shard dir for ``--img-size``: one per input size, as zoo / export use, so sizes never share a cache."""
+    if not args.cache_dir:
+        return None
+    return args.cache_dir if args.img_size == IMG_SIZE else f"{args.cache_dir}_{args.img_size}"
+
+
+def train(args) -> dict:
+    import tensorflow as tf
+
+    from neuroscan.data import build_datasets
+    from neuroscan.models import build_cnn
+
+    strategy = _strategy(args.cpu_replicas)
+    replicas = strategy.num_replicas_in_sync
+    global_batch = args.batch_size * replicas
+
+    train_ds, val_ds = build_datasets(
+        args.data, batch_size=global_batch, val_fraction=args.val_fraction, seed=args.seed,
+        img_size=args.img_size, shard_dir=_shard_dir(args),
+        memory_budget_mb=args.memory_budget_mb, augment=args.augment,
+    )
+    # pipelines are built from numpy_function / generators, so shard by element, not by file
+    options = tf.data.Options()
+    options.experimental_distribute.auto_shard_policy = tf.data.experimental.AutoShardPolicy.DATA
+    train_ds, val_ds = train_ds.with_options(options), val_ds.with_options(options)
+
+    with strategy.scope():
+        model = build_cnn(args.img_size)
+        model.compile(optimizer=tf.keras.optimizers.Adam(args.learning_rate),
+                      loss='categorical_crossentropy', metrics=['accuracy'])
+
+    # the backup is deleted once training completes, so re-running starts a fresh run
+    callbacks = [tf.keras.callbacks.BackupAndRestore(args.checkpoint_dir, save_freq=args.checkpoint_every)]
+    history = model.fit(train_ds, epochs=args.epochs, validation_data=val_ds, callbacks=callbacks, verbose=2)
+
+    # every worker must take part in saving; non-chief workers write to a throwaway dir
+    chief = _is_chief(strategy)
+    out_path = args.out if chief else os.path.join(tempfile.mkdtemp(), os.path.basename(args.out))
+    model.save(out_path)
+    if not chief:
+        shutil.rmtree(os.path.dirname(out_path), ignore_errors=True)
+
+    summary = {
+        "replicas": replicas,
+        "global_batch_size": global_batch,
+        "epochs": args.epochs,
+        "final": {k: float(v[-1]) for k, v in history.history.items()},
+        "model": args.out,
+    }
+    if chief:
+        print(json.dumps(summary, indent=2))
+    return summary
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Train the NeuroScan CNN (data-parallel, checkpointed)")
+    parser.add_argument("--data", default="dataset")
+    parser.add_argument("--cache-dir", default="dataset_cache",
+                        help="preprocessed shard dir, <dir>_<size> for a non-default --img-size ('' to read JPEGs)")
+    parser.add_argument("--memory-budget-mb", type=float, default=None, help="stream the shard out-of-core")
+    parser.add_argument("--img-size", type=int, default=IMG_SIZE)
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=32, help="per replica")
+    parser.add_argument("--learning-rate", type=float, default=1e-3)
+    parser.add_argument("--val-fraction", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-augment", dest="augment", action="store_false")
+    parser.add_argument("--checkpoint-dir", default="checkpoints")
+    parser.add_argument("--checkpoint-every", type=int, default=100, help="steps between checkpoints")
+    parser.add_argument("--out", default="brain_tumor_model.h5")
+    parser.add_argument("--cpu-replicas", type=int, default=1, help="synchronous replicas over the local CPU")
+    parser.add_argument("--local-workers", type=int, default=0, help="spawn N local multi-worker processes")
+    return parser
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    args = build_parser().parse_args(argv)
+    if args.local_workers > 1 and not os.environ.get("TF_CONFIG"):
+        if args.cache_dir:
+            # build / refresh the shared shard once, not concurrently from every worker
+            from neuroscan.shards import build_shard
+
+            build_shard(args.data, _shard_dir(args), args.img_size)
+        passthrough = []
+        skip = False
+        for a in argv:
+            if skip:
+                skip = False
+            elif a == "--local-workers":
+                skip = True
+            elif not a.startswith("--local-workers="):
+                passthrough.append(a)
+        return launch_local_workers(args.local_workers, passthrough)
+    train(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Upload handling: expands zip archives and decodes scans in parallel for batch mode.
+Decoding itself lives in neuroscan.preprocessing (``decode_scan``).
+"""
+import io
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from neuroscan import IMG_SIZE
+from neuroscan.preprocessing import decode_scan, is_image_name
+
+# Zip members are only decompressed within these limits (checked against the declared size in
+# the archive directory before reading; zipfile never returns more than that size), so a small
+# archive cannot expand to gigabytes before decode_scan's pixel budget applies.
+MAX_ZIP_MEMBER_BYTES = int(os.environ.get("NEUROSCAN_MAX_ZIP_MEMBER_BYTES", 64 * 1024 * 1024))
+MAX_ZIP_TOTAL_BYTES = int(os.environ.get("NEUROSCAN_MAX_ZIP_TOTAL_BYTES", 512 * 1024 * 1024))
+
+
+def expand_uploads(uploaded_files, max_member_bytes: int = MAX_ZIP_MEMBER_BYTES,
+                   max_total_bytes: int = MAX_ZIP_TOTAL_BYTES):
+    """
+    Flatten Streamlit ``UploadedFile`` objects into ``(items, skipped)``: ``(name, bytes)`` pairs
+    and ``(name, reason)`` pairs for zip members left out because they exceed
+    ``max_member_bytes`` or would take the expanded total past ``max_total_bytes``.
+    Zip archives are expanded into their image members (e.g. a whole exported series).
+    """
+    items, skipped = [], []
+    total = 0
+    for f in uploaded_files:
+        data = f.getvalue()
+        if f.name.lower().endswith(".zip"):
+            with zipfile.ZipFile(io.BytesIO(data)) as zf:
+                for info in sorted(zf.infolist(), key=lambda i: i.filename):
+                    member = info.filename
+                    if info.is_dir() or "__MACOSX" in member or not is_image_name(member):
+                        continue
+                    name = f"{f.name}/{member}"
+                    if info.file_size > max_member_bytes:
+                        skipped.append((name, f"{info.file_size} bytes uncompressed, limit is {max_member_bytes}"))
+                        continue
+                    if total + info.file_size > max_total_bytes:
+                        skipped.append((name, f"archive expands past the {max_total_bytes} byte limit"))
+                        continue
+                    total += info.file_size
+                    items.append((name, zf.read(info)))
+        elif is_image_name(f.name):
+            items.append((f.name, data))
+    return items, skipped
+
+
+def _decode_safe(item, img_size: int = IMG_SIZE):
+    name, data = item
+    try:
+        return name, decode_scan(data, img_size), None
+    except Exception as e:
+        return name, None, str(e)
+
+
+def decode_many(items, workers: int = None, img_size: int = IMG_SIZE):
+    """
+    Decode ``(name, bytes)`` pairs to model-sized arrays in a thread pool (PIL and OpenCV
+    release the GIL while decoding/resizing). Returns ``(name, array_or_None, error_or_None)``
+    tuples in input order.
+    """
+    workers = workers or min(8, (os.cpu_count() or 1) + 1)
+    if len(items) <= 1:
+        return [_decode_safe(item, img_size) for item in items]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda item: _decode_safe(item, img_size), items))
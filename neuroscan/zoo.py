@@ -0,0 +1,139 @@
+"""
+Latency-aware model zoo.
+
+    python -m neuroscan.zoo train --variants baseline,gap,separable_64 --epochs 10
+    python -m neuroscan.zoo list
+
+trains the selected ``neuroscan.models.MODEL_VARIANTS`` with the regular input pipeline and
+saves each one as ``models/<name>.h5`` next to ``models/<name>.json`` holding its measured
+parameter count, file size, cold-load time (``load_model`` in a fresh process) and per-scan
+CPU latency, so variants can be compared on accuracy *and* serving cost.
+
+Any saved variant can then be loaded by name wherever a model path is accepted
+(``load_backend("keras", "gap")``, ``NEUROSCAN_MODEL_PATH=gap``, the app's
+``load_tumor_model("gap")``); this module itself does not import TensorFlow.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from neuroscan import IMG_SIZE
+
+MODEL_DIR = os.environ.get("NEUROSCAN_MODEL_DIR", "models")
+
+_BACKEND_SUFFIXES = {"keras": ".h5", "tflite": "_int8.tflite", "onnx": ".onnx"}
+
+
+def variant_path(name: str, backend: str = "keras", model_dir: str = MODEL_DIR) -> str:
+    return os.path.join(model_dir, name + _BACKEND_SUFFIXES[backend])
+
+
+def resolve_model_path(name_or_path: str, backend: str = "keras", model_dir: str = MODEL_DIR) -> str:
+    """Map a zoo variant name to its saved file; anything else is returned unchanged."""
+    if os.path.exists(name_or_path) or os.sep in name_or_path or "." in os.path.basename(name_or_path):
+        return name_or_path
+    candidate = variant_path(name_or_path, backend, model_dir)
+    return candidate if os.path.exists(candidate) else name_or_path
+
+
+def variant_info(name: str, model_dir: str = MODEL_DIR):
+    """Saved metadata for a variant, or None."""
+    path = os.path.join(model_dir, f"{name}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def list_variants(model_dir: str = MODEL_DIR):
+    if not os.path.isdir(model_dir):
+        return []
+    names = sorted(f[:-5] for f in os.listdir(model_dir) if f.endswith(".json"))
+    return [variant_info(n, model_dir) for n in names]
+
+
+def measure_cold_load_ms(model_path: str) -> float:
+    """``load_model`` time in a fresh interpreter (TensorFlow import excluded)."""
+    code = (
+        "import sys, time\n"
+        "import tensorflow as tf\n"
+        "t = time.perf_counter()\n"
+        "tf.keras.models.load_model(sys.argv[1], compile=False)\n"
+        "print((time.perf_counter() - t) * 1000.0)\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code, model_path], check=True, capture_output=True, text=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def train_variant(name: str, data_dir: str = "dataset", cache_dir: str = "dataset_cache", epochs: int = 10,
+                  batch_size: int = 32, augment: bool = True, seed: int = 42, model_dir: str = MODEL_DIR) -> dict:
+    import tensorflow as tf
+
+    from neuroscan.data import build_datasets
+    from neuroscan.models import MODEL_VARIANTS, build_variant
+    from neuroscan.sweep import measure_latency_ms
+
+    size = MODEL_VARIANTS[name]["img_size"]
+    # one shard per input size so variants never rebuild each other's cache
+    shard_dir = cache_dir if size == IMG_SIZE else f"{cache_dir}_{size}"
+    train_ds, val_ds = build_datasets(data_dir, batch_size=batch_size, seed=seed, img_size=size,
+                                      shard_dir=shard_dir, augment=augment)
+
+    tf.keras.utils.set_random_seed(seed)
+    model = build_variant(name)
+    model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
+    start = time.perf_counter()
+    history = model.fit(train_ds, epochs=epochs, validation_data=val_ds, verbose=2)
+    train_seconds = time.perf_counter() - start
+
+    os.makedirs(model_dir, exist_ok=True)
+    path = variant_path(name, model_dir=model_dir)
+    model.save(path)
+    info = {
+        "name": name,
+        "description": MODEL_VARIANTS[name]["description"],
+        "path": path,
+        "img_size": size,
+        "params": int(model.count_params()),
+        "file_size_bytes": os.path.getsize(path),
+        "cold_load_ms": round(measure_cold_load_ms(path), 2),
+        "latency_ms": round(measure_latency_ms(model, size), 3),
+        "val_accuracy": float(history.history["val_accuracy"][-1]),
+        "epochs": epochs,
+        "train_seconds": round(train_seconds, 2),
+    }
+    with open(os.path.join(model_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=2)
+    return info
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train and compare NeuroScan model variants")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_train = sub.add_parser("train", help="train variants and record their serving cost")
+    p_train.add_argument("--variants", default="baseline,gap,gap_96,separable,separable_64")
+    p_train.add_argument("--data", default="dataset")
+    p_train.add_argument("--cache-dir", default="dataset_cache")
+    p_train.add_argument("--epochs", type=int, default=10)
+    p_train.add_argument("--batch-size", type=int, default=32)
+    p_train.add_argument("--no-augment", dest="augment", action="store_false")
+    p_train.add_argument("--model-dir", default=MODEL_DIR)
+    p_list = sub.add_parser("list", help="show saved variants and their measurements")
+    p_list.add_argument("--model-dir", default=MODEL_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == "train":
+        infos = [train_variant(n.strip(), args.data, args.cache_dir, args.epochs, args.batch_size,
+                               args.augment, model_dir=args.model_dir)
+                 for n in args.variants.split(",") if n.strip()]
+    else:
+        infos = list_variants(args.model_dir)
+    print(json.dumps(infos, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
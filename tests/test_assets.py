@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from neuroscan import assets
+
+
+@pytest.fixture
+def asset_dir(tmp_path, monkeypatch):
+    (tmp_path / "lottie").mkdir()
+    (tmp_path / "fonts").mkdir()
+    monkeypatch.setattr(assets, "ASSET_DIR", str(tmp_path))
+    assets.load_lottie.cache_clear()
+    assets.font_face_css.cache_clear()
+    yield tmp_path
+    assets.load_lottie.cache_clear()
+    assets.font_face_css.cache_clear()
+
+
+def test_missing_fonts_are_imported_from_cdn(asset_dir):
+    (asset_dir / "fonts" / "Poppins-600.woff2").write_bytes(b"font")
+    css = assets.font_face_css()
+    assert css.startswith("@import url('https://fonts.googleapis.com/css2?family=Poppins:wght@400;700&")
+    assert css.count("@font-face") == 1 and "font-weight:600" in css
+    assert "@import" not in assets.font_face_css(cdn_fallback=False)
+
+
+def test_placeholder_lottie_is_replaced_by_original(asset_dir, monkeypatch):
+    requests = pytest.importorskip("requests")
+    placeholder = {"nm": assets.PLACEHOLDER_LOTTIE, "layers": []}
+    (asset_dir / "lottie" / "brain.json").write_text(json.dumps(placeholder), encoding="utf-8")
+
+    class Response:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"nm": "original"}
+
+    monkeypatch.setattr(requests, "get", lambda url, timeout: Response())
+    assert assets.load_lottie("brain") == {"nm": "original"}
+    assert assets.load_lottie("brain", cdn_fallback=False) == placeholder
+
+
+def test_placeholder_lottie_is_kept_when_offline(asset_dir, monkeypatch):
+    requests = pytest.importorskip("requests")
+    placeholder = {"nm": assets.PLACEHOLDER_LOTTIE, "layers": []}
+    (asset_dir / "lottie" / "brain.json").write_text(json.dumps(placeholder), encoding="utf-8")
+
+    def offline(url, timeout):
+        raise requests.ConnectionError("offline")
+
+    monkeypatch.setattr(requests, "get", offline)
+    assert assets.load_lottie("brain") == placeholder
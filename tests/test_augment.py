@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from neuroscan.augment import BatchAugmenter, random_affine_matrices
+
+NO_TRANSFORM = dict(rotation_range=0, width_shift_range=0, height_shift_range=0, shear_range=0, zoom_range=0)
+
+
+def batch(shape, dtype=np.uint8):
+    rng = np.random.RandomState(0)
+    if dtype == np.uint8:
+        return rng.randint(0, 256, size=shape, dtype=np.uint8)
+    return rng.rand(*shape).astype(dtype)
+
+
+@pytest.mark.parametrize("shape", [(8, 32, 32), (8, 32, 32, 1), (1, 24, 40)])
+@pytest.mark.parametrize("dtype", [np.uint8, np.float32])
+def test_output_shape_and_dtype_match_input(shape, dtype):
+    x = batch(shape, dtype)
+    out = BatchAugmenter(workers=3, seed=1)(x)
+    assert out.shape == x.shape and out.dtype == x.dtype
+    assert out is not x and not np.shares_memory(out, x)
+
+
+def test_identity_parameters_leave_batch_unchanged():
+    x = batch((5, 32, 32))
+    out = BatchAugmenter(workers=2, seed=1, horizontal_flip=False, **NO_TRANSFORM)(x)
+    np.testing.assert_array_equal(out, x)
+
+
+def test_flip_only_mirrors_some_images():
+    x = batch((64, 16, 16))
+    out = BatchAugmenter(workers=2, seed=1, horizontal_flip=True, **NO_TRANSFORM)(x)
+    flipped = [np.array_equal(o, i[:, ::-1]) for o, i in zip(out, x)]
+    kept = [np.array_equal(o, i) for o, i in zip(out, x)]
+    assert all(f or k for f, k in zip(flipped, kept))
+    assert 0 < sum(flipped) < len(x)
+
+
+def test_same_seed_is_reproducible_across_thread_counts():
+    x = batch((16, 32, 32))
+    np.testing.assert_array_equal(BatchAugmenter(workers=1, seed=7)(x), BatchAugmenter(workers=4, seed=7)(x))
+
+
+def test_affine_matrices_are_identity_without_ranges():
+    m = random_affine_matrices(3, 32, 32, np.random.RandomState(0), **NO_TRANSFORM)
+    assert m.shape == (3, 2, 3) and m.dtype == np.float32
+    np.testing.assert_allclose(m, np.tile(np.eye(2, 3, dtype=np.float32), (3, 1, 1)), atol=1e-6)
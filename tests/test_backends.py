@@ -0,0 +1,79 @@
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from neuroscan.backends import TFLiteBackend
+
+IMG_SIZE = 16
+
+
+class FakeInterpreter:
+    """Minimal tflite Interpreter: 'predicts' the mean pixel of each scan in every class column."""
+
+    allocations = []
+
+    def __init__(self, model_content=None, num_threads=None):
+        assert model_content == b"fake-model"
+        self._shape = [1, IMG_SIZE, IMG_SIZE, 1]
+        self._allocated = None
+        self._input = None
+        self._output = None
+
+    def get_input_details(self):
+        return [{"index": 0, "shape": np.array(self._shape), "dtype": np.float32, "quantization": (0.0, 0)}]
+
+    def get_output_details(self):
+        return [{"index": 1, "shape": np.array([self._shape[0], 3]), "dtype": np.float32, "quantization": (0.0, 0)}]
+
+    def resize_tensor_input(self, index, shape):
+        self._shape = list(shape)
+        self._allocated = None
+
+    def allocate_tensors(self):
+        self._allocated = tuple(self._shape)
+        type(self).allocations.append(self._shape[0])
+
+    def set_tensor(self, index, value):
+        assert self._allocated == value.shape, (self._allocated, value.shape)
+        self._input = value
+
+    def invoke(self):
+        self._output = np.repeat(self._input.mean(axis=(1, 2, 3))[:, None], 3, axis=1).astype(np.float32)
+
+    def get_tensor(self, index):
+        return self._output
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    module = types.ModuleType("tflite_runtime.interpreter")
+    module.Interpreter = FakeInterpreter
+    monkeypatch.setitem(sys.modules, "tflite_runtime", types.ModuleType("tflite_runtime"))
+    monkeypatch.setitem(sys.modules, "tflite_runtime.interpreter", module)
+    FakeInterpreter.allocations = []
+    path = tmp_path / "model.tflite"
+    path.write_bytes(b"fake-model")
+    return TFLiteBackend(str(path), batch_sizes=(1, 8, 32))
+
+
+def test_warmup_allocates_one_interpreter_per_bucket(backend):
+    assert sorted(FakeInterpreter.allocations) == [1, 8, 32]
+    assert backend.img_size == IMG_SIZE
+
+
+def test_alternating_request_sizes_never_reallocate(backend):
+    allocated = list(FakeInterpreter.allocations)
+    for n in (1, 5, 1, 20, 1, 8, 3):
+        batch = np.random.rand(n, IMG_SIZE, IMG_SIZE, 1).astype(np.float32)
+        out = backend.predict_on_batch(batch)
+        assert out.shape == (n, 3)
+        np.testing.assert_allclose(out[:, 0], batch.mean(axis=(1, 2, 3)), rtol=1e-5)
+    assert FakeInterpreter.allocations == allocated
+
+
+def test_oversized_batch_is_split_over_largest_bucket(backend):
+    batch = np.ones((70, IMG_SIZE, IMG_SIZE, 1), dtype=np.float32)
+    assert backend.predict_on_batch(batch).shape == (70, 3)
+    assert sorted(FakeInterpreter.allocations) == [1, 8, 32]
@@ -0,0 +1,75 @@
+import hashlib
+import os
+
+import numpy as np
+import pytest
+
+from neuroscan.cache import PredictionCache, file_fingerprint
+
+PROBS = np.array([0.1, 0.8, 0.1], dtype=np.float32)
+
+
+def test_key_depends_on_bytes_and_model_version():
+    a, b = PredictionCache("v1"), PredictionCache("v2")
+    assert a.key_for(b"scan") == a.key_for(b"scan")
+    assert a.key_for(b"scan") != a.key_for(b"other")
+    assert a.key_for(b"scan") != b.key_for(b"scan")
+
+
+def test_hit_and_miss_counters():
+    cache = PredictionCache("v1")
+    key = cache.key_for(b"scan")
+    assert cache.get(key) is None
+    cache.put(key, PROBS)
+    np.testing.assert_array_equal(cache.get(key), PROBS)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_cached_arrays_are_read_only():
+    cache = PredictionCache("v1")
+    cache.put("k", [0.2, 0.3, 0.5])
+    with pytest.raises(ValueError):
+        cache.get("k")[0] = 1.0
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = PredictionCache("v1", max_entries=2)
+    cache.put("a", PROBS)
+    cache.put("b", PROBS)
+    cache.get("a")  # a is now most recently used
+    cache.put("c", PROBS)
+    assert cache.stats()["entries"] == 2
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    first = PredictionCache("v1", max_entries=1, disk_dir=str(tmp_path))
+    key = first.key_for(b"scan")
+    first.put(key, PROBS)
+    first.put(first.key_for(b"other"), PROBS)  # evicts key from memory, not from disk
+
+    np.testing.assert_array_equal(first.get(key), PROBS)
+    assert first.stats()["disk_hits"] == 1
+
+    second = PredictionCache("v1", disk_dir=str(tmp_path))
+    np.testing.assert_array_equal(second.get(key), PROBS)
+    assert second.stats()["disk_hits"] == 1
+    assert not [f for _, _, files in os.walk(tmp_path) for f in files if f.endswith(".tmp")]
+
+
+def test_corrupt_disk_entry_is_a_miss(tmp_path):
+    cache = PredictionCache("v1", disk_dir=str(tmp_path))
+    key = cache.key_for(b"scan")
+    path = tmp_path / key[:2] / f"{key}.npy"
+    path.parent.mkdir()
+    path.write_bytes(b"garbage")
+    assert cache.get(key) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_file_fingerprint_is_content_sha256(tmp_path):
+    path = tmp_path / "model.h5"
+    path.write_bytes(b"weights" * 500_000)  # spans several read chunks
+    assert file_fingerprint(str(path)) == hashlib.sha256(b"weights" * 500_000).hexdigest()
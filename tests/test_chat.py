@@ -0,0 +1,129 @@
+"""NeuroBot ChatClient against a local mock OpenAI-compatible server."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from neuroscan.chat import ChatClient, ChatError
+
+TOKENS = ["Glioma ", "is ", "a ", "tumor ", "of ", "glial ", "cells."]
+REPLY = "".join(TOKENS)
+MESSAGES = [{"role": "user", "content": "What is a glioma?"}]
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    token_delay_s = 0.02
+    fail_first = 0  # answer the first N requests with fail_status
+    fail_status = 429
+    requests_seen = 0
+    ports_seen = set()
+
+    def do_POST(self):
+        cls = type(self)
+        cls.requests_seen += 1
+        cls.ports_seen.add(self.client_address[1])
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        if cls.requests_seen <= cls.fail_first:
+            self._send(cls.fail_status, b'{"error": "rate limited"}', {"Retry-After": "0.05"})
+        elif not body.get("stream"):
+            self._send(200, json.dumps({"choices": [{"message": {"content": REPLY}}]}).encode())
+        else:
+            self._stream()
+
+    def _send(self, status, payload, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def chunk(text):
+            data = text.encode()
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        chunk(": OPENROUTER PROCESSING\n\n")
+        for token in TOKENS:
+            time.sleep(self.token_delay_s)
+            chunk("data: " + json.dumps({"choices": [{"delta": {"content": token}}]}) + "\n\n")
+        chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    MockHandler.requests_seen, MockHandler.ports_seen = 0, set()
+    MockHandler.fail_first, MockHandler.fail_status = 0, 429
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), MockHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def client(server):
+    client = ChatClient("test-key", url=f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions",
+                        backoff_base=0.01, max_retries=2)
+    yield client
+    client.close()
+
+
+def test_stream_yields_tokens_as_they_arrive(client):
+    start = time.perf_counter()
+    stream = client.stream(MESSAGES)
+    first = next(stream)
+    first_token_s = time.perf_counter() - start
+    reply = first + "".join(stream)
+    total_s = time.perf_counter() - start
+    assert reply == REPLY
+    assert first_token_s < total_s / 2
+
+
+def test_complete_returns_whole_reply(client):
+    assert client.complete(MESSAGES) == REPLY
+
+
+def test_retries_on_429_then_succeeds(client):
+    MockHandler.fail_first = 1
+    assert "".join(client.stream(MESSAGES)) == REPLY
+    assert client.retries == 1
+    assert MockHandler.requests_seen == 2
+
+
+def test_gives_up_after_max_retries(client):
+    MockHandler.fail_first, MockHandler.fail_status = 10, 503
+    with pytest.raises(ChatError, match="503"):
+        client.complete(MESSAGES)
+    assert MockHandler.requests_seen == client.max_retries + 1
+
+
+def test_client_errors_are_not_retried(client):
+    MockHandler.fail_first, MockHandler.fail_status = 1, 401
+    with pytest.raises(ChatError, match="401"):
+        client.complete(MESSAGES)
+    assert client.retries == 0
+
+
+def test_connection_is_reused(client):
+    MockHandler.fail_first = 1
+    "".join(client.stream(MESSAGES))
+    client.complete(MESSAGES)
+    client.complete(MESSAGES)
+    # the 429, the stream and both plain requests all went over one pooled connection
+    assert MockHandler.requests_seen == 4
+    assert len(MockHandler.ports_seen) == 1, MockHandler.ports_seen
@@ -0,0 +1,78 @@
+import pytest
+
+from neuroscan.chat_cache import ResponseCache, is_standalone, normalize_question
+
+GLIOMA = "A glioma is a tumor of glial cells."
+WEIGHTING = "T1 and T2 are MRI weightings."
+
+
+@pytest.fixture
+def now():
+    return [0.0]
+
+
+@pytest.fixture
+def cache(now):
+    cache = ResponseCache(max_entries=3, ttl_s=60, clock=lambda: now[0])
+    cache.put("What is a glioma?", GLIOMA)
+    cache.put("What does T1 vs T2 mean?", WEIGHTING)
+    return cache
+
+
+def test_normalize_question():
+    assert normalize_question("  What's a GLIOMA?? ") == "whats a glioma"
+
+
+@pytest.mark.parametrize("question", ["What is a glioma?", "what is a GLIOMA", "  what is a glioma  "])
+def test_exact_hit_after_normalization(cache, question):
+    assert cache.get(question) == GLIOMA
+    assert cache.stats()["exact_hits"] == 1
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("What's a glioma", GLIOMA),           # contraction
+    ("Explain gliomas", GLIOMA),           # plural + stop words
+    ("T2 vs T1 meaning", WEIGHTING),       # word order
+])
+def test_near_duplicate_hit(cache, question, expected):
+    assert cache.get(question) == expected
+    assert cache.stats()["similar_hits"] == 1
+
+
+@pytest.mark.parametrize("question", [
+    "What is a meningioma?",
+    "How is a glioma treated?",
+    "What does DWI mean?",
+])
+def test_different_question_misses(cache, question):
+    assert cache.get(question) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_follow_up_questions_are_never_cached(cache):
+    assert not is_standalone("How is it treated?")
+    cache.put("How is it treated?", "Surgery.")
+    assert cache.get("How is it treated?") is None
+    assert cache.stats()["entries"] == 2
+
+
+def test_entries_expire(cache, now):
+    now[0] = 61.0
+    assert cache.get("What is a glioma?") is None
+    assert cache.get("What's a glioma") is None
+
+
+def test_lru_eviction(cache):
+    cache.get("What is a glioma?")  # most recently used: survives
+    cache.put("What is edema?", "Swelling.")
+    cache.put("What is a lesion?", "Abnormal tissue.")
+    stats = cache.stats()
+    assert stats["entries"] == 3 and stats["evictions"] == 1
+    assert cache.get("What does T1 vs T2 mean?") is None
+    assert cache.get("What is a glioma?") == GLIOMA
+
+
+def test_clear(cache):
+    cache.clear()
+    assert cache.get("What is a glioma?") is None
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,75 @@
+from neuroscan.chat_context import ChatContext, count_tokens, first_sentence, message_tokens
+
+SYSTEM_PROMPT = "You are a neuroscience assistant. " * 20
+
+
+def question(i):
+    return f"Question {i}: what does finding {i} on a T2-weighted MRI mean? Please explain."
+
+
+def answer(i):
+    return f"Finding {i} usually indicates oedema. " + "It should be correlated clinically. " * 8
+
+
+def test_short_session_is_sent_verbatim():
+    ctx = ChatContext("system", budget_tokens=1500)
+    ctx.add("user", "What is a glioma?")
+    ctx.add("assistant", "A tumor of glial cells.")
+    assert ctx.messages() == [
+        {"role": "system", "content": "system"},
+        {"role": "user", "content": "What is a glioma?"},
+        {"role": "assistant", "content": "A tumor of glial cells."},
+    ]
+    assert ctx.folded == 0
+
+
+def test_long_session_stays_within_budget():
+    budget = 800
+    ctx = ChatContext(SYSTEM_PROMPT, budget_tokens=budget)
+    for i in range(300):
+        ctx.add("user", question(i))
+        assert ctx.tokens() <= budget, ctx.stats()
+        assert ctx.turns[-1]["content"] == question(i)
+        ctx.add("assistant", answer(i))
+        assert ctx.tokens() <= budget, ctx.stats()
+    assert ctx.folded > 0
+    assert ctx.messages()[0]["content"] == SYSTEM_PROMPT
+
+
+def test_old_turns_are_folded_into_summary():
+    ctx = ChatContext("system", budget_tokens=200, summary_tokens=1000)
+    for i in range(3):
+        ctx.add("user", question(i))
+        ctx.add("assistant", answer(i))
+    summary = ctx.messages()[1]
+    assert summary["role"] == "system" and summary["content"].startswith("Summary of the earlier conversation:")
+    assert f"User asked: {question(0).split('?')[0]}?" in summary["content"]
+    assert "NeuroBot answered: Finding 0 usually indicates oedema." in summary["content"]
+    # the window never starts with an answer whose question was folded away
+    assert ctx.turns[0]["role"] == "user"
+
+
+def test_summary_is_capped():
+    ctx = ChatContext("system", budget_tokens=100, summary_tokens=60)
+    for i in range(50):
+        ctx.add("user", question(i))
+        ctx.add("assistant", answer(i))
+    assert message_tokens([ctx.messages()[1]]) <= 60
+    assert "Question 49" in ctx.messages()[-2]["content"]
+
+
+def test_latest_message_is_kept_even_if_over_budget():
+    ctx = ChatContext("system", budget_tokens=50)
+    long_question = "Why? " * 200
+    ctx.add("user", long_question)
+    assert ctx.turns == [{"role": "user", "content": long_question}]
+
+
+def test_first_sentence_truncates():
+    assert first_sentence("One.  Two three.") == "One."
+    assert first_sentence("x" * 300, max_chars=10) == "x" * 9 + "…"
+
+
+def test_count_tokens_is_positive():
+    assert count_tokens("") == 0
+    assert count_tokens("What is a glioma?") > 0
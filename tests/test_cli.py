@@ -0,0 +1,11 @@
+from neuroscan.cli import iter_image_paths
+
+
+def test_iter_image_paths_skips_hidden_directories_and_files(tmp_path):
+    for rel in ["b/2.jpg", "a/1.png", "a/notes.txt", "a/.ipynb_checkpoints/1-checkpoint.png",
+                ".git/x.jpg", "c/.hidden.jpg", "3.JPEG"]:
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"")
+    found = [p[len(str(tmp_path)) + 1:] for p in iter_image_paths(str(tmp_path))]
+    assert found == ["3.JPEG", "a/1.png", "b/2.jpg"]
@@ -0,0 +1,78 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from neuroscan.executor import InferenceExecutor, ServerBusy
+
+IMG_SIZE = 16
+
+
+class GatedModel:
+    """predict_on_batch blocks until ``gate`` is set, so tests control when workers are busy."""
+
+    img_size = IMG_SIZE
+
+    def __init__(self, fail=False):
+        self.gate = threading.Event()
+        self.calls = 0
+        self.fail = fail
+
+    def predict_on_batch(self, x):
+        self.calls += 1
+        assert self.gate.wait(5)
+        if self.fail:
+            raise RuntimeError("model exploded")
+        m = x.mean(axis=(1, 2, 3))
+        return np.stack([1.0 - m, m, np.zeros_like(m)], axis=1)
+
+
+def scans(n, value=0):
+    return [np.full((IMG_SIZE, IMG_SIZE), value, dtype=np.uint8)] * n
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_queue_limit_rejects_with_position():
+    model = GatedModel()
+    executor = InferenceExecutor(model, workers=1, max_queue=2)
+    running = executor.submit(scans(1))
+    wait_until(lambda: running.position == 0)  # picked up by the only worker
+    queued = [executor.submit(scans(1)), executor.submit(scans(1))]
+    assert [job.position for job in queued] == [1, 2]
+
+    with pytest.raises(ServerBusy) as busy:
+        executor.submit(scans(1))
+    assert (busy.value.position, busy.value.queue_depth) == (3, 2)
+    assert executor.stats()["rejected"] == 1
+
+    model.gate.set()
+    for job in [running] + queued:
+        assert job.result(5).shape == (1, 3)
+    stats = executor.stats()
+    assert (stats["completed"], stats["failed"], stats["queue_depth"]) == (3, 0, 0)
+    assert "wait_p50_ms" in stats and "run_p99_ms" in stats
+
+
+def test_accepts_again_after_queue_drains():
+    model = GatedModel()
+    model.gate.set()
+    executor = InferenceExecutor(model, workers=2, max_queue=1)
+    for value in (0, 51, 255):
+        probs = executor.predict(scans(2, value), timeout=5)
+        np.testing.assert_allclose(probs[:, 1], value / 255.0, atol=1e-6)
+
+
+def test_model_errors_reach_the_caller():
+    model = GatedModel(fail=True)
+    model.gate.set()
+    executor = InferenceExecutor(model, workers=1, max_queue=4)
+    with pytest.raises(RuntimeError, match="model exploded"):
+        executor.predict(scans(1), timeout=5)
+    assert executor.stats()["failed"] == 1
@@ -0,0 +1,117 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from neuroscan import knowledge
+from neuroscan.knowledge import NO_ANSWER, OFFLINE_NOTE, KnowledgeBase, build_index, load_or_build, tokenize
+
+CORPUS = {
+    "tumors.md": """# Tumors
+
+## Glioma
+A glioma is a tumor that starts in the glial cells of the brain or spine. Gliomas are graded I to IV.
+
+## Meningioma
+A meningioma grows from the meninges, the membranes around the brain. Most meningiomas are benign.
+""",
+    "mri.md": """# MRI
+
+## FLAIR
+FLAIR suppresses the cerebrospinal fluid signal so oedema and lesions near the ventricles stand out.
+
+## Contrast enhancement
+Gadolinium contrast highlights areas where the blood-brain barrier is disrupted, as in many tumors.
+""",
+}
+
+
+@pytest.fixture
+def corpus_dir(tmp_path):
+    root = tmp_path / "knowledge"
+    root.mkdir()
+    for name, text in CORPUS.items():
+        (root / name).write_text(text, encoding="utf-8")
+    return root
+
+
+@pytest.fixture
+def kb(corpus_dir, tmp_path):
+    return load_or_build(str(corpus_dir), str(tmp_path / "index"), log=lambda *_: None)
+
+
+def titles(hits):
+    return [p["title"] for _, p in hits]
+
+
+def test_tokenize_drops_stop_and_question_words():
+    assert tokenize("What does FLAIR show in gliomas?") == ["flair", "glioma"]
+
+
+@pytest.mark.parametrize("query, best", [
+    ("what is a glioma", "Glioma"),
+    ("Are meningiomas benign?", "Meningioma"),
+    ("what does FLAIR show", "FLAIR"),
+    ("why use gadolinium contrast", "Contrast enhancement"),
+])
+def test_bm25_ranks_matching_passage_first(kb, query, best):
+    assert titles(kb.search(query))[0] == best
+
+
+def test_scores_are_sorted_and_positive(kb):
+    hits = kb.search("brain tumor", k=4)
+    scores = [s for s, _ in hits]
+    assert scores == sorted(scores, reverse=True) and all(s > 0 for s in scores)
+
+
+def test_unknown_terms_give_no_answer(kb):
+    assert kb.search("zebra quantum") == []
+    assert kb.answer("zebra quantum") == NO_ANSWER
+
+
+def test_answer_quotes_best_passage_with_note(kb):
+    reply = kb.answer("what is a glioma?")
+    assert reply.startswith("**Glioma.** A glioma is a tumor")
+    assert reply.endswith(OFFLINE_NOTE)
+
+
+def test_index_arrays_are_memory_mapped(kb):
+    assert isinstance(kb.postings_doc, np.memmap)
+    assert isinstance(kb.postings_tf, np.memmap)
+    assert isinstance(kb.term_offsets, np.memmap)
+
+
+def test_reload_reuses_index_and_matches(corpus_dir, tmp_path, kb):
+    index_dir = tmp_path / "index"
+    manifest = index_dir / "manifest.json"
+    before = os.stat(manifest).st_mtime_ns
+    logs = []
+    reloaded = load_or_build(str(corpus_dir), str(index_dir), log=logs.append)
+    assert logs == [] and os.stat(manifest).st_mtime_ns == before
+    for query in ("glioma grade", "FLAIR oedema", "contrast"):
+        assert reloaded.search(query) == kb.search(query)
+
+
+def test_corpus_change_triggers_rebuild(corpus_dir, tmp_path, kb):
+    (corpus_dir / "extra.md").write_text("## Ependymoma\nAn ependymoma arises from ependymal cells.\n", encoding="utf-8")
+    logs = []
+    kb2 = load_or_build(str(corpus_dir), str(tmp_path / "index"), log=logs.append)
+    assert len(logs) == 1
+    assert titles(kb2.search("ependymoma"))[0] == "Ependymoma"
+
+
+def test_format_version_change_triggers_rebuild(corpus_dir, tmp_path, kb, monkeypatch):
+    monkeypatch.setattr(knowledge, "FORMAT_VERSION", knowledge.FORMAT_VERSION + 1)
+    logs = []
+    load_or_build(str(corpus_dir), str(tmp_path / "index"), log=logs.append)
+    assert len(logs) == 1
+
+
+def test_bundled_corpus_builds(tmp_path):
+    summary = build_index(index_dir=str(tmp_path / "index"))
+    assert summary["passages"] > 0 and summary["terms"] > 0
+    kb = KnowledgeBase(str(tmp_path / "index"))
+    assert kb.answer("what is the difference between T1 and T2?") != NO_ANSWER
+    with open(tmp_path / "index" / "manifest.json", encoding="utf-8") as f:
+        assert json.load(f)["version"] == knowledge.FORMAT_VERSION
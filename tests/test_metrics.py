@@ -0,0 +1,90 @@
+import math
+import urllib.error
+import urllib.request
+
+import pytest
+
+from neuroscan.metrics import CONTENT_TYPE, Histogram, MetricsRegistry, start_http_server
+
+
+def test_histogram_buckets_are_upper_inclusive():
+    h = Histogram(buckets=(0.001, 0.01, 0.1))
+    for seconds in (0.0005, 0.001, 0.005, 0.05, 0.5):
+        h.observe(seconds)
+    assert h.counts == [2, 1, 1, 1]  # le=0.001 holds 0.0005 and 0.001; the last slot is +Inf
+    assert h.count == 5 and h.sum == pytest.approx(0.5565)
+
+
+def test_histogram_quantile_interpolates_within_bucket():
+    h = Histogram(buckets=(0.01, 0.02))
+    for _ in range(10):
+        h.observe(0.015)
+    assert 0.01 <= h.quantile(0.5) <= 0.02
+    assert math.isnan(Histogram().quantile(0.5))
+
+
+def test_timed_and_counters_feed_snapshot():
+    metrics = MetricsRegistry()
+    with metrics.timed("decode"):
+        pass
+    metrics.observe("decode", 0.002)
+    metrics.inc("cache_hits")
+    metrics.inc("cache_hits", 2)
+    snap = metrics.snapshot()
+    assert snap["enabled"] is True
+    assert snap["stages"]["decode"]["count"] == 2
+    assert snap["counters"] == {"cache_hits": 3}
+
+
+def test_prometheus_text_format():
+    metrics = MetricsRegistry(prefix="ns", buckets=(0.01, 0.1))
+    metrics.observe("predict", 0.005)
+    metrics.observe("predict", 0.05)
+    metrics.observe("predict", 5.0)
+    metrics.inc("requests", 4)
+    lines = metrics.render_prometheus().splitlines()
+    assert lines[:2] == ["# HELP ns_stage_duration_seconds Wall time per processing stage.",
+                         "# TYPE ns_stage_duration_seconds histogram"]
+    assert 'ns_stage_duration_seconds_bucket{stage="predict",le="0.01"} 1' in lines
+    assert 'ns_stage_duration_seconds_bucket{stage="predict",le="0.1"} 2' in lines
+    assert 'ns_stage_duration_seconds_bucket{stage="predict",le="+Inf"} 3' in lines
+    assert 'ns_stage_duration_seconds_sum{stage="predict"} 5.055' in lines
+    assert 'ns_stage_duration_seconds_count{stage="predict"} 3' in lines
+    assert lines[-2:] == ["# TYPE ns_requests_total counter", "ns_requests_total 4"]
+
+
+def test_disabled_registry_is_a_no_op():
+    metrics = MetricsRegistry(enabled=False)
+    assert metrics.timed("a") is metrics.timed("b")  # one shared null timer
+    with metrics.timed("a"):
+        pass
+    metrics.observe("a", 1.0)
+    metrics.inc("x")
+    assert metrics.snapshot() == {"enabled": False, "stages": {}, "counters": {}}
+    assert "_bucket" not in metrics.render_prometheus()
+
+
+def test_reset_and_textfile(tmp_path):
+    metrics = MetricsRegistry()
+    metrics.inc("x")
+    path = tmp_path / "neuroscan.prom"
+    metrics.write_textfile(str(path))
+    assert "neuroscan_x_total 1" in path.read_text(encoding="utf-8")
+    metrics.reset()
+    assert metrics.snapshot()["counters"] == {}
+
+
+def test_http_exporter():
+    metrics = MetricsRegistry()
+    metrics.inc("served")
+    server = start_http_server(0, metrics=metrics)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(url + "/metrics", timeout=5) as r:
+            assert r.headers["Content-Type"] == CONTENT_TYPE
+            assert "neuroscan_served_total 1" in r.read().decode()
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(url + "/other", timeout=5)
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,91 @@
+"""
+Train/serve parity of neuroscan.preprocessing against the two pipelines it replaced, on the
+bundled dataset:
+
+- legacy training (code.ipynb): ``cv2.imread(IMREAD_GRAYSCALE)`` + ``cv2.resize`` + ``/ 255.0``
+- legacy upload (app.py): PIL ``convert("L")`` + ``cv2.resize`` + ``/ 255.0``
+
+Both legacy paths produced float64; the new one is float32, so "identical" means within
+float32 rounding of ``x / 255`` (``FLOAT32_ATOL``).
+"""
+import os
+
+import cv2
+import numpy as np
+import pytest
+from PIL import Image
+
+from neuroscan import IMG_SIZE
+from neuroscan.preprocessing import decode_scan, list_dataset, load_dataset, preprocess, preprocess_batch
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dataset")
+
+FLOAT32_ATOL = 1e-6
+# cv2 and PIL use different JPEG decoders: a few pixels differ by up to 8 grey levels
+CV2_JPEG_MAX_DIFF = 8 / 255
+CV2_JPEG_MEAN_DIFF = 1e-3
+# cv2.imread converts colour PNGs with libpng's Rec. 709 weights, PIL with Rec. 601
+CV2_COLOUR_PNG_MEAN_DIFF = 0.04
+# JPEG draft (reduced DCT) decoding vs a full decode, per image / over the dataset
+DRAFT_MEAN_DIFF = 0.02
+DRAFT_DATASET_MEAN_DIFF = 0.002
+
+PATHS, _ = list_dataset(DATA_DIR)
+pytestmark = pytest.mark.skipif(not PATHS, reason=f"no dataset under {DATA_DIR}")
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def new_pipeline(path, draft_factor=2):
+    return preprocess(decode_scan(read(path), IMG_SIZE, draft_factor=draft_factor))[:, :, 0]
+
+
+def legacy_training(path):
+    return cv2.resize(cv2.imread(path, cv2.IMREAD_GRAYSCALE), (IMG_SIZE, IMG_SIZE)) / 255.0
+
+
+def legacy_upload(path):
+    return cv2.resize(np.array(Image.open(path).convert("L")), (IMG_SIZE, IMG_SIZE)) / 255.0
+
+
+def is_colour_png(path):
+    with Image.open(path) as image:
+        return image.format == "PNG" and image.mode not in ("L", "1")
+
+
+def test_full_decode_matches_legacy_upload_path():
+    for path in PATHS:
+        np.testing.assert_allclose(new_pipeline(path, draft_factor=0), legacy_upload(path),
+                                   rtol=0, atol=FLOAT32_ATOL, err_msg=path)
+
+
+def test_full_decode_matches_legacy_training_path():
+    for path in PATHS:
+        diff = np.abs(new_pipeline(path, draft_factor=0) - legacy_training(path))
+        if is_colour_png(path):
+            assert diff.mean() <= CV2_COLOUR_PNG_MEAN_DIFF, (path, diff.mean())
+        else:
+            assert diff.max() <= CV2_JPEG_MAX_DIFF + FLOAT32_ATOL, (path, diff.max())
+            assert diff.mean() <= CV2_JPEG_MEAN_DIFF, (path, diff.mean())
+
+
+def test_draft_decode_stays_close_to_full_decode():
+    means = []
+    for path in PATHS:
+        means.append(float(np.abs(new_pipeline(path) - new_pipeline(path, draft_factor=0)).mean()))
+        assert means[-1] <= DRAFT_MEAN_DIFF, (path, means[-1])
+    assert np.mean(means) <= DRAFT_DATASET_MEAN_DIFF
+
+
+def test_scalar_and_batched_apis_are_bit_identical():
+    pixels, _, skipped = load_dataset(DATA_DIR)
+    assert not skipped
+    batched = preprocess_batch(pixels)
+    assert batched.dtype == np.float32 and batched.shape == (len(PATHS), IMG_SIZE, IMG_SIZE, 1)
+    assert np.array_equal(batched, preprocess_batch(list(pixels)))
+    for i in range(len(pixels)):
+        assert np.array_equal(preprocess(pixels[i]), batched[i])
+
@@ -0,0 +1,139 @@
+import asyncio
+import io
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from neuroscan.remote import RemoteModel
+from neuroscan.server import RAW_BATCH_CONTENT_TYPE, InferenceServer, MicroBatcher
+
+IMG_SIZE = 16
+
+
+class FakeModel:
+    """Probabilities derived from the mean pixel, so answers can be checked per scan."""
+
+    img_size = IMG_SIZE
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict_on_batch(self, x):
+        self.batch_sizes.append(len(x))
+        m = x.mean(axis=(1, 2, 3))
+        return np.stack([1.0 - m, m, np.zeros_like(m)], axis=1).astype(np.float32)
+
+
+def expected(pixels):
+    m = pixels.astype(np.float32).mean() / 255.0
+    return np.array([1.0 - m, m, 0.0], dtype=np.float32)
+
+
+def png_bytes(value):
+    buf = io.BytesIO()
+    Image.fromarray(np.full((IMG_SIZE, IMG_SIZE), value, dtype=np.uint8)).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def test_micro_batcher_coalesces_concurrent_requests():
+    model = FakeModel()
+
+    async def main():
+        batcher = MicroBatcher(model, max_batch_size=8, max_wait_ms=50)
+        task = asyncio.create_task(batcher.run())
+        await asyncio.sleep(0)
+        scans = [np.full((IMG_SIZE, IMG_SIZE), 10 * i, dtype=np.uint8) for i in range(20)]
+        results = await asyncio.gather(*(batcher.submit(s) for s in scans))
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return scans, results, batcher.stats()
+
+    scans, results, stats = asyncio.run(main())
+    for scan, probs in zip(scans, results):
+        np.testing.assert_allclose(probs, expected(scan), atol=1e-6)
+    assert sum(model.batch_sizes) == 20 and max(model.batch_sizes) <= 8
+    assert len(model.batch_sizes) < 20
+    assert stats["items"] == 20 and stats["batches"] == len(model.batch_sizes)
+
+
+def test_submit_before_run_raises():
+    with pytest.raises(RuntimeError):
+        asyncio.run(MicroBatcher(FakeModel()).submit(np.zeros((IMG_SIZE, IMG_SIZE), dtype=np.uint8)))
+
+
+@pytest.fixture
+def server_url():
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    holder = {}
+
+    async def start():
+        batcher = MicroBatcher(FakeModel(), max_batch_size=8, max_wait_ms=2)
+        holder["batch_task"] = asyncio.create_task(batcher.run())
+        holder["tcp"] = await asyncio.start_server(InferenceServer(batcher, model_version="v-test").handle,
+                                                   "127.0.0.1", 0)
+        holder["port"] = holder["tcp"].sockets[0].getsockname()[1]
+        started.set()
+
+    thread = threading.Thread(target=lambda: (loop.run_until_complete(start()), loop.run_forever()), daemon=True)
+    thread.start()
+    assert started.wait(5)
+    yield f"http://127.0.0.1:{holder['port']}"
+
+    async def stop():
+        holder["batch_task"].cancel()
+        await asyncio.gather(holder["batch_task"], return_exceptions=True)
+        holder["tcp"].close()
+        await holder["tcp"].wait_closed()
+
+    asyncio.run_coroutine_threadsafe(stop(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
+
+
+def request(url, data=None, headers=None, method=None):
+    req = urllib.request.Request(url, data=data, headers=headers or {}, method=method)
+    try:
+        with urllib.request.urlopen(req, timeout=5) as r:
+            return r.status, json.loads(r.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_predict_round_trip(server_url):
+    status, payload = request(server_url + "/predict", data=png_bytes(51), method="POST")
+    assert status == 200
+    assert payload["prediction"] == "No Tumor"
+    probs = np.array(list(payload["probabilities"].values()), dtype=np.float32)
+    np.testing.assert_allclose(probs, expected(np.full((IMG_SIZE, IMG_SIZE), 51)), atol=1e-6)
+
+
+@pytest.mark.parametrize("path, data, headers, method, code", [
+    ("/predict", b"not an image", {}, "POST", 400),
+    ("/predict", None, {}, "POST", 400),
+    ("/predict/batch", b"\0" * (IMG_SIZE * IMG_SIZE + 1), {"Content-Type": RAW_BATCH_CONTENT_TYPE}, "POST", 400),
+    ("/predict", None, {}, "GET", 405),
+    ("/nope", None, {}, "GET", 404),
+])
+def test_bad_requests(server_url, path, data, headers, method, code):
+    status, payload = request(server_url + path, data=data, headers=headers, method=method)
+    assert status == code and "error" in payload
+
+
+def test_healthz(server_url):
+    assert request(server_url + "/healthz") == (200, {"status": "ok", "model_version": "v-test", "img_size": IMG_SIZE})
+
+
+def test_remote_model_matches_local_model(server_url):
+    remote = RemoteModel(server_url)
+    assert (remote.model_version, remote.img_size) == ("v-test", IMG_SIZE)
+    pixels = np.random.RandomState(0).randint(0, 256, size=(5, IMG_SIZE, IMG_SIZE), dtype=np.uint8)
+    batch = (pixels.astype(np.float32) / 255.0)[..., None]
+    np.testing.assert_allclose(remote.predict_on_batch(batch), FakeModel().predict_on_batch(batch), atol=1e-6)
+    assert remote.stats()["backend"] == "remote"
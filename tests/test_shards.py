@@ -0,0 +1,134 @@
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from neuroscan.shards import (MANIFEST_FILE, SHARD_FILE, build_shard, iter_shard_batches, load_shard, read_manifest,
+                              rows_for_budget)
+
+IMG_SIZE = 32
+
+
+def write_scan(path, value):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.fromarray(np.full((40, 40), value, dtype=np.uint8)).save(path)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    root = tmp_path / "dataset"
+    for i in range(3):
+        write_scan(root / "no" / f"n{i}.png", 10 + i)
+        write_scan(root / "yes" / f"y{i}.png", 100 + i)
+    (root / "yes" / "broken.jpg").write_bytes(b"not a jpeg")
+    return root
+
+
+def build(data_dir, cache_dir):
+    return build_shard(str(data_dir), str(cache_dir), IMG_SIZE, log=lambda *_: None)
+
+
+def test_unreadable_file_is_recorded_and_skipped(data_dir, tmp_path):
+    cache_dir = tmp_path / "cache"
+    first = build(data_dir, cache_dir)
+    assert (first["total"], first["decoded"], first["failed"]) == (6, 6, 1)
+    manifest = read_manifest(str(cache_dir), IMG_SIZE)
+    assert [e["path"] for e in manifest["failed"]] == ["yes/broken.jpg"]
+    assert manifest["failed"][0]["failed"] is True
+
+    pixels, labels, _ = load_shard(str(cache_dir), IMG_SIZE)
+    assert pixels.shape == (6, IMG_SIZE, IMG_SIZE)
+    assert labels.tolist() == [0, 0, 0, 1, 1, 1]
+
+
+def test_second_build_with_broken_file_does_not_rewrite_shard(data_dir, tmp_path):
+    cache_dir = tmp_path / "cache"
+    build(data_dir, cache_dir)
+    shard, manifest = cache_dir / SHARD_FILE, cache_dir / MANIFEST_FILE
+    before = (os.stat(shard).st_ino, os.stat(shard).st_mtime_ns, os.stat(manifest).st_mtime_ns)
+
+    second = build(data_dir, cache_dir)
+    assert (second["decoded"], second["reused"], second["failed"]) == (0, 6, 1)
+    assert (os.stat(shard).st_ino, os.stat(shard).st_mtime_ns, os.stat(manifest).st_mtime_ns) == before
+    assert sorted(os.listdir(cache_dir)) == [MANIFEST_FILE, SHARD_FILE]
+
+
+def test_fixed_file_is_decoded_again(data_dir, tmp_path):
+    cache_dir = tmp_path / "cache"
+    build(data_dir, cache_dir)
+    write_scan(data_dir / "yes" / "broken.jpg", 200)
+    summary = build(data_dir, cache_dir)
+    assert (summary["total"], summary["decoded"], summary["failed"]) == (7, 1, 0)
+    assert read_manifest(str(cache_dir), IMG_SIZE)["failed"] == []
+
+
+def test_changed_file_is_redecoded(data_dir, tmp_path):
+    cache_dir = tmp_path / "cache"
+    build(data_dir, cache_dir)
+    write_scan(data_dir / "no" / "n0.png", 50)
+    os.utime(data_dir / "no" / "n0.png", ns=(1, 1))
+    summary = build(data_dir, cache_dir)
+    assert (summary["decoded"], summary["reused"]) == (1, 5)
+    pixels, _, _ = load_shard(str(cache_dir), IMG_SIZE)
+    assert pixels[0].max() == 50
+
+
+# --- Out-of-core streaming ---
+SMALL_BUDGET_MB = 0.06  # 6-row chunks at batch size 4, so the 23 rows below span several chunks
+
+
+@pytest.fixture
+def streamed_shard(tmp_path):
+    root = tmp_path / "dataset"
+    for i in range(23):
+        write_scan(root / ("yes" if i % 2 else "no") / f"{i:02d}.png", i)
+    cache_dir = tmp_path / "cache"
+    build(root, cache_dir)
+    return str(cache_dir)
+
+
+def values(pixels):
+    return [int(p[0, 0]) for p in pixels]
+
+
+def test_rows_for_budget():
+    row = IMG_SIZE * IMG_SIZE
+    # 1 MB, batch 4, prefetch 2: 3 float32 batches in flight, the rest split over buffer + selection
+    expected = (1024 * 1024 - 3 * 4 * row * 4) // (2 * row)
+    assert rows_for_budget(1, batch_size=4, img_size=IMG_SIZE) == expected
+    assert rows_for_budget(2, batch_size=4, img_size=IMG_SIZE) > expected
+    with pytest.raises(ValueError):
+        rows_for_budget(0.001, batch_size=32, img_size=128)
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+@pytest.mark.parametrize("budget_mb", [SMALL_BUDGET_MB, 1.0])
+def test_iter_shard_batches_covers_every_row_once(streamed_shard, shuffle, budget_mb):
+    pixels, labels, _ = load_shard(streamed_shard, IMG_SIZE)
+    batches = list(iter_shard_batches(streamed_shard, batch_size=4, memory_budget_mb=budget_mb,
+                                      shuffle=shuffle, img_size=IMG_SIZE))
+    assert all(len(x) == 4 for x, _ in batches[:-1]) and 0 < len(batches[-1][0]) <= 4
+    seen = [v for x, _ in batches for v in values(x)]
+    assert sorted(seen) == sorted(values(pixels))
+    # labels travel with their rows
+    by_value = dict(zip(values(pixels), labels.tolist()))
+    assert all(by_value[v] == int(y) for x, ys in batches for v, y in zip(values(x), ys))
+    if not shuffle:
+        assert seen == values(pixels)
+
+
+def test_iter_shard_batches_respects_indices(streamed_shard):
+    pixels, _, _ = load_shard(streamed_shard, IMG_SIZE)
+    indices = [0, 3, 4, 10, 22]
+    batches = iter_shard_batches(streamed_shard, indices=indices, batch_size=2, memory_budget_mb=SMALL_BUDGET_MB,
+                                 shuffle=False, img_size=IMG_SIZE)
+    assert [v for x, _ in batches for v in values(x)] == [values(pixels)[i] for i in indices]
+
+
+def test_iter_shard_batches_shuffle_is_seeded(streamed_shard):
+    def order(seed):
+        return [v for x, _ in iter_shard_batches(streamed_shard, batch_size=4, memory_budget_mb=SMALL_BUDGET_MB,
+                                                  seed=seed, img_size=IMG_SIZE) for v in values(x)]
+    assert order(1) == order(1)
+    assert order(1) != order(2)
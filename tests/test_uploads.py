@@ -0,0 +1,64 @@
+import io
+import zipfile
+
+import numpy as np
+from PIL import Image
+
+from neuroscan.uploads import decode_many, expand_uploads
+
+
+class Upload:
+    """Stand-in for Streamlit's UploadedFile."""
+
+    def __init__(self, name, data):
+        self.name = name
+        self._data = data
+
+    def getvalue(self):
+        return self._data
+
+
+def png_bytes(value=0, size=40):
+    buf = io.BytesIO()
+    Image.fromarray(np.full((size, size), value, dtype=np.uint8)).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def zip_upload(name, members):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for member, data in members.items():
+            zf.writestr(member, data)
+    return Upload(name, buf.getvalue())
+
+
+def test_zip_members_are_expanded_in_order():
+    upload = zip_upload("series.zip", {"b.png": png_bytes(2), "a.png": png_bytes(1), "notes.txt": b"x",
+                                       "__MACOSX/._a.png": b"x"})
+    items, skipped = expand_uploads([upload, Upload("single.png", png_bytes(3)), Upload("doc.pdf", b"x")])
+    assert [name for name, _ in items] == ["series.zip/a.png", "series.zip/b.png", "single.png"]
+    assert skipped == []
+
+
+def test_oversized_member_is_skipped_before_decompression():
+    bomb = b"\0" * (8 * 1024 * 1024)  # compresses to a few KB
+    upload = zip_upload("bomb.zip", {"bomb.png": bomb, "ok.png": png_bytes()})
+    assert len(upload.getvalue()) < 64 * 1024
+    items, skipped = expand_uploads([upload], max_member_bytes=1024 * 1024)
+    assert [name for name, _ in items] == ["bomb.zip/ok.png"]
+    assert [name for name, _ in skipped] == ["bomb.zip/bomb.png"]
+
+
+def test_total_expanded_size_is_capped():
+    member = b"\0" * 1000
+    upload = zip_upload("many.zip", {f"{i:02d}.png": member for i in range(10)})
+    items, skipped = expand_uploads([upload], max_member_bytes=10_000, max_total_bytes=3500)
+    assert len(items) == 3 and len(skipped) == 7
+    assert sum(len(data) for _, data in items) <= 3500
+
+
+def test_decode_many_reports_errors_per_item():
+    results = decode_many([("good.png", png_bytes(7)), ("bad.png", b"not an image")], img_size=32)
+    (name1, arr, err1), (name2, none, err2) = results
+    assert (name1, arr.shape, arr.dtype, err1) == ("good.png", (32, 32), np.uint8, None)
+    assert name2 == "bad.png" and none is None and err2